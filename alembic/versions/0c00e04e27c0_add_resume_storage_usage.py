@@ -0,0 +1,36 @@
+"""add resume storage usage
+
+Revision ID: 0c00e04e27c0
+Revises: 8ddc839a42f0
+Create Date: 2026-10-18 18:41:09.513772
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c00e04e27c0'
+down_revision = '8ddc839a42f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_storage_usage',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bytes_used', sa.BigInteger(), nullable=False),
+    sa.Column('file_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # 按已有简历初始化用量
+    op.execute(
+        "INSERT INTO resume_storage_usage (user_id, bytes_used, file_count) "
+        "SELECT user_id, SUM(file_size), COUNT(*) FROM resumes GROUP BY user_id"
+    )
+
+
+def downgrade():
+    op.drop_table('resume_storage_usage')
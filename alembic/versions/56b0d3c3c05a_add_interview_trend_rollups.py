@@ -0,0 +1,47 @@
+"""add interview trend rollups
+
+Revision ID: 56b0d3c3c05a
+Revises: e810ae415841
+Create Date: 2026-10-18 15:26:44.071395
+
+升级后运行 python -m app.db.backfill_interview_statistics 从已完成的面试生成趋势汇总。
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '56b0d3c3c05a'
+down_revision = 'e810ae415841'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('interview_trend_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('interviews_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('overall_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('overall_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('professional_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('professional_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('expression_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('expression_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('logic_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('logic_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('adaptability_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('adaptability_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('professionalism_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('professionalism_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('cumulative_overall_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cumulative_overall_sum', sa.Float(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'granularity', 'bucket_start')
+    )
+
+
+def downgrade():
+    op.drop_table('interview_trend_rollups')
@@ -0,0 +1,30 @@
+"""Add catalog_versions table
+
+Revision ID: 5a8524eeb9ed
+Revises: 60f8a3286401
+Create Date: 2026-10-18 11:03:47.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8524eeb9ed'
+down_revision = '60f8a3286401'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO catalog_versions (name, version) VALUES ('questions', 1)")
+
+
+def downgrade():
+    op.drop_table('catalog_versions')
@@ -0,0 +1,26 @@
+"""Add keyset pagination indexes
+
+Revision ID: 60f8a3286401
+Revises: 9723bd6f94e7
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '60f8a3286401'
+down_revision = '9723bd6f94e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_interviews_user_started', 'interviews', ['user_id', 'started_at', 'id'], unique=False)
+    op.create_index('ix_resumes_user_created', 'resumes', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_resumes_user_created', table_name='resumes')
+    op.drop_index('ix_interviews_user_started', table_name='interviews')
@@ -0,0 +1,42 @@
+"""add resume parse jobs
+
+Revision ID: 8ddc839a42f0
+Revises: c6fc23ffa868
+Create Date: 2026-10-18 18:02:37.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8ddc839a42f0'
+down_revision = 'c6fc23ffa868'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resume_parse_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resumes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_resume_parse_jobs_id'), 'resume_parse_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_resume_parse_jobs_resume_id'), 'resume_parse_jobs', ['resume_id'], unique=False)
+    op.create_index('ix_resume_parse_jobs_status_id', 'resume_parse_jobs', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_resume_parse_jobs_status_id', table_name='resume_parse_jobs')
+    op.drop_index(op.f('ix_resume_parse_jobs_resume_id'), table_name='resume_parse_jobs')
+    op.drop_index(op.f('ix_resume_parse_jobs_id'), table_name='resume_parse_jobs')
+    op.drop_table('resume_parse_jobs')
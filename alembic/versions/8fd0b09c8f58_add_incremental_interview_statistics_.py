@@ -0,0 +1,63 @@
+"""Add incremental interview statistics aggregates
+
+After upgrading, run `python -m app.db.backfill_interview_statistics`
+to fill the new columns from existing completed interviews.
+
+Revision ID: 8fd0b09c8f58
+Revises: f9b554d390be
+Create Date: 2026-10-18 13:21:06.598043
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8fd0b09c8f58'
+down_revision = 'f9b554d390be'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('interview_statistics', sa.Column('overall_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('overall_sum', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('overall_sum_sq', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('professional_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('professional_sum', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('professional_sum_sq', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('expression_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('expression_sum', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('expression_sum_sq', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('logic_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('logic_sum', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('logic_sum_sq', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('adaptability_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('adaptability_sum', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('adaptability_sum_sq', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('professionalism_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('professionalism_sum', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('professionalism_sum_sq', sa.Float(), server_default='0', nullable=True))
+    op.add_column('interview_statistics', sa.Column('overall_ewma', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('interview_statistics', 'overall_ewma')
+    op.drop_column('interview_statistics', 'professionalism_sum_sq')
+    op.drop_column('interview_statistics', 'professionalism_sum')
+    op.drop_column('interview_statistics', 'professionalism_count')
+    op.drop_column('interview_statistics', 'adaptability_sum_sq')
+    op.drop_column('interview_statistics', 'adaptability_sum')
+    op.drop_column('interview_statistics', 'adaptability_count')
+    op.drop_column('interview_statistics', 'logic_sum_sq')
+    op.drop_column('interview_statistics', 'logic_sum')
+    op.drop_column('interview_statistics', 'logic_count')
+    op.drop_column('interview_statistics', 'expression_sum_sq')
+    op.drop_column('interview_statistics', 'expression_sum')
+    op.drop_column('interview_statistics', 'expression_count')
+    op.drop_column('interview_statistics', 'professional_sum_sq')
+    op.drop_column('interview_statistics', 'professional_sum')
+    op.drop_column('interview_statistics', 'professional_count')
+    op.drop_column('interview_statistics', 'overall_sum_sq')
+    op.drop_column('interview_statistics', 'overall_sum')
+    op.drop_column('interview_statistics', 'overall_count')
@@ -0,0 +1,48 @@
+"""add scoring jobs
+
+Revision ID: c30922f319fc
+Revises: 56b0d3c3c05a
+Create Date: 2026-10-18 16:48:12.305718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c30922f319fc'
+down_revision = '56b0d3c3c05a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scoring_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('interview_question_id', sa.Integer(), nullable=False),
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['interview_id'], ['interviews.id'], ),
+    sa.ForeignKeyConstraint(['interview_question_id'], ['interview_questions.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scoring_jobs_id'), 'scoring_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_scoring_jobs_interview_id'), 'scoring_jobs', ['interview_id'], unique=False)
+    op.create_index(op.f('ix_scoring_jobs_interview_question_id'), 'scoring_jobs', ['interview_question_id'], unique=False)
+    op.create_index('ix_scoring_jobs_status_id', 'scoring_jobs', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_scoring_jobs_status_id', table_name='scoring_jobs')
+    op.drop_index(op.f('ix_scoring_jobs_interview_question_id'), table_name='scoring_jobs')
+    op.drop_index(op.f('ix_scoring_jobs_interview_id'), table_name='scoring_jobs')
+    op.drop_index(op.f('ix_scoring_jobs_id'), table_name='scoring_jobs')
+    op.drop_table('scoring_jobs')
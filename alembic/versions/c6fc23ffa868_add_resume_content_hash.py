@@ -0,0 +1,26 @@
+"""add resume content hash
+
+Revision ID: c6fc23ffa868
+Revises: c30922f319fc
+Create Date: 2026-10-18 17:21:05.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6fc23ffa868'
+down_revision = 'c30922f319fc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('resumes', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_resumes_content_hash'), 'resumes', ['content_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_resumes_content_hash'), table_name='resumes')
+    op.drop_column('resumes', 'content_hash')
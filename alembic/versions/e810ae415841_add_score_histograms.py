@@ -0,0 +1,31 @@
+"""add score histograms
+
+Revision ID: e810ae415841
+Revises: 8fd0b09c8f58
+Create Date: 2026-10-18 14:02:37.512904
+
+升级后运行 python -m app.db.backfill_interview_statistics 从已有数据重建直方图和排名。
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e810ae415841'
+down_revision = '8fd0b09c8f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('score_histograms',
+    sa.Column('scope', sa.String(length=120), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('score_histograms')
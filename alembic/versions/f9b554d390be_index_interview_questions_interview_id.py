@@ -0,0 +1,24 @@
+"""Index interview_questions.interview_id
+
+Revision ID: f9b554d390be
+Revises: 5a8524eeb9ed
+Create Date: 2026-10-18 11:48:05.927310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f9b554d390be'
+down_revision = '5a8524eeb9ed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_interview_questions_interview_id'), 'interview_questions', ['interview_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_interview_questions_interview_id'), table_name='interview_questions')
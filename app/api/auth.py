@@ -2,9 +2,9 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.schemas import user as user_schema # 从schemas统一导入模型
 from app.services import auth_service, user_service # 导入需要的服务
 from app.core import security
@@ -14,20 +14,20 @@ from app.core.config import settings
 router = APIRouter()
 
 @router.post("/register", response_model=user_schema.UserResponse, status_code=status.HTTP_201_CREATED, summary="用户注册")
-def register(user_in: user_schema.UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: user_schema.UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     创建新用户，并返回不含密码的用户信息。
     """
     # 检查用户名是否已存在
-    if auth_service.get_user_by_username(db, username=user_in.username):
+    if await db.run_sync(auth_service.get_user_by_username, user_in.username):
         raise HTTPException(status_code=400, detail="该用户名已被注册")
         
     # 检查邮箱是否已存在
-    if auth_service.get_user_by_email(db, email=user_in.email):
+    if await db.run_sync(auth_service.get_user_by_email, user_in.email):
         raise HTTPException(status_code=400, detail="该邮箱已被注册")
     
     # 创建用户
-    user = auth_service.create_user(db, user_in=user_in)
+    user = await auth_service.create_user(db, user_in=user_in)
     
     # 构造不含敏感信息的返回数据
     # 新注册用户一定没有个人资料
@@ -40,15 +40,15 @@ def register(user_in: user_schema.UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", summary="用户登录")
-def login(
+async def login(
     # 将参数从 form_data 修改为接收 JSON 格式的 user_credentials
     # FastAPI 会自动用 UserLogin 模型来验证请求体
     user_credentials: user_schema.UserLogin, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """通过用户名和密码登录 (接收JSON)"""
     # 使用 Pydantic 模型中的字段进行验证
-    user = auth_service.authenticate_user(
+    user = await auth_service.authenticate_user(
         db, username=user_credentials.username, password=user_credentials.password
     )
     if not user:
@@ -59,7 +59,7 @@ def login(
         )
     
     # 检查用户profile是否完善
-    user_data = user_service.get_user_profile_data(db, user)
+    user_data = await db.run_sync(user_service.get_user_profile_data, user)
 
     # 创建Token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
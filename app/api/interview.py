@@ -1,30 +1,42 @@
 # app/api/interview.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, desc, func, select, update
 from typing import List, Optional
 from datetime import datetime, timedelta
 import json
 import random
 
-from app.db.database import get_db
+from app.db.database import AsyncSessionLocal, get_async_db
+from app.core.config import settings
 # 👇 --- 修改点 1: 导入新的、更安全的函数 ---
 from app.core.security import get_current_active_user
+from app.core.pagination import keyset_paginate, cached_count, count_rows
 from app.models.user import User # 确保导入User模型以在依赖中使用
-from app.models.interview import Interview, InterviewQuestion, InterviewStatistics, InterviewTrendData
+from app.models.interview import Interview, InterviewQuestion, InterviewStatistics, ScoringJob
 from app.models.question import Question
+from app.services.question_catalog import question_catalog
+from app.services.question_sampler import question_sampler, get_seen_question_ids
+from app.services import answer_scoring, score_histogram, trend_rollups
+from app.services.interview_events import interview_events, event_stream
+from app.services.interview_plan import InterviewPlan, interview_plans, load_plan, load_plan_for_question
+from app.services.interview_stats import record_completed_interview, ensure_statistics_row
 from app.schemas.interview import *
 
 router = APIRouter()
 
+# 每场面试抽取的技术题数量
+TECHNICAL_QUESTION_COUNT = 3
+
 # ===== 面试管理接口 =====
 
 @router.post("/start")
-def start_interview(
+async def start_interview(
     interview_data: InterviewCreate,
     # 👇 --- 修改点 2: 使用新的依赖 ---
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     开始面试
@@ -46,58 +58,57 @@ def start_interview(
         )
         
         db.add(interview)
-        db.flush()  # 获取interview.id
+        await db.flush()  # 获取interview.id
         
         # 生成面试题目
-        questions = generate_interview_questions(db, config, interview.id)
+        questions = await generate_interview_questions(db, config, interview.id, current_user.id)
         interview.total_questions = len(questions)
         
-        db.commit()
-        db.refresh(interview)
+        await db.commit()
+        
+        # 题目已确定，直接写入计划缓存，后续 /plan 和 /next 不必再查库
+        plan = InterviewPlan.build(
+            interview.id, current_user.id, len(questions),
+            sorted(questions, key=lambda q: q.order_index), get_question_hint
+        )
+        interview_plans.put(plan)
         
         # 返回第一题
-        first_question = questions[0] if questions else None
+        first_question = plan.questions[0] if plan.questions else None
         
         return {
             "code": 200,
             "data": {
                 "interview_id": interview.id,
-                "first_question": {
-                    "id": first_question.id,
-                    "text": first_question.question_text,
-                    "type": first_question.question_type or "behavioral",
-                    "difficulty": first_question.difficulty or "medium",
-                    "hint": get_question_hint(first_question.question_text),
-                    "order_index": first_question.order_index
-                } if first_question else None,
+                "first_question": first_question,
                 "total_questions": len(questions)
             },
             "message": "面试开始成功"
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"开始面试失败: {str(e)}"
         )
 
 @router.post("/questions/{question_id}/answer")
-def submit_answer(
+async def submit_answer(
     question_id: int,
     answer_data: AnswerSubmit,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     提交答案
     POST /api/v1/interviews/questions/{question_id}/answer
+    
+    答案保存后进入评分队列，立即返回 job_id，反馈通过 GET /scoring-jobs/{job_id} 获取
     """
     try:
         # 查找题目
-        question = db.query(InterviewQuestion).filter(
-            InterviewQuestion.id == question_id
-        ).first()
+        question = await db.get(InterviewQuestion, question_id)
         
         if not question:
             raise HTTPException(
@@ -106,10 +117,12 @@ def submit_answer(
             )
         
         # 验证用户权限
-        interview = db.query(Interview).filter(
-            Interview.id == question.interview_id,
-            Interview.user_id == current_user.id
-        ).first()
+        interview = (await db.execute(
+            select(Interview).where(
+                Interview.id == question.interview_id,
+                Interview.user_id == current_user.id
+            )
+        )).scalars().first()
         
         if not interview:
             raise HTTPException(
@@ -117,40 +130,56 @@ def submit_answer(
                 detail="无权访问此面试"
             )
         
-        # 更新答案
+        # 更新答案（旧答案的评分作废）
         question.answer_text = answer_data.answer_text
         question.answer_duration = answer_data.answer_duration
         question.is_skipped = answer_data.is_skipped
         question.hint_used = answer_data.hint_used
         question.answered_at = datetime.utcnow()
+        question.score = None
+        question.ai_feedback = None
+        question.keyword_match = None
+        question.fluency_score = None
         
-        # 生成AI评分和反馈
+        # 评分交给后台 worker，这里只入队
+        job = None
         if not answer_data.is_skipped and answer_data.answer_text:
-            feedback = generate_ai_feedback(question.question_text, answer_data.answer_text)
-            question.score = feedback["score"]
-            question.ai_feedback = json.dumps(feedback)
-            question.keyword_match = feedback.get("keyword_match", 0.8)
-            question.fluency_score = feedback.get("fluency_score", 0.85)
+            job = await answer_scoring.enqueue(db, question, current_user.id)
+        else:
+            await answer_scoring.cancel_open_jobs(db, question.id)
         
         # 更新面试进度
         interview.answered_questions += 1
         
-        db.commit()
+        await db.commit()
+        
+        # 推送进度（订阅了 /{interview_id}/events 的客户端无需再轮询）
+        interview_events.publish(interview.id, "progress", {
+            "question_id": question.id,
+            "job_id": job.id if job is not None else None,
+            "status": job.status if job is not None else "skipped",
+            "answered_questions": interview.answered_questions,
+            "total_questions": interview.total_questions
+        })
         
-        # 返回反馈
-        if answer_data.is_skipped:
+        # 返回评分任务，客户端通过 /scoring-jobs/{job_id} 轮询或订阅事件流获取反馈
+        if job is not None:
+            answer_scoring.scoring_pool.notify()
             feedback_response = {
-                "score": 0,
-                "pros": "已跳过此题",
-                "cons": "建议完整回答以获得更好的评估",
-                "reference": get_reference_answer(question.question_text)
+                "job_id": job.id,
+                "status": job.status,
+                "feedback": None
             }
         else:
-            feedback_response = json.loads(question.ai_feedback) if question.ai_feedback else {
-                "score": 3.5,
-                "pros": "回答基本完整",
-                "cons": "可以更加详细一些",
-                "reference": get_reference_answer(question.question_text)
+            feedback_response = {
+                "job_id": None,
+                "status": "skipped",
+                "feedback": {
+                    "score": 0,
+                    "pros": "已跳过此题",
+                    "cons": "建议完整回答以获得更好的评估",
+                    "reference": get_reference_answer(question.question_text)
+                }
             }
         
         return {
@@ -162,67 +191,51 @@ def submit_answer(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"提交答案失败: {str(e)}"
         )
 
 @router.get("/questions/{question_id}/next")
-def get_next_question(
+async def get_next_question(
     question_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取下一题
     GET /api/v1/interviews/questions/{question_id}/next
+    
+    前端可以用 /{interview_id}/plan 一次取回所有题目在本地切换，这里作为兜底
     """
     try:
-        # 找当前题目
-        current_question = db.query(InterviewQuestion).filter(
-            InterviewQuestion.id == question_id
-        ).first()
+        # 从面试计划缓存中查找，未命中时一条查询加载整场面试
+        plan = await load_plan_for_question(db, question_id, get_question_hint)
         
-        if not current_question:
+        if not plan or not plan.has_question(question_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="当前题目不存在"
             )
         
         # 验证权限
-        interview = db.query(Interview).filter(
-            Interview.id == current_question.interview_id,
-            Interview.user_id == current_user.id
-        ).first()
-        
-        if not interview:
+        if plan.user_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="无权访问此面试"
             )
         
-        # 查找下一题
-        next_question = db.query(InterviewQuestion).filter(
-            InterviewQuestion.interview_id == current_question.interview_id,
-            InterviewQuestion.order_index > current_question.order_index
-        ).order_by(InterviewQuestion.order_index).first()
+        next_question = plan.next_after(question_id)
         
         if next_question:
             return {
                 "code": 200,
                 "data": {
                     "has_next": True,
-                    "question": {
-                        "id": next_question.id,
-                        "text": next_question.question_text,
-                        "type": next_question.question_type or "behavioral",
-                        "difficulty": next_question.difficulty or "medium",
-                        "hint": get_question_hint(next_question.question_text),
-                        "order_index": next_question.order_index
-                    },
-                    "current_progress": next_question.order_index,
-                    "total_questions": interview.total_questions
+                    "question": next_question,
+                    "current_progress": next_question["order_index"],
+                    "total_questions": plan.total_questions
                 },
                 "message": "获取下一题成功"
             }
@@ -232,8 +245,8 @@ def get_next_question(
                 "data": {
                     "has_next": False,
                     "question": None,
-                    "current_progress": interview.total_questions,
-                    "total_questions": interview.total_questions
+                    "current_progress": plan.total_questions,
+                    "total_questions": plan.total_questions
                 },
                 "message": "已完成所有题目"
             }
@@ -246,12 +259,160 @@ def get_next_question(
             detail=f"获取下一题失败: {str(e)}"
         )
 
+@router.get("/scoring-jobs/{job_id}")
+async def get_scoring_job(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    查询答案评分任务状态和反馈
+    GET /api/v1/interviews/scoring-jobs/{job_id}
+    
+    status: pending / running / done / failed / cancelled，done 时返回反馈
+    """
+    try:
+        row = (await db.execute(
+            select(ScoringJob, InterviewQuestion.ai_feedback)
+            .join(InterviewQuestion, InterviewQuestion.id == ScoringJob.interview_question_id)
+            .where(ScoringJob.id == job_id)
+        )).first()
+        
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="评分任务不存在"
+            )
+        
+        job, ai_feedback = row
+        if job.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="无权访问此评分任务"
+            )
+        
+        return {
+            "code": 200,
+            "data": {
+                "job_id": job.id,
+                "question_id": job.interview_question_id,
+                "status": job.status,
+                "attempts": job.attempts,
+                "error": job.error if job.status == "failed" else None,
+                "feedback": json.loads(ai_feedback) if job.status == "done" and ai_feedback else None
+            },
+            "message": "获取评分任务成功"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取评分任务失败: {str(e)}"
+        )
+
+@router.get("/{interview_id}/events")
+async def stream_interview_events(
+    interview_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    订阅面试事件流（Server-Sent Events）
+    GET /api/v1/interviews/{interview_id}/events
+    
+    事件: snapshot / progress / feedback / scoring_failed / completed，
+    断线重连时带 Last-Event-ID 补发漏掉的事件，面试完成后服务端关闭连接
+    """
+    plan = await load_plan(db, interview_id, get_question_hint)
+    
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="面试不存在"
+        )
+    
+    if plan.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权访问此面试"
+        )
+    
+    last_event_id = request.headers.get("last-event-id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    # 事件流可能持续很久，不占用请求的数据库会话，snapshot 使用独立会话
+    await db.close()
+    
+    async def snapshot():
+        async with AsyncSessionLocal() as session:
+            return await build_interview_snapshot(session, interview_id)
+    
+    return StreamingResponse(
+        event_stream(interview_id, last_event_id, snapshot, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{interview_id}/plan")
+async def get_interview_plan(
+    interview_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取整场面试的题目计划（有序题目 + 提示）
+    GET /api/v1/interviews/{interview_id}/plan
+    
+    带 ETag，If-None-Match 匹配时返回 304
+    """
+    try:
+        plan = await load_plan(db, interview_id, get_question_hint)
+        
+        if not plan:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="面试不存在"
+            )
+        
+        if plan.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="无权访问此面试"
+            )
+        
+        headers = {"ETag": plan.etag, "Cache-Control": "private, no-cache"}
+        if request.headers.get("if-none-match") == plan.etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        response.headers.update(headers)
+        return {
+            "code": 200,
+            "data": plan.to_dict(),
+            "message": "获取面试计划成功"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取面试计划失败: {str(e)}"
+        )
+
 @router.post("/{interview_id}/complete")
-def complete_interview(
+async def complete_interview(
     interview_id: int,
     complete_data: InterviewComplete,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     完成面试
@@ -259,10 +420,12 @@ def complete_interview(
     """
     try:
         # 查找面试
-        interview = db.query(Interview).filter(
-            Interview.id == interview_id,
-            Interview.user_id == current_user.id
-        ).first()
+        interview = (await db.execute(
+            select(Interview).where(
+                Interview.id == interview_id,
+                Interview.user_id == current_user.id
+            )
+        )).scalars().first()
         
         if not interview:
             raise HTTPException(
@@ -270,50 +433,75 @@ def complete_interview(
                 detail="面试不存在"
             )
         
-        # 计算面试结果
-        questions = db.query(InterviewQuestion).filter(
-            InterviewQuestion.interview_id == interview_id
-        ).all()
+        if interview.status == "completed":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="面试已完成"
+            )
         
-        scores = calculate_interview_scores(questions)
+        # 就地评完尚未完成的评分任务，保证总分包含所有已回答的题目
+        drained = await answer_scoring.drain_interview_jobs(db, interview_id)
+        
+        # 计算面试结果（聚合查询，不加载答案内容）
+        scores = await calculate_interview_scores(db, interview_id)
+        
+        # 用带条件的 UPDATE 认领"完成"状态转换：并发的重复请求只有一个能成功，统计只累加一次
+        finished_at = datetime.utcnow()
+        claimed = await db.execute(
+            update(Interview)
+            .where(Interview.id == interview_id, Interview.status != "completed")
+            .values(
+                status="completed",
+                finished_at=finished_at,
+                actual_duration=int((finished_at - interview.started_at).total_seconds() / 60),
+                overall_score=scores["overall"],
+                professional_score=scores["professional"],
+                expression_score=scores["expression"],
+                logic_score=scores["logic"],
+                adaptability_score=scores["adaptability"],
+                professionalism_score=scores["professionalism"],
+            )
+            .execution_options(synchronize_session="evaluate")
+        )
+        if claimed.rowcount != 1:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="面试已完成"
+            )
         
-        # 更新面试记录
-        interview.status = "completed"
-        interview.finished_at = datetime.utcnow()
-        interview.actual_duration = int((datetime.utcnow() - interview.started_at).total_seconds() / 60)
-        interview.overall_score = scores["overall"]
-        interview.professional_score = scores["professional"]
-        interview.expression_score = scores["expression"]
-        interview.logic_score = scores["logic"]
-        interview.adaptability_score = scores["adaptability"]
-        interview.professionalism_score = scores["professionalism"]
+        # 更新用户统计（按维度原子累加）
+        await record_completed_interview(db, current_user.id, interview)
         
-        # 更新用户统计
-        update_user_statistics(db, current_user.id, interview)
+        # 更新趋势汇总
+        await trend_rollups.record_interview(db, current_user.id, interview)
         
-        # 更新趋势数据
-        update_trend_data(db, current_user.id, scores["overall"])
+        await db.commit()
         
-        db.commit()
+        result = {
+            "interview_id": interview.id,
+            "overall_score": scores["overall"],
+            "duration_minutes": interview.actual_duration,
+            "scores": scores,
+            "total_questions": interview.total_questions,
+            "answered_questions": interview.answered_questions,
+            "performance_summary": generate_performance_summary(scores)
+        }
+        
+        for event in drained:
+            interview_events.publish(interview.id, "feedback", event)
+        interview_events.publish(interview.id, "completed", result)
         
         return {
             "code": 200,
-            "data": {
-                "interview_id": interview.id,
-                "overall_score": scores["overall"],
-                "duration_minutes": interview.actual_duration,
-                "scores": scores,
-                "total_questions": interview.total_questions,
-                "answered_questions": interview.answered_questions,
-                "performance_summary": generate_performance_summary(scores)
-            },
+            "data": result,
             "message": "面试完成"
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"完成面试失败: {str(e)}"
@@ -322,31 +510,35 @@ def complete_interview(
 # ===== 面试数据查询接口 =====
 
 @router.get("/performance")
-def get_interview_performance(
+async def get_interview_performance(
+    by_position: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取面试表现数据
-    GET /api/v1/interviews/performance
+    GET /api/v1/interviews/performance?by_position=false
     
     匹配前端 InterviewPerformance.vue 的数据需求
+    better_than 由评分分布直方图实时计算；by_position=true 时额外返回最近面试过的各岗位排名
     """
     try:
         # 获取用户统计
-        stats = db.query(InterviewStatistics).filter(
-            InterviewStatistics.user_id == current_user.id
-        ).first()
+        stats = (await db.execute(
+            select(InterviewStatistics).where(InterviewStatistics.user_id == current_user.id)
+        )).scalars().first()
         
         if not stats:
             # 如果没有统计数据，创建默认数据
-            stats = create_default_statistics(db, current_user.id)
+            stats = await create_default_statistics(db, current_user.id)
         
         # 获取最近面试记录
-        recent_interviews = db.query(Interview).filter(
-            Interview.user_id == current_user.id,
-            Interview.status == "completed"
-        ).order_by(desc(Interview.finished_at)).limit(10).all()
+        recent_interviews = (await db.execute(
+            select(Interview).where(
+                Interview.user_id == current_user.id,
+                Interview.status == "completed"
+            ).order_by(desc(Interview.finished_at)).limit(10)
+        )).scalars().all()
         
         # 格式化历史记录
         recent_records = []
@@ -372,16 +564,42 @@ def get_interview_performance(
         # 综合评分
         overall_score = round(stats.avg_overall_score or 0)
         
+        # 全局排名：读取至多 BUCKET_COUNT 行，不扫描其他用户
+        better_than = 0.0
+        if stats.overall_count:
+            histogram = await score_histogram.load_histogram(db, score_histogram.GLOBAL_SCOPE)
+            better_than = score_histogram.better_than_percent(histogram, stats.avg_overall_score)
+        
         performance_data = {
             "overall_score": overall_score,
             "score_level": get_score_level(overall_score),
             "score_comment": get_score_comment(overall_score),
-            "better_than": round(stats.better_than_percent or 0),
+            "better_than": round(better_than),
             "improvement": round(stats.score_improvement or 0),
             "ability_scores": ability_scores,
             "recent_records": recent_records
         }
         
+        if by_position:
+            # 每个岗位取最近一场面试的评分，与该岗位所有已完成面试的分布比较
+            latest_scores = {}
+            for interview in recent_interviews:
+                if interview.overall_score is not None and interview.position not in latest_scores:
+                    latest_scores[interview.position] = interview.overall_score
+            histograms = await score_histogram.load_histograms(
+                db, [score_histogram.position_scope(p) for p in latest_scores]
+            )
+            performance_data["position_ranks"] = [
+                {
+                    "position": position,
+                    "score": round(score),
+                    "better_than": round(score_histogram.better_than_percent(
+                        histograms[score_histogram.position_scope(position)], score
+                    ))
+                }
+                for position, score in latest_scores.items()
+            ]
+        
         return {
             "code": 200,
             "data": performance_data,
@@ -395,60 +613,49 @@ def get_interview_performance(
         )
 
 @router.get("/trend")
-def get_trend_data(
+async def get_trend_data(
     dimension: str = "overall",
     period: str = "month",
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取趋势数据
     GET /api/v1/interviews/trend?dimension=overall&period=month
+    
+    period: week / month（按天）、quarter（按周）、year（按月），
+    返回的点数不超过 TREND_MAX_POINTS，超出时合并相邻时间段
     """
     try:
-        # 计算时间范围
-        end_date = datetime.utcnow()
-        if period == "week":
-            start_date = end_date - timedelta(days=7)
-        elif period == "month":
-            start_date = end_date - timedelta(days=30)
-        else:
-            start_date = end_date - timedelta(days=90)
+        # 按周期选择粒度，读取的汇总行数只与周期长度有关
+        start_date, end_date, granularity = trend_rollups.period_range(period)
+        rollups = await trend_rollups.load_rollups(db, current_user.id, granularity, start_date)
         
-        # 查询趋势数据
-        trend_records = db.query(InterviewTrendData).filter(
-            InterviewTrendData.user_id == current_user.id,
-            InterviewTrendData.record_date >= start_date
-        ).order_by(InterviewTrendData.record_date).all()
+        if dimension not in trend_rollups.SCORE_DIMENSIONS:
+            dimension = "overall"
         
         # 如果没有数据，生成模拟数据
-        if not trend_records:
-            trend_records = generate_mock_trend_data(current_user.id, start_date, end_date)
+        if rollups:
+            points = trend_rollups.downsample(rollups, dimension, settings.TREND_MAX_POINTS)
+        else:
+            points = generate_mock_trend_data(start_date, end_date, granularity)
         
         # 提取数据
+        date_format = "%Y-%m" if granularity == "month" else "%m-%d"
         dates = []
         scores = []
         
-        for record in trend_records:
-            dates.append(record.record_date.strftime("%m-%d"))
-            
-            if dimension == "overall":
-                scores.append(round(record.cumulative_avg_score or 0))
-            elif dimension == "professional":
-                scores.append(round(record.professional_score or 0))
-            elif dimension == "expression":
-                scores.append(round(record.expression_score or 0))
-            elif dimension == "logic":
-                scores.append(round(record.logic_score or 0))
-            else:
-                scores.append(round(record.cumulative_avg_score or 0))
+        for point_date, score in points:
+            dates.append(point_date.strftime(date_format))
+            scores.append(round(score or 0))
         
         return {
             "code": 200,
             "data": {
                 "dates": dates,
                 "scores": scores,
-                "dimension": dimension
+                "dimension": dimension,
+                "granularity": granularity
             },
             "message": "获取趋势数据成功"
         }
@@ -460,27 +667,39 @@ def get_trend_data(
         )
 
 @router.get("/history")
-def get_interview_history(
+async def get_interview_history(
     page: int = 1,
     page_size: int = 10,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取面试历史
     GET /api/v1/interviews/history?page=1&page_size=10
+    GET /api/v1/interviews/history?cursor=&page_size=10  (游标分页)
     """
     try:
-        offset = (page - 1) * page_size
-        
-        # 查询面试历史
-        interviews = db.query(Interview).filter(
+        base_query = select(Interview).where(
             Interview.user_id == current_user.id
-        ).order_by(desc(Interview.started_at)).offset(offset).limit(page_size).all()
+        )
         
-        total = db.query(Interview).filter(
-            Interview.user_id == current_user.id
-        ).count()
+        if cursor is not None:
+            # 游标分页：按 (started_at, id) 倒序 seek
+            interviews, next_cursor = await keyset_paginate(
+                db, base_query, Interview.id, cursor, page_size,
+                sort_column=Interview.started_at, descending=True, sort_as_text=True
+            )
+        else:
+            offset = (page - 1) * page_size
+            
+            # 查询面试历史
+            interviews = (await db.execute(
+                base_query.order_by(desc(Interview.started_at)).offset(offset).limit(page_size)
+            )).scalars().all()
+            
+            total = await count_rows(db, base_query)
         
         # 格式化数据
         history_list = []
@@ -495,17 +714,33 @@ def get_interview_history(
                 "status": interview.status
             })
         
-        return {
-            "code": 200,
-            "data": {
+        if cursor is not None:
+            data = {
+                "list": history_list,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+                "page_size": page_size
+            }
+            if with_total:
+                data["total"] = await cached_count(
+                    ("interview_history", current_user.id), lambda: count_rows(db, base_query)
+                )
+        else:
+            data = {
                 "list": history_list,
                 "total": total,
                 "page": page,
                 "page_size": page_size
-            },
+            }
+        
+        return {
+            "code": 200,
+            "data": data,
             "message": "获取面试历史成功"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -514,23 +749,57 @@ def get_interview_history(
 
 # ===== 辅助函数 =====
 
-def generate_interview_questions(db: Session, config: InterviewConfig, interview_id: int):
-    """生成面试题目"""
-    questions = []
+async def build_interview_snapshot(db: AsyncSession, interview_id: int) -> dict:
+    """事件流的 snapshot：面试进度和各题最新的评分状态"""
+    interview = await db.get(Interview, interview_id)
+    questions = (await db.execute(
+        select(InterviewQuestion.id, InterviewQuestion.answered_at, InterviewQuestion.is_skipped,
+               InterviewQuestion.ai_feedback)
+        .where(InterviewQuestion.interview_id == interview_id)
+        .order_by(InterviewQuestion.order_index)
+    )).all()
+    latest_jobs = {}
+    for question_id, job_id, job_status in (await db.execute(
+        select(ScoringJob.interview_question_id, ScoringJob.id, ScoringJob.status)
+        .where(ScoringJob.interview_id == interview_id)
+        .order_by(ScoringJob.id)
+    )).all():
+        latest_jobs[question_id] = (job_id, job_status)
     
-    # 从知识库获取题目
-    query = db.query(Question).filter(Question.is_active == True)
+    items = []
+    for question_id, answered_at, is_skipped, ai_feedback in questions:
+        job_id, job_status = latest_jobs.get(question_id, (None, None))
+        if is_skipped:
+            job_status = "skipped"
+        items.append({
+            "question_id": question_id,
+            "answered": answered_at is not None,
+            "job_id": job_id,
+            "status": job_status,
+            "feedback": json.loads(ai_feedback) if job_status == "done" and ai_feedback else None
+        })
     
-    # 根据岗位筛选
-    if config.position == "frontend":
-        query = query.filter(Question.category.in_(["前端开发", "算法数据结构"]))
-    elif config.position == "backend":
-        query = query.filter(Question.category.in_(["后端开发", "算法数据结构"]))
+    return {
+        "interview_id": interview_id,
+        "status": interview.status if interview else None,
+        "answered_questions": interview.answered_questions if interview else 0,
+        "total_questions": interview.total_questions if interview else 0,
+        "overall_score": interview.overall_score if interview else None,
+        "questions": items
+    }
+
+async def generate_interview_questions(db: AsyncSession, config: InterviewConfig, interview_id: int, user_id: Optional[int] = None):
+    """生成面试题目"""
+    questions = []
     
-    available_questions = query.all()
+    # 排除用户做过的题目
+    exclude_ids = await get_seen_question_ids(db, user_id) if (user_id and config.exclude_seen) else set()
     
-    # 随机选择题目（简化版）
-    selected_questions = random.sample(available_questions, min(5, len(available_questions)))
+    # 从按岗位/分类/难度分桶的索引中随机抽题，只取出选中的题目
+    snapshot = await question_catalog.get_async(db)
+    selected_questions = question_sampler.sample(
+        snapshot, config.position, config.difficulty, TECHNICAL_QUESTION_COUNT, exclude_ids
+    )
     
     # 添加通用问题
     common_questions = [
@@ -540,7 +809,7 @@ def generate_interview_questions(db: Session, config: InterviewConfig, interview
     ]
     
     # 创建面试题目记录
-    for i, q in enumerate(selected_questions[:3]):
+    for i, q in enumerate(selected_questions):
         interview_question = InterviewQuestion(
             interview_id=interview_id,
             question_id=q.id,
@@ -568,111 +837,60 @@ def generate_interview_questions(db: Session, config: InterviewConfig, interview
     
     return questions
 
-def generate_ai_feedback(question: str, answer: str):
-    """生成AI反馈（模拟）"""
-    # 这里是简化版本，实际应该调用AI接口
-    base_score = random.uniform(3.0, 4.5)
-    
-    feedback = {
-        "score": round(base_score, 1),
-        "pros": "回答结构清晰，表达流畅，重点突出。",
-        "cons": "可以增加一些具体的案例来支撑观点，让回答更有说服力。",
-        "reference": "参考答案：建议从具体背景开始，然后介绍解决方案和结果。",
-        "keyword_match": random.uniform(0.7, 0.9),
-        "fluency_score": random.uniform(0.8, 0.95)
-    }
-    
-    return feedback
+# 没有任何已评分题目时的默认综合分
+DEFAULT_OVERALL_SCORE = 75
+# 每道使用提示的题目对应变能力的扣减比例
+HINT_PENALTY = 0.2
 
-def calculate_interview_scores(questions):
-    """计算面试各项评分"""
-    total_score = 0
-    count = 0
-    
-    for q in questions:
-        if q.score is not None:
-            total_score += q.score
-            count += 1
-    
-    overall = (total_score / count * 20) if count > 0 else 75  # 转换为100分制
-    
-    # 生成各项评分（基于整体评分的波动）
-    scores = {
-        "overall": round(overall, 1),
-        "professional": round(overall + random.uniform(-5, 5), 1),
-        "expression": round(overall + random.uniform(-3, 3), 1),
-        "logic": round(overall + random.uniform(-4, 4), 1),
-        "adaptability": round(overall + random.uniform(-6, 6), 1),
-        "professionalism": round(overall + random.uniform(-2, 2), 1)
-    }
-    
-    # 确保评分在合理范围内
-    for key in scores:
-        scores[key] = max(0, min(100, scores[key]))
-    
-    return scores
 
-def update_user_statistics(db: Session, user_id: int, interview: Interview):
-    """更新用户统计数据"""
-    stats = db.query(InterviewStatistics).filter(
-        InterviewStatistics.user_id == user_id
-    ).first()
-    
-    if not stats:
-        stats = InterviewStatistics(user_id=user_id)
-        db.add(stats)
-    
-    # 更新统计
-    stats.total_interviews += 1
-    if interview.type == "practice":
-        stats.total_practice += 1
+async def calculate_interview_scores(db: AsyncSession, interview_id: int) -> dict:
+    """
+    计算面试各项评分（100分制）：一条聚合查询，只读取数值列，不加载答案和反馈内容
+    - overall：单题得分（0-5）均值
+    - professional：专业题的关键词覆盖率（keyword_match）均值
+    - expression：有流畅度评分时取其均值，否则取行为题得分均值
+    - logic：专业题得分均值
+    - adaptability：综合分按使用提示的题目比例扣减
+    - professionalism：已作答（未跳过且已评分）题目占比
+    没有对应数据的维度取综合分。
+    """
+    q = InterviewQuestion
+    behavioral = q.question_type == "behavioral"
+    (total, scored, avg_score, avg_technical, avg_keyword, avg_behavioral,
+     avg_fluency, hints) = (await db.execute(
+        select(
+            func.count(q.id),
+            func.count(q.score),
+            func.avg(q.score),
+            func.avg(case((~behavioral, q.score))),
+            func.avg(case((~behavioral, q.keyword_match))),
+            func.avg(case((behavioral, q.score))),
+            func.avg(q.fluency_score),
+            func.sum(case((q.hint_used, 1), else_=0)),
+        ).where(q.interview_id == interview_id)
+    )).one()
+
+    overall = avg_score * 20 if avg_score is not None else DEFAULT_OVERALL_SCORE
+
+    def scaled(value, factor):
+        return value * factor if value is not None else overall
+
+    if avg_fluency is not None:
+        expression = avg_fluency * 100
     else:
-        stats.total_simulation += 1
-    
-    stats.total_time_minutes += interview.actual_duration or 0
-    
-    # 更新平均分数（简化版）
-    if interview.overall_score:
-        current_avg = stats.avg_overall_score or 0
-        total_interviews = stats.total_interviews
-        stats.avg_overall_score = (current_avg * (total_interviews - 1) + interview.overall_score) / total_interviews
-        
-        # 更新其他平均分
-        stats.avg_professional_score = interview.professional_score
-        stats.avg_expression_score = interview.expression_score
-        stats.avg_logic_score = interview.logic_score
-        stats.avg_adaptability_score = interview.adaptability_score
-        stats.avg_professionalism_score = interview.professionalism_score
-    
-    # 更新排名（模拟）
-    stats.better_than_percent = min(95, 60 + stats.total_interviews * 2)
-    stats.score_improvement = random.uniform(8, 15)
-    
-    stats.last_interview_date = datetime.utcnow()
+        expression = scaled(avg_behavioral, 20)
 
-def update_trend_data(db: Session, user_id: int, score: float):
-    """更新趋势数据"""
-    today = datetime.utcnow().date()
-    
-    trend = db.query(InterviewTrendData).filter(
-        InterviewTrendData.user_id == user_id,
-        func.date(InterviewTrendData.record_date) == today
-    ).first()
+    scores = {
+        "overall": overall,
+        "professional": scaled(avg_keyword, 100),
+        "expression": expression,
+        "logic": scaled(avg_technical, 20),
+        "adaptability": overall * (1 - HINT_PENALTY * (hints or 0) / total) if total else overall,
+        "professionalism": scored / total * 100 if total else overall,
+    }
     
-    if not trend:
-        trend = InterviewTrendData(
-            user_id=user_id,
-            record_date=datetime.utcnow(),
-            daily_score=score,
-            interviews_count=1,
-            cumulative_avg_score=score
-        )
-        db.add(trend)
-    else:
-        # 更新当日数据
-        trend.interviews_count += 1
-        trend.daily_score = (trend.daily_score * (trend.interviews_count - 1) + score) / trend.interviews_count
-        trend.cumulative_avg_score = score  # 简化处理
+    # 确保评分在合理范围内
+    return {key: round(max(0.0, min(100.0, value)), 1) for key, value in scores.items()}
 
 # 其他辅助函数...
 def get_question_hint(question_text: str) -> str:
@@ -717,40 +935,29 @@ def get_score_comment(score: int) -> str:
     else:
         return "建议多加练习，重点提升薄弱环节"
 
-def create_default_statistics(db: Session, user_id: int):
+async def create_default_statistics(db: AsyncSession, user_id: int):
     """创建默认统计数据"""
-    stats = InterviewStatistics(
-        user_id=user_id,
-        total_interviews=0,
-        avg_overall_score=0,
-        better_than_percent=0,
-        score_improvement=0
-    )
-    db.add(stats)
-    db.commit()
-    return stats
+    await ensure_statistics_row(db, user_id)
+    await db.commit()
+    return (await db.execute(
+        select(InterviewStatistics).where(InterviewStatistics.user_id == user_id)
+    )).scalars().one()
 
-def generate_mock_trend_data(user_id: int, start_date: datetime, end_date: datetime):
-    """生成模拟趋势数据"""
+def generate_mock_trend_data(start_date: datetime, end_date: datetime, granularity: str):
+    """生成模拟趋势数据 [(日期, 分数)]"""
+    step = {"day": 1, "week": 7}.get(granularity, 31)
     data = []
     current_date = start_date
     base_score = 75
     
     while current_date <= end_date:
-        score = base_score + random.uniform(-5, 10)
-        base_score = min(95, base_score + 0.2)  # 逐渐提升
-        
-        data.append(type('MockTrendData', (), {
-            'record_date': current_date,
-            'cumulative_avg_score': score,
-            'professional_score': score + random.uniform(-3, 3),
-            'expression_score': score + random.uniform(-2, 2),
-            'logic_score': score + random.uniform(-4, 4)
-        }))
-        
-        current_date += timedelta(days=1)
+        score = min(100, base_score + random.uniform(-5, 10))
+        base_score = min(95, base_score + 0.2 * step)  # 逐渐提升
+        data.append((current_date, score))
+        # 对齐到下一个时间段的起点（按月时为下个月1号），和真实数据一致
+        current_date = trend_rollups.bucket_start(current_date + timedelta(days=step), granularity)
     
-    return data
+    return data[-settings.TREND_MAX_POINTS:]
 
 def generate_performance_summary(scores: dict) -> str:
     """生成表现总结"""
@@ -1,109 +1,179 @@
 # app/api/questions.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, select, case
 from typing import List, Optional
 import json
 
-from app.db.database import get_db
+from app.db.database import get_async_db
 # 👇 --- 修改点 1: 导入新的、更安全的函数 ---
 from app.core.security import get_current_active_user
+from app.core.pagination import keyset_paginate, cached_count, count_rows, encode_cursor, decode_cursor
 from app.models.user import User  # 确保导入User模型
 from app.models.question import Question, QuestionCategory, UserQuestionProgress
+from app.services import search_service
+from app.services.view_counter import view_counter
+from app.services.question_catalog import load_questions, question_catalog
 
 # 创建路由器
 router = APIRouter()
 
 @router.get("/")
-def get_questions(
+async def get_questions(
     # 这个接口是公开的，所以不需要用户认证
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     category: Optional[str] = Query(None, description="分类筛选"),
     difficulty: Optional[str] = Query(None, description="难度筛选"),
     search: Optional[str] = Query(None, description="搜索关键词"),
     tags: Optional[str] = Query(None, description="标签筛选，逗号分隔"),
     page: int = Query(1, ge=1, description="页码"),
-    page_size: int = Query(10, ge=1, le=50, description="每页数量")
+    page_size: int = Query(10, ge=1, le=50, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传上一页返回的 next_cursor"),
+    with_total: bool = Query(False, description="游标分页时是否返回（缓存的）总数")
 ):
     """
     获取题目列表
     GET /api/v1/questions
+    
+    两种分页方式：
+    - page/page_size：传统页码分页，返回精确总数
+    - cursor：游标分页（?cursor= 开启），按 (排序键, id) seek，深分页不变慢
     """
     try:
-        # 构建查询
-        query = db.query(Question).filter(Question.is_active == True)
-        
-        # 分类筛选
-        if category:
-            query = query.filter(Question.category == category)
-        
-        # 难度筛选
-        if difficulty:
-            query = query.filter(Question.difficulty == difficulty)
-        
-        # 搜索 - SQLite兼容的不区分大小写搜索
-        if search:
-            from sqlalchemy import func
+        # 题库快照（已解码的活跃题目，按 id 升序）
+        snapshot = await question_catalog.get_async(db)
+        tag_list = [tag.strip() for tag in tags.split(',')] if tags else None
+        next_cursor = None
+        
+        if not search:
+            # 无搜索词：直接在快照中筛选和分页
+            items = snapshot.filter(category or None, difficulty or None, tag_list)
+            total = len(items)
             
-            # 转换为小写进行不区分大小写搜索
-            search_lower = f'%{search.lower()}%'
+            if cursor is not None:
+                last_id = decode_cursor(cursor)[-1] if cursor else None
+                questions, has_more = snapshot.page_after(items, last_id, page_size)
+                if has_more:
+                    next_cursor = encode_cursor([questions[-1].id])
+            else:
+                offset = (page - 1) * page_size
+                questions = items[offset:offset + page_size]
+        else:
+            # 有搜索词：在数据库中检索出题目ID，再从快照取题目内容
+            query = select(Question.id).where(Question.is_active == True)
             
-            # 使用 func.lower() 确保不区分大小写
-            search_filter = or_(
-                func.lower(Question.title).like(search_lower),
-                func.lower(Question.description).like(search_lower),
-                func.lower(Question.answer).like(search_lower),
-                func.lower(Question.tags).like(search_lower),
-                func.lower(Question.category).like(search_lower),
-                func.lower(Question.sub_category).like(search_lower),
-                func.lower(Question.key_points).like(search_lower),
-                func.lower(Question.related_topics).like(search_lower)
-            )
-            query = query.filter(search_filter)
-        
-        # 标签筛选
-        if tags:
-            tag_list = tags.split(',')
-            for tag in tag_list:
-                query = query.filter(Question.tags.contains(tag.strip()))
-        
-        # 计算总数
-        total = query.count()
-        
-        # 分页
-        offset = (page - 1) * page_size
-        questions = query.offset(offset).limit(page_size).all()
+            # 分类筛选
+            if category:
+                query = query.where(Question.category == category)
+            
+            # 难度筛选
+            if difficulty:
+                query = query.where(Question.difficulty == difficulty)
+            
+            # 搜索 - 优先使用全文检索索引（BM25排序），不可用时回退到LIKE
+            search_subquery = None
+            if search_service.is_available():
+                search_subquery = search_service.search_subquery(search)
+            
+            if search_subquery is not None:
+                query = query.join(
+                    search_subquery, search_subquery.c.question_id == Question.id
+                )
+            else:
+                # 转换为小写进行不区分大小写搜索
+                search_lower = f'%{search.lower()}%'
+                
+                # 使用 func.lower() 确保不区分大小写
+                search_filter = or_(
+                    func.lower(Question.title).like(search_lower),
+                    func.lower(Question.description).like(search_lower),
+                    func.lower(Question.answer).like(search_lower),
+                    func.lower(Question.tags).like(search_lower),
+                    func.lower(Question.category).like(search_lower),
+                    func.lower(Question.sub_category).like(search_lower),
+                    func.lower(Question.key_points).like(search_lower),
+                    func.lower(Question.related_topics).like(search_lower)
+                )
+                query = query.where(search_filter)
+            
+            # 标签筛选
+            if tag_list:
+                for tag in tag_list:
+                    query = query.where(Question.tags.contains(tag))
+            
+            sort_column = search_subquery.c.rank if search_subquery is not None else None
+            
+            if cursor is not None:
+                # 游标分页：按相关度（搜索时）或 id 排序
+                question_ids, next_cursor = await keyset_paginate(
+                    db, query, Question.id, cursor, page_size, sort_column=sort_column
+                )
+                if with_total:
+                    total = await cached_count(
+                        ("questions", category, difficulty, search, tags),
+                        lambda: count_rows(db, query)
+                    )
+            else:
+                # 计算总数
+                total = await count_rows(db, query)
+                
+                # 分页
+                if sort_column is not None:
+                    query = query.order_by(sort_column, Question.id)
+                offset = (page - 1) * page_size
+                result = await db.execute(query.offset(offset).limit(page_size))
+                question_ids = list(result.scalars())
+            
+            # 题目内容从快照取；快照尚未包含的新题目从数据库补读，保证本页条数与总数一致
+            found = {qid: snapshot.get(qid) for qid in question_ids}
+            missing = [qid for qid, q in found.items() if q is None]
+            if missing:
+                found.update(await load_questions(db, missing))
+            questions = [found[qid] for qid in question_ids if found.get(qid) is not None]
+        
+        # 计数字段不在快照中，按本页题目ID一次读取最新值（加上尚未写回的浏览数）
+        counters = {}
+        if questions:
+            counters = {
+                qid: (views or 0, stars or 0)
+                for qid, views, stars in (await db.execute(
+                    select(Question.id, Question.views, Question.stars)
+                    .where(Question.id.in_([q.id for q in questions]))
+                )).all()
+            }
         
         # 转换数据格式
         question_list = []
         for q in questions:
-            question_data = {
-                "id": q.id,
-                "title": q.title,
-                "description": q.description,
-                "category": q.category,
-                "sub_category": q.sub_category,
-                "difficulty": q.difficulty,
-                "tags": json.loads(q.tags) if q.tags else [],
-                "views": q.views,
-                "stars": q.stars,
-                "is_featured": q.is_featured,
-                "created_at": q.created_at.strftime("%Y-%m-%d %H:%M:%S") if q.created_at else None
-            }
-            question_list.append(question_data)
+            views, stars = counters.get(q.id, (0, 0))
+            question_list.append(q.to_list_item(views + view_counter.pending_for(q.id), stars))
         
-        return {
-            "code": 200,
-            "data": {
+        if cursor is not None:
+            data = {
+                "list": question_list,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+                "page_size": page_size
+            }
+            if with_total:
+                data["total"] = total
+        else:
+            data = {
                 "list": question_list,
                 "total": total,
                 "page": page,
                 "page_size": page_size,
                 "total_pages": (total + page_size - 1) // page_size
-            },
+            }
+        
+        return {
+            "code": 200,
+            "data": data,
             "message": "获取题目列表成功"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ 获取题目列表失败: {str(e)}")
         raise HTTPException(
@@ -112,9 +182,9 @@ def get_questions(
         )
 
 @router.get("/{question_id}")
-def get_question_detail(
+async def get_question_detail(
     question_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # 👇 --- 修改点 2: 使用新的依赖 ---
     current_user: User = Depends(get_current_active_user)
 ):
@@ -123,11 +193,8 @@ def get_question_detail(
     GET /api/v1/questions/{question_id}
     """
     try:
-        # 查找题目
-        question = db.query(Question).filter(
-            Question.id == question_id,
-            Question.is_active == True
-        ).first()
+        # 从题库快照查找题目
+        question = (await question_catalog.get_async(db)).get(question_id)
         
         if not question:
             raise HTTPException(
@@ -135,15 +202,29 @@ def get_question_detail(
                 detail="题目不存在"
             )
         
-        # 增加浏览次数
-        question.views += 1
+        # 计数字段不在快照中维护，单独读取最新值（快照可能过期，题目已被删除时同样返回404）
+        counters = (await db.execute(
+            select(Question.views, Question.stars).where(Question.id == question_id)
+        )).first()
+        if counters is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="题目不存在"
+            )
+        views, stars = counters
+        
+        # 增加浏览次数（写缓冲，批量写回数据库）
+        view_counter.increment(question_id)
         
         # 查找用户学习进度
-        progress = db.query(UserQuestionProgress).filter(
-            UserQuestionProgress.user_id == current_user.id,
-            UserQuestionProgress.question_id == question_id
-        ).first()
+        progress = (await db.execute(
+            select(UserQuestionProgress).where(
+                UserQuestionProgress.user_id == current_user.id,
+                UserQuestionProgress.question_id == question_id
+            )
+        )).scalars().first()
         
+        # 只有首次查看时才需要写库
         if not progress:
             # 创建新的学习进度记录
             progress = UserQuestionProgress(
@@ -152,11 +233,11 @@ def get_question_detail(
                 is_viewed=True
             )
             db.add(progress)
-        else:
+            await db.commit()
+        elif not progress.is_viewed:
             # 更新查看状态
             progress.is_viewed = True
-        
-        db.commit()
+            await db.commit()
         
         # 返回题目详情
         question_detail = {
@@ -166,13 +247,13 @@ def get_question_detail(
             "category": question.category,
             "sub_category": question.sub_category,
             "difficulty": question.difficulty,
-            "tags": json.loads(question.tags) if question.tags else [],
+            "tags": list(question.tags),
             "answer": question.answer,
-            "keyPoints": json.loads(question.key_points) if question.key_points else [],
-            "relatedTopics": json.loads(question.related_topics) if question.related_topics else [],
+            "keyPoints": list(question.key_points),
+            "relatedTopics": list(question.related_topics),
             "interviewerPerspective": question.interviewer_perspective,
-            "views": question.views,
-            "stars": question.stars,
+            "views": (views or 0) + view_counter.pending_for(question_id),
+            "stars": stars,
             "collected": progress.is_collected if progress else False,
             "mastered": progress.is_mastered if progress else False
         }
@@ -193,9 +274,9 @@ def get_question_detail(
         )
 
 @router.post("/{question_id}/collect")
-def toggle_collect_question(
+async def toggle_collect_question(
    question_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # 👇 --- 修改点 3: 使用新的依赖 ---
     current_user: User = Depends(get_current_active_user)
 ):
@@ -205,10 +286,12 @@ def toggle_collect_question(
     """
     try:
         # 检查题目是否存在
-        question = db.query(Question).filter(
-            Question.id == question_id,
-            Question.is_active == True
-        ).first()
+        question = (await db.execute(
+            select(Question).where(
+                Question.id == question_id,
+                Question.is_active == True
+            )
+        )).scalars().first()
         
         if not question:
             raise HTTPException(
@@ -217,10 +300,12 @@ def toggle_collect_question(
             )
         
         # 查找或创建学习进度
-        progress = db.query(UserQuestionProgress).filter(
-            UserQuestionProgress.user_id == current_user.id,
-            UserQuestionProgress.question_id == question_id
-        ).first()
+        progress = (await db.execute(
+            select(UserQuestionProgress).where(
+                UserQuestionProgress.user_id == current_user.id,
+                UserQuestionProgress.question_id == question_id
+            )
+        )).scalars().first()
         
         if not progress:
             progress = UserQuestionProgress(
@@ -242,7 +327,7 @@ def toggle_collect_question(
             else:
                 question.stars = max(0, question.stars - 1)
         
-        db.commit()
+        await db.commit()
         
         return {
             "code": 200,
@@ -263,32 +348,14 @@ def toggle_collect_question(
         )
 
 @router.get("/categories/list")
-def get_question_categories(db: Session = Depends(get_db)):
+async def get_question_categories(db: AsyncSession = Depends(get_async_db)):
     """
     获取题目分类列表
     GET /api/v1/questions/categories/list
     """
     try:
-        categories = db.query(QuestionCategory).filter(
-            QuestionCategory.is_active == True
-        ).order_by(QuestionCategory.sort_order).all()
-        
-        category_list = []
-        for category in categories:
-            # 统计该分类下的题目数量
-            question_count = db.query(Question).filter(
-                Question.category == category.name,
-                Question.is_active == True
-            ).count()
-            
-            category_data = {
-                "id": category.name.lower(),
-                "name": category.name,
-                "description": category.description,
-                "icon": category.icon or "Document",
-                "count": question_count
-            }
-            category_list.append(category_data)
+        # 分类及题目数由 category_cache 用一条 GROUP BY 统计，随题库快照按版本号刷新
+        category_list = (await question_catalog.get_async(db)).category_list
         
         return {
             "code": 200,
@@ -304,8 +371,8 @@ def get_question_categories(db: Session = Depends(get_db)):
         )
 
 @router.get("/stats/user")
-def get_user_study_stats(
-    db: Session = Depends(get_db),
+async def get_user_study_stats(
+    db: AsyncSession = Depends(get_async_db),
     # 👇 --- 修改点 4: 使用新的依赖 ---
     current_user: User = Depends(get_current_active_user)
 ):
@@ -314,21 +381,18 @@ def get_user_study_stats(
     GET /api/v1/questions/stats/user
     """
     try:
-        # 统计学习数据
-        total_progress = db.query(UserQuestionProgress).filter(
-            UserQuestionProgress.user_id == current_user.id
-        )
-        
-        studied = total_progress.filter(UserQuestionProgress.is_viewed == True).count()
-        mastered = total_progress.filter(UserQuestionProgress.is_mastered == True).count()
-        collected = total_progress.filter(UserQuestionProgress.is_collected == True).count()
-        
-        # 计算总练习次数
-        total_practice = db.query(
-            db.func.sum(UserQuestionProgress.practice_count)
-        ).filter(
-            UserQuestionProgress.user_id == current_user.id
-        ).scalar() or 0
+        # 统计学习数据和总练习次数（一次聚合查询）
+        row = (await db.execute(
+            select(
+                func.count(case((UserQuestionProgress.is_viewed == True, 1))),
+                func.count(case((UserQuestionProgress.is_mastered == True, 1))),
+                func.count(case((UserQuestionProgress.is_collected == True, 1))),
+                func.sum(UserQuestionProgress.practice_count)
+            ).where(UserQuestionProgress.user_id == current_user.id)
+        )).one()
+        
+        studied, mastered, collected = row[0], row[1], row[2]
+        total_practice = row[3] or 0
         
         # 模拟学习时长和正确率（这里可以根据实际业务逻辑调整）
         hours = round(total_practice * 0.5, 1)  # 假设每次练习0.5小时
@@ -1,100 +1,141 @@
 # app/api/resumes.py
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import defer
+from typing import List, Optional
 import os
-import uuid
 from datetime import datetime
 
-from app.db.database import get_db
+import anyio
+
+from app.db.database import get_async_db
 # 👇 --- 修改点 1: 导入新的、更安全的函数 ---
 from app.core.security import get_current_active_user
+from app.core.pagination import keyset_paginate
+from app.core.file_response import (
+    RangeFileResponse, content_disposition, http_date, is_not_modified, parse_range, range_applies
+)
 from app.models.user import User  # 确保导入User模型以在依赖中使用
-from app.models.resume import Resume
+from app.models.resume import Resume, ResumeParseJob, ResumeStorageUsage
 from app.core.config import settings
+from app.services import resume_parsing, storage_quota
+from app.services.blob_store import resume_blobs
+from app.services.resume_parsing import resume_parser_pool
+from app.services.resume_previews import can_render_thumbnail, preview_cache, preview_key, preview_worker
+from app.services.resume_upload import UploadError, UploadTooLarge, receive_upload
+from app.services.skill_matching import skill_index
 
 # 创建路由器
 router = APIRouter()
 
 # 允许的文件类型
 ALLOWED_EXTENSIONS = {'.pdf', '.doc', '.docx'}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_FILE_SIZE = settings.MAX_FILE_SIZE
+STORAGE_QUOTA = settings.RESUME_STORAGE_QUOTA
 
 def allowed_file(filename: str) -> bool:
     """检查文件类型是否允许"""
     return '.' in filename and os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
 
-def get_file_size(file: UploadFile) -> int:
-    """获取上传文件大小"""
-    file.file.seek(0, 2)  # 移动到文件末尾
-    size = file.file.tell()  # 获取当前位置（即文件大小）
-    file.file.seek(0)  # 重置到文件开头
-    return size
+# OpenAPI 中的请求体说明（接口直接读取请求流，不经过 UploadFile）
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}}
+                }
+            }
+        }
+    }
+}
 
-@router.post("/")
+@router.post("/", openapi_extra=UPLOAD_REQUEST_BODY)
 async def upload_resume(
-    file: UploadFile = File(...),
+    request: Request,
     # 👇 --- 修改点 2: 在所有需要用户认证的接口中，使用新的依赖 ---
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     上传简历
     POST /api/v1/resumes
+    
+    文件按块流式接收并写盘，超过大小上限或剩余存储配额立即中止；按内容哈希存放，相同文件只保留一份
     """
+    stored = None
     try:
-        # 验证文件
-        if not file.filename:
+        remaining = STORAGE_QUOTA - await storage_quota.get_usage(db, current_user.id)
+        if remaining <= 0:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="没有选择文件"
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"简历存储空间已满（上限{STORAGE_QUOTA // (1024 * 1024)}MB），请先删除不需要的简历"
             )
+        max_size = min(MAX_FILE_SIZE, remaining)
         
-        if not allowed_file(file.filename):
+        try:
+            stored = await receive_upload(request, resume_blobs.temp_dir, ALLOWED_EXTENSIONS, max_size=max_size)
+        except UploadTooLarge:
+            if max_size < MAX_FILE_SIZE:
+                detail = f"简历存储空间不足，剩余{remaining / (1024 * 1024):.1f}MB"
+            else:
+                detail = f"文件太大，最大支持{MAX_FILE_SIZE // (1024 * 1024)}MB"
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="不支持的文件类型，只支持 PDF、DOC、DOCX 格式"
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=detail
             )
-        
-        # 检查文件大小
-        file_size = get_file_size(file)
-        if file_size > MAX_FILE_SIZE:
+        except UploadError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="文件太大，最大支持10MB"
+                detail=str(e)
             )
         
-        # 生成唯一文件名
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        stored_filename = f"{uuid.uuid4().hex}{file_ext}"
-        
-        # 确保上传目录存在
-        upload_dir = os.path.join(settings.UPLOAD_FOLDER, "resumes")
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # 保存文件
-        file_path = os.path.join(upload_dir, stored_filename)
-        
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # 创建数据库记录
-        resume = Resume(
-            user_id=current_user.id,
-            filename=file.filename,
-            stored_filename=stored_filename,
-            file_path=file_path,
-            file_size=file_size,
-            file_type=file_ext[1:],  # 去掉点号
-            is_active=False  # 默认不激活
-        )
+        # 与其他上传并发时，在事务内按配额预留空间（同一事务插入记录）
+        if not await storage_quota.reserve(db, current_user.id, stored.size, STORAGE_QUOTA):
+            await db.rollback()
+            os.remove(stored.temp_path)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="简历存储空间不足，请先删除不需要的简历"
+            )
         
-        db.add(resume)
-        db.commit()
-        db.refresh(resume)
+        # 按内容哈希存放，相同文件只保留一份；放入文件和提交记录在同一把哈希锁内完成
+        # （进程在两者之间崩溃留下的孤儿文件由 reconcile_resume_files 清理）
+        async with resume_blobs.locked(stored.sha256):
+            file_path = await resume_blobs.adopt(stored.temp_path, stored.sha256)
+            stored.temp_path = None
+            
+            # 创建数据库记录
+            resume = Resume(
+                user_id=current_user.id,
+                filename=stored.filename,
+                stored_filename=stored.sha256,
+                file_path=file_path,
+                file_size=stored.size,
+                file_type=stored.extension[1:],  # 去掉点号
+                content_hash=stored.sha256,
+                is_active=False  # 默认不激活
+            )
+            
+            db.add(resume)
+            try:
+                await db.flush()
+                await resume_parsing.enqueue(db, resume)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                # 没有记录引用时删掉刚放入的文件
+                await resume_blobs.release(db, stored.sha256)
+                raise
+        await db.refresh(resume)
+        resume_parser_pool.notify()
         
-        print(f"✅ 用户 {current_user.username} 上传简历成功: {file.filename}")
+        print(f"✅ 用户 {current_user.username} 上传简历成功: {stored.filename}")
         
         return {
             "code": 200,
@@ -103,6 +144,7 @@ async def upload_resume(
                 "filename": resume.filename,
                 "file_size": resume.file_size,
                 "file_type": resume.file_type,
+                "content_hash": resume.content_hash,
                 "upload_time": resume.created_at.isoformat(),
                 "is_active": resume.is_active
             },
@@ -113,29 +155,53 @@ async def upload_resume(
         raise
     except Exception as e:
         print(f"简历上传失败: {str(e)}")
-        # 如果出错，删除已保存的文件
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
+        # 如果出错，删除尚未放入存储的临时文件
+        if stored is not None and stored.temp_path and os.path.exists(stored.temp_path):
+            os.remove(stored.temp_path)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"上传失败: {str(e)}"
         )
 
 @router.get("/")
-def get_resumes(
+async def get_resumes(
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传上一页返回的 next_cursor"),
+    page_size: int = Query(20, ge=1, le=100, description="游标分页时每页数量"),
     # 👇 --- 修改点 3 ---
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取用户的简历列表
     GET /api/v1/resumes
+    GET /api/v1/resumes?cursor=&page_size=20  (游标分页)
+    
+    每项带预览缩略图地址和文本摘要（不加载解析出的全文），没有预览的已解析简历交给后台生成
     """
     try:
-        resumes = db.query(Resume).filter(Resume.user_id == current_user.id).order_by(Resume.created_at.desc()).all()
+        base_query = (
+            select(Resume)
+            .where(Resume.user_id == current_user.id)
+            .options(defer(Resume.parsed_content))
+        )
+        
+        next_cursor = None
+        if cursor is not None:
+            resumes, next_cursor = await keyset_paginate(
+                db, base_query, Resume.id, cursor, page_size,
+                sort_column=Resume.created_at, descending=True, sort_as_text=True
+            )
+        else:
+            resumes = (await db.execute(
+                base_query.order_by(Resume.created_at.desc())
+            )).scalars().all()
         
         resume_list = []
+        missing_previews = []
         for resume in resumes:
+            preview = preview_cache.peek(preview_key(resume.id, resume.content_hash))
+            if resume.is_parsed and (preview is None or not preview.snippet):
+                missing_previews.append(resume.id)
             resume_data = {
                 "id": resume.id,
                 "filename": resume.filename,
@@ -144,7 +210,9 @@ def get_resumes(
                 "file_type": resume.file_type,
                 "upload_time": resume.created_at.strftime("%Y-%m-%d %H:%M:%S"),
                 "is_active": resume.is_active,
-                "is_parsed": resume.is_parsed
+                "is_parsed": resume.is_parsed,
+                "preview_url": f"{settings.API_V1_STR}/resumes/{resume.id}/preview" if preview else None,
+                "snippet": preview.snippet if preview else None
             }
             
             # 如果有解析数据，添加到响应中
@@ -157,12 +225,28 @@ def get_resumes(
             
             resume_list.append(resume_data)
         
+        preview_worker.enqueue(missing_previews)
+        
+        if cursor is not None:
+            return {
+                "code": 200,
+                "data": {
+                    "list": resume_list,
+                    "next_cursor": next_cursor,
+                    "has_more": next_cursor is not None,
+                    "page_size": page_size
+                },
+                "message": "获取简历列表成功"
+            }
+        
         return {
             "code": 200,
             "data": resume_list,
             "message": "获取简历列表成功"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"获取简历列表失败: {str(e)}")
         raise HTTPException(
@@ -170,22 +254,270 @@ def get_resumes(
             detail=f"获取简历列表失败: {str(e)}"
         )
 
+@router.get("/usage")
+async def get_storage_usage(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取简历存储用量
+    GET /api/v1/resumes/usage
+    """
+    try:
+        usage = (await db.execute(
+            select(ResumeStorageUsage.bytes_used, ResumeStorageUsage.file_count)
+            .where(ResumeStorageUsage.user_id == current_user.id)
+        )).first()
+        bytes_used, file_count = usage if usage else (0, 0)
+        
+        return {
+            "code": 200,
+            "data": {
+                "bytes_used": bytes_used,
+                "file_count": file_count,
+                "quota": STORAGE_QUOTA,
+                "bytes_available": max(0, STORAGE_QUOTA - bytes_used)
+            },
+            "message": "获取存储用量成功"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"获取存储用量失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取存储用量失败: {str(e)}"
+        )
+
+# 下载/预览时的 Content-Type
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "doc": "application/msword",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+# 同一份简历的内容不会变化（按内容哈希存储），浏览器可以长期缓存
+DOWNLOAD_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+@router.api_route("/{resume_id}/file", methods=["GET", "HEAD"])
+async def download_resume(
+    resume_id: int,
+    request: Request,
+    disposition: str = Query("attachment", pattern="^(attachment|inline)$", description="attachment 下载，inline 在浏览器中预览"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    下载或预览简历文件
+    GET /api/v1/resumes/{resume_id}/file?disposition=inline
+    
+    支持 Range（PDF 阅读器按需加载页面）、ETag（内容哈希）和 If-None-Match / If-Modified-Since 304
+    """
+    try:
+        row = (await db.execute(
+            select(Resume.filename, Resume.file_path, Resume.file_type, Resume.content_hash).where(
+                Resume.id == resume_id,
+                Resume.user_id == current_user.id
+            )
+        )).first()
+        
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="简历不存在"
+            )
+        filename, file_path, file_type, content_hash = row
+        
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, file_path)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="简历文件不存在"
+            )
+        size, last_modified = stat_result.st_size, int(stat_result.st_mtime)
+        etag = f'"{content_hash}"' if content_hash else f'W/"{size:x}-{last_modified:x}"'
+        headers = {
+            "etag": etag,
+            "last-modified": http_date(last_modified),
+            "cache-control": DOWNLOAD_CACHE_CONTROL,
+        }
+        
+        if is_not_modified(request.headers, etag, last_modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        byte_range = None
+        if range_applies(request.headers, etag, last_modified):
+            try:
+                byte_range = parse_range(request.headers.get("range"), size)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    detail="请求的范围无效",
+                    headers={"Content-Range": f"bytes */{size}"}
+                )
+        
+        headers["content-disposition"] = content_disposition(disposition, filename)
+        return RangeFileResponse(
+            file_path, size, byte_range, headers=headers,
+            media_type=MEDIA_TYPES.get(file_type, "application/octet-stream")
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"下载简历失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"下载简历失败: {str(e)}"
+        )
+
+@router.get("/{resume_id}/preview")
+async def get_resume_preview(
+    resume_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取简历首页缩略图（PNG 或 SVG）
+    GET /api/v1/resumes/{resume_id}/preview
+    
+    预览尚未生成时返回 202 并交给后台生成，客户端稍后重试
+    """
+    try:
+        row = (await db.execute(
+            select(Resume.content_hash, Resume.file_type, Resume.is_parsed).where(
+                Resume.id == resume_id,
+                Resume.user_id == current_user.id
+            )
+        )).first()
+        
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="简历不存在"
+            )
+        
+        key = preview_key(resume_id, row.content_hash)
+        preview = preview_cache.get(key)
+        stat_result = None
+        if preview is not None:
+            try:
+                stat_result = await anyio.to_thread.run_sync(os.stat, preview.image_path)
+            except FileNotFoundError:
+                preview_cache.discard(key)
+        
+        if stat_result is None:
+            if not row.is_parsed and not can_render_thumbnail(row.file_type):
+                # 解析已失败的简历没有可用于生成预览的内容
+                parse_status = (await db.execute(
+                    select(ResumeParseJob.status)
+                    .where(ResumeParseJob.resume_id == resume_id)
+                    .order_by(ResumeParseJob.id.desc()).limit(1)
+                )).scalar()
+                if parse_status in ("failed", "quarantined"):
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="该简历无法生成预览"
+                    )
+            preview_worker.enqueue([resume_id])
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"code": 202, "data": {"status": "pending"}, "message": "预览生成中，请稍后重试"},
+                headers={"Retry-After": "2"}
+            )
+        
+        etag = f'"{key}"'
+        last_modified = int(stat_result.st_mtime)
+        headers = {
+            "etag": etag,
+            "last-modified": http_date(last_modified),
+            "cache-control": DOWNLOAD_CACHE_CONTROL,
+        }
+        if is_not_modified(request.headers, etag, last_modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return RangeFileResponse(preview.image_path, stat_result.st_size, headers=headers, media_type=preview.media_type)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"获取简历预览失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取简历预览失败: {str(e)}"
+        )
+
+@router.get("/{resume_id}/position-matches")
+async def get_position_matches(
+    resume_id: int,
+    top_k: int = Query(5, ge=1, le=50, description="返回匹配度最高的前几个岗位"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    按技能匹配度为简历推荐岗位
+    GET /api/v1/resumes/{resume_id}/position-matches?top_k=5
+    
+    匹配度为岗位技能的加权覆盖率（必需技能权重更高），同时返回已掌握和欠缺的技能
+    """
+    try:
+        is_parsed = (await db.execute(
+            select(Resume.is_parsed).where(
+                Resume.id == resume_id,
+                Resume.user_id == current_user.id
+            )
+        )).scalar()
+        
+        if is_parsed is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="简历不存在"
+            )
+        if not is_parsed:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="简历尚未解析完成，请稍后再试"
+            )
+        
+        snapshot = await skill_index.get_async(db)
+        if resume_id not in snapshot.resumes:
+            # 其他进程刚解析完成，索引还没有这份简历：只增量计入这一份，不全量重建
+            snapshot = await db.run_sync(skill_index.update_resumes, [resume_id]) or snapshot
+        
+        return {
+            "code": 200,
+            "data": snapshot.top_positions(resume_id, top_k),
+            "message": "获取岗位匹配成功"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"获取岗位匹配失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取岗位匹配失败: {str(e)}"
+        )
+
 @router.delete("/{resume_id}")
-def delete_resume(
+async def delete_resume(
     resume_id: int,
     # 👇 --- 修改点 4 ---
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     删除简历
     DELETE /api/v1/resumes/{resume_id}
     """
     try:
-        resume = db.query(Resume).filter(
-            Resume.id == resume_id,
-            Resume.user_id == current_user.id
-        ).first()
+        resume = (await db.execute(
+            select(Resume).where(
+                Resume.id == resume_id,
+                Resume.user_id == current_user.id
+            )
+        )).scalars().first()
         
         if not resume:
             raise HTTPException(
@@ -193,12 +525,18 @@ def delete_resume(
                 detail="简历不存在"
             )
         
-        # 删除文件
-        if os.path.exists(resume.file_path):
-            os.remove(resume.file_path)
+        content_hash, file_path = resume.content_hash, resume.file_path
+        await db.execute(delete(ResumeParseJob).where(ResumeParseJob.resume_id == resume.id))
+        await storage_quota.release(db, current_user.id, resume.file_size)
+        await db.delete(resume)
+        await db.commit()
+        skill_index.remove_resume(resume_id)
         
-        db.delete(resume)
-        db.commit()
+        # 记录删除后再释放文件：同一文件没有其他简历引用时才删除（未迁移的旧文件直接删除）
+        if content_hash and file_path == resume_blobs.path_for(content_hash):
+            await resume_blobs.release(db, content_hash)
+        elif os.path.exists(file_path):
+            os.remove(file_path)
         
         print(f"✅ 用户 {current_user.username} 删除简历: {resume.filename}")
         
@@ -218,21 +556,23 @@ def delete_resume(
         )
 
 @router.put("/{resume_id}/activate")
-def set_active_resume(
+async def set_active_resume(
     resume_id: int,
     # 👇 --- 修改点 5 ---
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     设置默认简历
     PUT /api/v1/resumes/{resume_id}/activate
     """
     try:
-        resume = db.query(Resume).filter(
-            Resume.id == resume_id,
-            Resume.user_id == current_user.id
-        ).first()
+        resume = (await db.execute(
+            select(Resume).where(
+                Resume.id == resume_id,
+                Resume.user_id == current_user.id
+            )
+        )).scalars().first()
         
         if not resume:
             raise HTTPException(
@@ -240,10 +580,12 @@ def set_active_resume(
                 detail="简历不存在"
             )
         
-        db.query(Resume).filter(Resume.user_id == current_user.id).update({"is_active": False})
+        await db.execute(
+            update(Resume).where(Resume.user_id == current_user.id).values(is_active=False)
+        )
         
         resume.is_active = True
-        db.commit()
+        await db.commit()
         
         print(f"✅ 用户 {current_user.username} 设置默认简历: {resume.filename}")
         
@@ -17,7 +17,7 @@ def check_tables():
         
         expected_tables = [
             'users', 'user_profiles', 'resumes',
-            'questions', 'question_categories', 'user_question_progress',
+            'questions', 'question_categories', 'user_question_progress', 'catalog_versions',
             'interviews', 'interview_questions', 'interview_statistics', 'interview_trend_data'
         ]
         
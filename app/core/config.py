@@ -29,10 +29,35 @@ class Settings(BaseSettings):
     # 默认使用SQLite，如果需要使用PostgreSQL等，可以在.env文件中覆盖此项
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
     
+    # SQLite 生产模式：每个连接建立时设置以下 PRAGMA
+    SQLITE_PRODUCTION_MODE: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL 下读写互不阻塞
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 模式下 NORMAL 已能保证数据库不损坏
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 遇到写锁时等待的毫秒数，而不是立即报 database is locked
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 内存映射读取的字节数
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # 每个连接的页缓存大小（KB）
+    SQLITE_FOREIGN_KEYS: bool = True
+    
+    # 连接池（按数据库类型分别配置）
+    SQLITE_POOL_SIZE: int = 8
+    SQLITE_MAX_OVERFLOW: int = 16
+    DB_POOL_SIZE: int = 10  # PostgreSQL / MySQL 等
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # 等待空闲连接的秒数
+    DB_POOL_RECYCLE: int = 1800  # 连接最长复用秒数，避免被服务端断开
+    
     # === JWT设置 ===
     SECRET_KEY: str = os.getenv("SECRET_KEY", "a-super-secret-key-that-you-must-change")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # Token有效期为7天
+    TOKEN_CACHE_TTL: float = 60.0  # 已验证 token 的缓存秒数（多进程部署时也是用户停用生效的最长延迟）
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    
+    # === 密码哈希执行器 ===
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt 专用进程数
+    PASSWORD_HASH_MAX_PENDING: int = 32  # 排队 + 执行中的上限，超过返回503
+    PASSWORD_HASH_RETRY_AFTER: int = 2  # 503 响应的 Retry-After 秒数
+    PASSWORD_HASH_USE_PROCESSES: bool = True  # False 时改用线程池（bcrypt 计算时会释放 GIL）
     
     # === CORS配置 ===
     # 允许的前端源列表，用逗号分隔
@@ -45,6 +70,54 @@ class Settings(BaseSettings):
     # === 文件上传配置 ===
     UPLOAD_FOLDER: str = "./uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 256 * 1024  # 流式上传时凑满多少字节写一次盘
+    RESUME_STORAGE_QUOTA: int = 100 * 1024 * 1024  # 每个用户简历文件的总大小上限（按上传的文件大小计，不考虑去重）
+    ORPHAN_GRACE_SECONDS: int = 3600  # 孤儿文件清理时跳过多少秒内修改过的文件（可能是正在进行的上传）
+    
+    # === 题目浏览数写缓冲 ===
+    VIEW_COUNT_FLUSH_INTERVAL: float = 5.0  # 每隔多少秒写回一次
+    VIEW_COUNT_FLUSH_THRESHOLD: int = 500  # 累计多少次浏览立即写回
+    
+    # === 题库快照 ===
+    CATALOG_VERSION_CHECK_INTERVAL: float = 1.0  # 检查数据库题库版本号的最小间隔（秒）
+    
+    # === 面试题目计划缓存 ===
+    INTERVIEW_PLAN_CACHE_MAX_ENTRIES: int = 2000  # 最多缓存多少场面试的题目计划
+    INTERVIEW_PLAN_CACHE_TTL: float = 3600.0  # 缓存有效期（秒），覆盖一场面试的时长即可
+    
+    # === 答案评分任务 ===
+    SCORING_WORKERS: int = 2  # 并发评分的 worker 数
+    SCORING_USE_PROCESSES: bool = False  # True 使用进程池（CPU 密集的评分器），False 使用线程池（调用外部接口）
+    SCORING_POLL_INTERVAL: float = 1.0  # 没有新任务通知时轮询数据库的间隔（秒）
+    SCORING_BATCH_SIZE: int = 16  # 每次最多领取的任务数
+    SCORING_LEASE_SECONDS: int = 60  # 任务租约时长，进程崩溃后超过租约的任务会被重新领取
+    SCORING_JOB_TIMEOUT: float = 30.0  # 单个任务的评分超时（秒）
+    SCORING_MAX_ATTEMPTS: int = 3  # 最多尝试次数，超过后标记为 failed
+    
+    # === 简历解析 ===
+    RESUME_PARSE_WORKERS: int = 2  # 解析进程数（同时解析的文件数上限）
+    RESUME_PARSE_POLL_INTERVAL: float = 2.0  # 没有新任务通知时轮询数据库的间隔（秒）
+    RESUME_PARSE_LEASE_SECONDS: int = 120  # 任务租约时长，进程崩溃后超过租约的任务会被重新领取
+    RESUME_PARSE_TIMEOUT: float = 30.0  # 单个文件的解析超时（秒）
+    RESUME_PARSE_MAX_ATTEMPTS: int = 3  # 最多尝试次数，超过后隔离该文件
+    RESUME_PARSE_MAX_TASKS_PER_CHILD: int = 50  # 每个解析进程处理多少个文件后重启（释放解析库占用的内存）
+    
+    # === 简历预览 ===
+    PREVIEW_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 预览磁盘缓存的总大小上限，超出时按最近最少使用淘汰
+    PREVIEW_WIDTH: int = 240  # 缩略图宽度（像素）
+    PREVIEW_SNIPPET_LENGTH: int = 160  # 列表中文本摘要的最大长度
+    
+    # === 简历-岗位技能匹配 ===
+    SKILL_INDEX_REBUILD_INTERVAL: float = 300.0  # 技能匹配索引全量重建的间隔（秒），其他进程的简历/岗位变更在重建后生效
+    
+    # === 面试事件推送（SSE） ===
+    INTERVIEW_EVENTS_HEARTBEAT: float = 15.0  # 空闲时发送心跳的间隔（秒）
+    INTERVIEW_EVENTS_BUFFER: int = 100  # 每场面试保留多少条最近事件用于断线续传
+    INTERVIEW_EVENTS_RETENTION: float = 600.0  # 无订阅者的频道保留多久（秒）
+    INTERVIEW_EVENTS_MAX_CHANNELS: int = 5000  # 最多保留多少场面试的频道
+    
+    # === 趋势图 ===
+    TREND_MAX_POINTS: int = 30  # 趋势接口最多返回的数据点数，超过时合并相邻时间段
     
     class Config:
         case_sensitive = True
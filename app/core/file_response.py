@@ -0,0 +1,149 @@
+# app/core/file_response.py
+"""
+支持 Range 和条件请求的文件响应
+
+- 单个 Range（bytes=a-b / a- / -n）返回 206；多个 Range 时忽略，返回完整文件；不可满足时返回 416
+- If-Range 与当前 ETag / Last-Modified 不一致时忽略 Range
+- If-None-Match（优先）/ If-Modified-Since 命中时返回 304
+- 服务器支持 ASGI 的 http.response.zerocopy / http.response.pathsend 扩展时交给服务器用 sendfile 发送，
+  否则在线程中按块读取（uvicorn 目前不提供这两个扩展）
+"""
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    """Content-Disposition，非 ASCII 文件名使用 RFC 5987 编码"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """header 是否包含 etag（weak=True 时按弱比较，忽略 W/ 前缀）"""
+    if header.strip() == "*":
+        return True
+    strip = (lambda tag: tag[2:] if tag.startswith("W/") else tag) if weak else (lambda tag: tag)
+    if not weak and etag.startswith("W/"):
+        return False
+    return strip(etag) in (strip(tag.strip()) for tag in header.split(","))
+
+
+def _not_later_than(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return False
+    return int(last_modified) <= since
+
+
+def is_not_modified(request_headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    """条件 GET：If-None-Match 优先，没有时再看 If-Modified-Since"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag, weak=True)
+    if_modified_since = request_headers.get("if-modified-since")
+    return if_modified_since is not None and _not_later_than(if_modified_since, last_modified)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析 Range 头，返回闭区间 (start, end)；没有、格式不合法或不支持（多个区间、非 bytes 单位）时返回 None，
+    按普通 200 响应处理。格式合法但区间不可满足时抛出 ValueError。
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first == "" or first.isdigit()) or not (last == "" or last.isdigit()) or first == last == "":
+        return None
+    if first == "":
+        # 最后 n 个字节
+        length = int(last)
+        if length <= 0 or size == 0:
+            raise ValueError("unsatisfiable")
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("unsatisfiable")
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def range_applies(request_headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    """If-Range：与当前版本一致（强比较 ETag 或日期）时才按 Range 响应"""
+    if_range = request_headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return _etag_matches(if_range, etag, weak=False)
+    try:
+        return int(last_modified) == parsedate_to_datetime(if_range).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return False
+
+
+class RangeFileResponse(Response):
+    """发送文件的全部或一个区间"""
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, size: int, byte_range: Optional[Tuple[int, int]] = None,
+                 headers: Optional[Mapping[str, str]] = None, media_type: Optional[str] = None):
+        self.path = path
+        self.media_type = media_type
+        self.background = None
+        if byte_range is None:
+            self.status_code = 200
+            self.offset, self.count = 0, size
+        else:
+            self.status_code = 206
+            self.offset, self.count = byte_range[0], byte_range[1] - byte_range[0] + 1
+        self.init_headers(headers)
+        self.headers["content-length"] = str(self.count)
+        self.headers["accept-ranges"] = "bytes"
+        if byte_range is not None:
+            self.headers["content-range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope["method"].upper() == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif self.status_code == 200 and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": self.path})
+        elif "http.response.zerocopy" in extensions:
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send({"type": "http.response.zerocopy", "file": file,
+                            "offset": self.offset, "count": self.count, "more_body": False})
+            finally:
+                await anyio.to_thread.run_sync(file.close)
+        else:
+            remaining = self.count
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset, os.SEEK_SET)
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # 文件在发送过程中被截断
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -0,0 +1,168 @@
+# app/core/pagination.py
+"""
+游标（keyset）分页工具
+
+- 游标是 (排序键, id) 的不透明 base64 编码，翻页时按索引 seek，
+  不再需要 OFFSET 扫描前面的所有行
+- 总数可选，按查询条件缓存一段时间，避免每页都执行 COUNT
+"""
+import base64
+import json
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Date, DateTime, Select, String, and_, bindparam, func, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 总数缓存有效期（秒）
+COUNT_CACHE_TTL = 30
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+_count_cache: Dict[Any, Tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """将排序键编码为不透明游标"""
+    raw = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """解析游标，格式错误时返回400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(values, list) or not values:
+            raise ValueError("empty cursor")
+        return values
+    except (ValueError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
+
+def _encode_sort_value(value: Any) -> Any:
+    """时间类型的排序键在游标中保存为 ISO 格式字符串"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_sort_value(sort_column, value: Any) -> Any:
+    """按排序列的类型还原游标中的排序键，格式错误时返回400"""
+    column_type = getattr(sort_column, "type", None)
+    if isinstance(value, str) and isinstance(column_type, (DateTime, Date)):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的分页游标"
+            )
+        return parsed if isinstance(column_type, DateTime) else parsed.date()
+    return value
+
+
+async def keyset_paginate(
+    db: AsyncSession,
+    stmt: Select,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    sort_column=None,
+    descending: bool = False,
+    sort_as_text: bool = False,
+):
+    """
+    按 (sort_column, id_column) 做 keyset 分页。
+
+    参数:
+        stmt: 已包含筛选条件的 select 语句（不要自带 order_by / offset / limit）
+        cursor: 上一页返回的 next_cursor，空字符串或 None 表示第一页
+        sort_column: 排序列，为 None 时只按 id 排序
+        sort_as_text: 在 SQLite 上以数据库中的原始文本比较排序键（用于时间列，
+                      避免 Python datetime 与库中字符串格式不一致导致翻页重复）；
+                      其他数据库忽略此参数，时间排序键在游标中以 ISO 格式保存
+
+    返回:
+        (本页结果列表（每行第一列）, next_cursor)，没有更多数据时 next_cursor 为 None
+    """
+    sort_as_text = sort_as_text and db.get_bind().dialect.name == "sqlite"
+    sort_key = None
+    if sort_column is not None:
+        sort_key = type_coerce(sort_column, String) if sort_as_text else sort_column
+        stmt = stmt.add_columns(sort_key.label("_sort_key"))
+    stmt = stmt.add_columns(id_column.label("_id_key"))
+
+    if cursor:
+        values = decode_cursor(cursor)
+        last_id = values[-1]
+        if sort_key is None:
+            stmt = stmt.where(id_column < last_id if descending else id_column > last_id)
+        else:
+            if sort_as_text:
+                last_sort = bindparam("last_sort_key", values[0], type_=String)
+            else:
+                last_sort = bindparam("last_sort_key", _decode_sort_value(sort_column, values[0]))
+            if descending:
+                stmt = stmt.where(or_(
+                    sort_column < last_sort,
+                    and_(sort_column == last_sort, id_column < last_id)
+                ))
+            else:
+                stmt = stmt.where(or_(
+                    sort_column > last_sort,
+                    and_(sort_column == last_sort, id_column > last_id)
+                ))
+
+    order = []
+    if sort_column is not None:
+        order.append(sort_column.desc() if descending else sort_column.asc())
+    order.append(id_column.desc() if descending else id_column.asc())
+
+    rows = (await db.execute(stmt.order_by(*order).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        key = [last._id_key] if sort_column is None else [_encode_sort_value(last._sort_key), last._id_key]
+        next_cursor = encode_cursor(key)
+
+    return [row[0] for row in rows], next_cursor
+
+
+async def count_rows(db: AsyncSession, stmt: Select) -> int:
+    """统计 select 语句的结果行数"""
+    subquery = stmt.order_by(None).subquery()
+    return (await db.execute(select(func.count()).select_from(subquery))).scalar_one()
+
+
+async def cached_count(key: Any, count_fn: Callable[[], Awaitable[int]],
+                       ttl: int = COUNT_CACHE_TTL) -> int:
+    """
+    返回缓存的总数估计值，过期后重新执行 count_fn。
+    key 应包含所有影响结果的筛选条件。
+    """
+    now = time.monotonic()
+    with _count_cache_lock:
+        hit = _count_cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    total = await count_fn()
+
+    with _count_cache_lock:
+        if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+            # 先清理过期项，仍然过多则整体清空
+            for k in [k for k, (expires, _) in _count_cache.items() if expires <= now]:
+                del _count_cache[k]
+            if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+                _count_cache.clear()
+        _count_cache[key] = (now + ttl, total)
+    return total
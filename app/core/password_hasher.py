@@ -0,0 +1,136 @@
+# app/core/password_hasher.py
+"""
+密码哈希执行器
+
+bcrypt 每次哈希/校验要消耗约 200ms CPU。登录/注册高峰时如果直接在请求线程里执行，
+会占满线程池，拖慢所有其他接口。这里把哈希和校验放到独立的、大小固定的进程池中执行：
+- 同时排队 + 执行中的任务数有上限，超过时直接返回 503 并带 Retry-After，而不是无限排队
+- 暴露队列深度、拒绝次数、平均耗时等指标
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+# 密码哈希上下文
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    """在当前线程中生成密码哈希（执行器中的任务函数，也供脚本直接调用）"""
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """在当前线程中校验密码"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """有界的密码哈希执行器"""
+
+    def __init__(self, max_workers: int, max_pending: int, retry_after: int, use_processes: bool = True):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.use_processes = use_processes
+
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        # 指标
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self._total_ms = 0.0
+
+    def start(self):
+        """创建执行器（进程池在应用启动时创建，避免首个登录请求承担进程启动耗时）"""
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="password-hasher"
+                    )
+        return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="登录请求过多，请稍后重试",
+                    headers={"Retry-After": str(self.retry_after)}
+                )
+            self._pending += 1
+            self.peak_pending = max(self.peak_pending, self._pending)
+
+    async def _run(self, fn, *args):
+        self._acquire()
+        start = time.perf_counter()
+        try:
+            executor = self._executor or self.start()
+            result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self.completed += 1
+            self._total_ms += (time.perf_counter() - start) * 1000
+        return result
+
+    async def hash(self, password: str) -> str:
+        """生成密码哈希，执行器饱和时抛出 503"""
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """校验密码，执行器饱和时抛出 503"""
+        return await self._run(check_password, plain_password, hashed_password)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            pending = self._pending
+            completed = self.completed
+            avg_ms = self._total_ms / completed if completed else 0.0
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            # 执行中的任务最多等于进程数，其余在排队
+            "queue_depth": max(0, pending - self.max_workers),
+            "peak_pending": self.peak_pending,
+            "completed": completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "avg_ms": round(avg_ms, 2),
+        }
+
+
+# 全局唯一的密码哈希执行器
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+)
@@ -6,30 +6,26 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
 
 from app.db import database
-from app.db.repositories import user_repo # 确保你已经创建了这个repo文件
 from app.core.config import settings
+from app.core.password_hasher import check_password, hash_password
+from app.core.token_cache import UserSnapshot, token_cache
 from app.models.user import User
 
 
-# 密码哈希上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 方案，它会告诉FastAPI从哪里获取token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证明文密码和哈希密码是否匹配"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """验证明文密码和哈希密码是否匹配（同步，接口中请使用 password_hasher.verify）"""
+    return check_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """生成密码的哈希值"""
-    return pwd_context.hash(password)
+    """生成密码的哈希值（同步，接口中请使用 password_hasher.hash）"""
+    return hash_password(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -47,37 +43,45 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 # --- 修改开始 ---
 # 将 get_current_user 修改为 get_current_active_user 并增加逻辑
-def get_current_active_user(
-    token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(database.get_db)
-) -> User:
+async def get_current_active_user(token: str = Depends(oauth2_scheme)) -> UserSnapshot:
     """
     通过Token获取当前激活的用户。
     Token的'sub'字段现在应该包含 user_id。
+    
+    已验证过的 token 命中缓存时不再解码 JWT、也不查询数据库，
+    返回的是用户快照（id / username / email / is_active），不是 ORM 对象。
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无法验证凭据",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        # --- 修改点: 将 "sub" 解析为整数类型的 user_id ---
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        # 将 sub 从字符串转换为整数
-        token_data_id = int(user_id)
-    except (JWTError, ValueError): # 增加ValueError以捕获int转换失败
-        raise credentials_exception
     
-    # --- 修改点: 使用 user_id 从数据库获取用户 ---
-    user = user_repo.get_user_by_id(db, user_id=token_data_id)
+    user = token_cache.get(token)
     if user is None:
-        raise credentials_exception
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            # --- 修改点: 将 "sub" 解析为整数类型的 user_id ---
+            user_id = payload.get("sub")
+            if user_id is None:
+                raise credentials_exception
+            # 将 sub 从字符串转换为整数
+            token_data_id = int(user_id)
+        except (JWTError, ValueError): # 增加ValueError以捕获int转换失败
+            raise credentials_exception
+        
+        # --- 修改点: 使用 user_id 从数据库获取用户 ---
+        generation = token_cache.generation(token_data_id)
+        async with database.AsyncSessionLocal() as db:
+            db_user = await db.get(User, token_data_id)
+        if db_user is None:
+            raise credentials_exception
+        
+        user = UserSnapshot.from_user(db_user)
+        token_cache.put(token, user, payload.get("exp"), generation)
     
     if not user.is_active:
         raise HTTPException(status_code=400, detail="用户已被禁用")
         
     return user
-# --- 修改结束 ---
\ No newline at end of file
+# --- 修改结束 ---
@@ -0,0 +1,133 @@
+# app/core/token_cache.py
+"""
+已验证 Token 缓存
+
+认证依赖每次都要校验 JWT 签名并查询用户是否仍处于激活状态。
+这里按 token 缓存校验结果和一个轻量的用户快照，命中时既不解码 JWT 也不查库：
+- 有效期取 TOKEN_CACHE_TTL 与 token 自身 exp 中较早的一个
+- 超过容量时按 LRU 淘汰
+- 用户被激活/停用、资料被修改时按用户ID失效（只影响当前进程，
+  多进程部署时其他进程最多在 TTL 秒后感知）
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+class UserSnapshot:
+    """认证依赖返回的用户快照，只包含接口需要的字段（只读）"""
+    __slots__ = ("id", "username", "email", "is_active")
+
+    def __init__(self, id: int, username: str, email: str, is_active: bool):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_active = is_active
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(user.id, user.username, user.email, bool(user.is_active))
+
+
+class TokenCache:
+    """按 token 缓存用户快照的 TTL + LRU 缓存"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # token -> (过期时间, 用户快照)
+        self._entries: "OrderedDict[str, Tuple[float, UserSnapshot]]" = OrderedDict()
+        # user_id -> 该用户已缓存的 token
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        # user_id -> 失效次数；查库期间用户被失效时丢弃这次结果，避免写回旧快照
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+        # 指标
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= now:
+                self._remove(token, snapshot.id)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return snapshot
+
+    def generation(self, user_id: int) -> int:
+        """查库前记录，put 时传回"""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, token: str, snapshot: UserSnapshot, token_exp: Optional[float], generation: int):
+        """缓存校验结果；token_exp 为 JWT 的 exp（Unix 时间戳）"""
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            if self._generations.get(snapshot.id, 0) != generation:
+                return
+            old = self._entries.pop(token, None)
+            if old is not None:
+                self._tokens_by_user.get(old[1].id, set()).discard(token)
+            self._entries[token] = (expires_at, snapshot)
+            self._tokens_by_user.setdefault(snapshot.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest, (_, oldest_snapshot) = next(iter(self._entries.items()))
+                self._remove(oldest, oldest_snapshot.id)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """用户状态或资料变化后，清除该用户的全部缓存 token"""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop(token, None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token: str, user_id: int):
+        self._entries.pop(token, None)
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# 全局唯一的 Token 缓存
+token_cache = TokenCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.TOKEN_CACHE_TTL,
+)
@@ -0,0 +1,43 @@
+# app/db/backfill_interview_statistics.py
+"""
+重建所有用户的面试统计聚合（各维度次数/总和/平方和、平均分、EWMA）、评分分布直方图和趋势汇总
+在项目根目录运行: python -m app.db.backfill_interview_statistics [--batch-size 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.database import SessionLocal
+from app.services.interview_stats import backfill_statistics
+from app.services.trend_rollups import rebuild_trend_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建面试统计聚合")
+    parser.add_argument("--batch-size", type=int, default=1000, help="流式读取时每批的面试记录数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("📊 开始重建面试统计聚合...")
+        start = time.perf_counter()
+        users = backfill_statistics(db, batch_size=args.batch_size)
+        print(f"✅ 已重建 {users} 个用户的统计，耗时 {time.perf_counter() - start:.2f}s")
+        
+        start = time.perf_counter()
+        rows = rebuild_trend_rollups(db, batch_size=args.batch_size)
+        db.commit()
+        print(f"✅ 已重建 {rows} 个趋势汇总时间段，耗时 {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 重建统计失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
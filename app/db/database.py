@@ -1,18 +1,130 @@
-from sqlalchemy import create_engine
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
+# 同步URL对应的异步驱动
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """根据同步数据库URL推导异步驱动的URL（已指定驱动的保持不变）"""
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        raise ValueError(f"不支持的异步数据库类型: {parsed.drivername}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def is_sqlite_file(url: str) -> bool:
+    """是否是基于文件的 SQLite 数据库（内存库不使用连接池和 WAL）"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def get_sqlite_pragmas() -> dict:
+    """SQLite 生产模式下每个连接需要设置的 PRAGMA"""
+    if not settings.SQLITE_PRODUCTION_MODE:
+        return {}
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        # 负数表示以 KB 为单位
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "foreign_keys": "ON" if settings.SQLITE_FOREIGN_KEYS else "OFF",
+    }
+
+
+def install_sqlite_pragmas(sync_engine, pragmas: dict):
+    """通过 connect 事件在每个新连接上执行 PRAGMA（异步引擎传入 async_engine.sync_engine）"""
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def get_pool_options(url: str) -> dict:
+    """按数据库类型返回连接池参数"""
+    if is_sqlite_file(url):
+        return {
+            "pool_size": settings.SQLITE_POOL_SIZE,
+            "max_overflow": settings.SQLITE_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        }
+    if make_url(url).get_backend_name() == "sqlite":
+        # 内存库使用 SQLAlchemy 默认的单连接池
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def create_db_engine(url: str, sqlite_pragmas: Optional[dict] = None):
+    """创建同步引擎，sqlite_pragmas 为 None 时使用配置中的 SQLite 生产模式"""
+    # 如果使用SQLite，添加check_same_thread=False参数
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    sync_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        **get_pool_options(url)
+    )
+    if is_sqlite_file(url):
+        install_sqlite_pragmas(sync_engine, get_sqlite_pragmas() if sqlite_pragmas is None else sqlite_pragmas)
+    return sync_engine
+
+
+def create_async_db_engine(url: str, sqlite_pragmas: Optional[dict] = None):
+    """创建异步引擎；SQLite 文件库默认是 NullPool（每次请求新建连接和后台线程），这里改为连接池复用"""
+    options = get_pool_options(url)
+    if is_sqlite_file(url):
+        options["poolclass"] = AsyncAdaptedQueuePool
+    async_db_engine = create_async_engine(get_async_database_url(url), **options)
+    if is_sqlite_file(url):
+        install_sqlite_pragmas(
+            async_db_engine.sync_engine,
+            get_sqlite_pragmas() if sqlite_pragmas is None else sqlite_pragmas
+        )
+    return async_db_engine
+
+
 # 创建数据库引擎
-# 如果使用SQLite，添加check_same_thread=False参数
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
+engine = create_db_engine(settings.DATABASE_URL)
 
-# 创建会话工厂
+# 创建会话工厂（同步，供脚本、Alembic 和尚未迁移的接口使用）
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎和会话工厂（供 async def 接口使用）
+async_engine = create_async_db_engine(settings.DATABASE_URL)
+
+# expire_on_commit=False：提交后仍可直接读取对象属性，避免在异步会话中触发隐式IO
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # 创建Base类，所有模型将继承此类
 Base = declarative_base()
 
@@ -23,4 +135,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """FastAPI依赖，提供异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,17 +2,26 @@
 from app.db.database import engine, Base
 # 确保导入所有模型
 from app.models import user, profile, resume, question, interview  # 新增interview
+from app.services import search_service
 
 def create_tables():
     """创建所有数据库表"""
     print("正在创建数据库表...")
     Base.metadata.create_all(bind=engine)
+    search_service.ensure_search_index(engine)
     print("数据库表创建完成！")
     print("新增的面试相关表：")
     print("- interviews (面试记录)")
     print("- interview_questions (面试题目)")
     print("- interview_statistics (用户统计)")
     print("- interview_trend_data (趋势数据)")
+    print("- score_histograms (评分分布直方图)")
+    print("- interview_trend_rollups (趋势汇总)")
+    print("- scoring_jobs (答案评分任务)")
+    print("- resume_parse_jobs (简历解析任务)")
+    print("- resume_storage_usage (简历存储用量)")
+    print("- questions_fts (题库全文检索索引)")
+    print("- catalog_versions (题库版本号)")
 
 def drop_tables():
     """删除所有数据库表（谨慎使用）"""
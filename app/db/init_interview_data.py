@@ -5,9 +5,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
 from app.db.database import SessionLocal
-from app.models.interview import Interview, InterviewQuestion, InterviewStatistics, InterviewTrendData
+from app.models.interview import (
+    Interview, InterviewQuestion, InterviewStatistics, InterviewTrendData, InterviewTrendRollup, ScoringJob
+)
 from app.models.user import User
 from app.models.profile import UserProfile
+from app.services.interview_stats import aggregate_interviews, refresh_better_than_percent
+from app.services.score_histogram import rebuild_histograms
+from app.services.trend_rollups import rebuild_trend_rollups
 from datetime import datetime, timedelta
 import random
 import json
@@ -107,78 +112,12 @@ def create_mock_interviews(db: Session, user_id: int, count: int = 10):
 
 def create_user_statistics(db: Session, user_id: int, interviews: list):
     """创建用户统计数据"""
-    # 计算统计数据
-    total_interviews = len(interviews)
-    total_practice = len([i for i in interviews if i.type == "practice"])
-    total_simulation = len([i for i in interviews if i.type == "simulation"])
-    total_time = sum([i.actual_duration for i in interviews if i.actual_duration])
-    
-    # 计算平均分数
-    scores = [i.overall_score for i in interviews if i.overall_score]
-    avg_overall = sum(scores) / len(scores) if scores else 0
-    
-    professional_scores = [i.professional_score for i in interviews if i.professional_score]
-    avg_professional = sum(professional_scores) / len(professional_scores) if professional_scores else 0
-    
-    expression_scores = [i.expression_score for i in interviews if i.expression_score]
-    avg_expression = sum(expression_scores) / len(expression_scores) if expression_scores else 0
-    
-    logic_scores = [i.logic_score for i in interviews if i.logic_score]
-    avg_logic = sum(logic_scores) / len(logic_scores) if logic_scores else 0
-    
-    adaptability_scores = [i.adaptability_score for i in interviews if i.adaptability_score]
-    avg_adaptability = sum(adaptability_scores) / len(adaptability_scores) if adaptability_scores else 0
-    
-    professionalism_scores = [i.professionalism_score for i in interviews if i.professionalism_score]
-    avg_professionalism = sum(professionalism_scores) / len(professionalism_scores) if professionalism_scores else 0
-    
-    # 创建统计记录
-    stats = InterviewStatistics(
-        user_id=user_id,
-        total_interviews=total_interviews,
-        total_practice=total_practice,
-        total_simulation=total_simulation,
-        total_time_minutes=total_time,
-        avg_overall_score=avg_overall,
-        avg_professional_score=avg_professional,
-        avg_expression_score=avg_expression,
-        avg_logic_score=avg_logic,
-        avg_adaptability_score=avg_adaptability,
-        avg_professionalism_score=avg_professionalism,
-        score_improvement=random.uniform(8, 15),
-        better_than_percent=min(95, 60 + total_interviews * 2),
-        last_interview_date=max([i.finished_at for i in interviews if i.finished_at])
-    )
+    # 与线上完成面试时相同的增量聚合
+    stats = InterviewStatistics(user_id=user_id, **aggregate_interviews(interviews))
     
     db.add(stats)
     return stats
 
-def create_trend_data(db: Session, user_id: int, days: int = 30):
-    """创建趋势数据"""
-    base_score = 75
-    
-    for i in range(days):
-        date = datetime.utcnow() - timedelta(days=days - i)
-        
-        # 模拟分数逐渐提升的趋势
-        daily_score = base_score + random.uniform(-3, 5)
-        base_score = min(95, base_score + 0.3)  # 每天微小提升
-        
-        trend = InterviewTrendData(
-            user_id=user_id,
-            record_date=date,
-            daily_score=daily_score,
-            interviews_count=random.choice([0, 0, 0, 1, 1, 2]),  # 大部分天数没有面试
-            cumulative_avg_score=daily_score,
-            professional_score=daily_score + random.uniform(-3, 3),
-            expression_score=daily_score + random.uniform(-2, 2),
-            logic_score=daily_score + random.uniform(-4, 4),
-            adaptability_score=daily_score + random.uniform(-5, 5),
-            professionalism_score=daily_score + random.uniform(-2, 2)
-        )
-        
-        db.add(trend)
-
 def init_mock_data_for_user(db: Session, username: str):
     """为指定用户初始化模拟数据"""
     # 查找用户
@@ -197,7 +136,14 @@ def init_mock_data_for_user(db: Session, username: str):
         if choice == 'y':
             # 删除现有数据
             db.query(InterviewTrendData).filter(InterviewTrendData.user_id == user.id).delete()
+            db.query(InterviewTrendRollup).filter(InterviewTrendRollup.user_id == user.id).delete()
             db.query(InterviewStatistics).filter(InterviewStatistics.user_id == user.id).delete()
+            # 评分任务引用了面试题目，要先删除
+            db.query(ScoringJob).filter(
+                ScoringJob.interview_id.in_(
+                    db.query(Interview.id).filter(Interview.user_id == user.id)
+                )
+            ).delete(synchronize_session=False)
             db.query(InterviewQuestion).filter(
                 InterviewQuestion.interview_id.in_(
                     db.query(Interview.id).filter(Interview.user_id == user.id)
@@ -218,9 +164,14 @@ def init_mock_data_for_user(db: Session, username: str):
         print("2️⃣  生成统计数据...")
         stats = create_user_statistics(db, user.id, interviews)
         
-        # 3. 创建趋势数据
+        # 3. 由面试记录生成趋势汇总
         print("3️⃣  生成趋势数据...")
-        create_trend_data(db, user.id, 30)  # 30天的趋势
+        db.flush()
+        rollup_rows = rebuild_trend_rollups(db, user_id=user.id)
+        
+        # 4. 重建评分分布并刷新排名
+        rebuild_histograms(db)
+        refresh_better_than_percent(db)
         
         db.commit()
         
@@ -228,7 +179,7 @@ def init_mock_data_for_user(db: Session, username: str):
         print(f"📈 总计创建：")
         print(f"   - 面试记录：{len(interviews)} 条")
         print(f"   - 面试题目：{len(interviews) * 5} 道")
-        print(f"   - 趋势数据：30 天")
+        print(f"   - 趋势汇总：{rollup_rows} 个时间段")
         print(f"   - 平均评分：{stats.avg_overall_score:.1f}")
         
         return True
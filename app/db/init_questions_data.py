@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from app.db.database import SessionLocal, engine
 from app.models import user, profile, resume, question  # 导入所有模型
 from app.models.question import Question, QuestionCategory  # 然后再导入具体类
+from app.services import search_service
 import json
 def init_categories(db: Session):
     """初始化分类数据"""
@@ -638,6 +639,7 @@ def main():
         print("开始初始化知识库数据...")
         init_categories(db)
         init_questions(db)
+        search_service.ensure_search_index(engine)
         print("🎉 知识库数据初始化完成！")
     except Exception as e:
         print(f"❌ 初始化失败: {e}")
@@ -0,0 +1,43 @@
+# app/db/migrate_resume_blobs.py
+"""
+把旧的按随机文件名存放的简历文件迁移到内容寻址存储（uploads/resumes/ab/cd/<sha256>）
+重新计算每个文件的哈希，相同内容只保留一份，并更新 Resume 的 file_path / stored_filename / content_hash
+在项目根目录运行: python -m app.db.migrate_resume_blobs [--batch-size 500] [--dry-run]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.database import SessionLocal
+from app.services.blob_store import migrate_legacy_files, resume_blobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="迁移简历文件到内容寻址存储")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批处理的简历记录数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不移动文件也不修改数据库")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"📦 开始迁移简历文件到 {os.path.abspath(resume_blobs.root)} ...")
+        start = time.perf_counter()
+        result = migrate_legacy_files(db, resume_blobs, batch_size=args.batch_size, dry_run=args.dry_run)
+        print(
+            f"✅ 检查 {result['checked']} 条记录：移动 {result['moved']} 个文件，"
+            f"去重 {result['deduplicated']} 个，缺失 {result['missing']} 个，耗时 {time.perf_counter() - start:.2f}s"
+            + ("（dry run，未做修改）" if args.dry_run else "")
+        )
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 迁移失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
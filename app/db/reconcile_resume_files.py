@@ -0,0 +1,57 @@
+# app/db/reconcile_resume_files.py
+"""
+对账简历文件存储和数据库（可定期运行）
+- 没有简历引用的文件移到 uploads/orphans（--delete 时直接删除），上传中断遗留的临时文件删除
+- 列出文件已丢失的简历
+- 按 resumes 表重新计算每个用户的存储用量，修正偏差
+在项目根目录运行: python -m app.db.reconcile_resume_files [--batch-size 500] [--delete] [--dry-run]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services import storage_quota
+from app.services.blob_store import reconcile_files, resume_blobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对账简历文件存储和数据库")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批处理的文件数/记录数")
+    parser.add_argument("--grace-seconds", type=int, default=settings.ORPHAN_GRACE_SECONDS,
+                        help="跳过多少秒内修改过的文件")
+    parser.add_argument("--delete", action="store_true", help="直接删除孤儿文件，而不是移到隔离目录")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不移动文件也不修改数据库")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"🔎 开始对账 {os.path.abspath(resume_blobs.root)} ...")
+        start = time.perf_counter()
+        files = reconcile_files(db, resume_blobs, batch_size=args.batch_size, grace_seconds=args.grace_seconds,
+                                delete=args.delete, dry_run=args.dry_run)
+        usage = storage_quota.recompute_usage(db, batch_size=args.batch_size, dry_run=args.dry_run)
+        print(
+            f"✅ 扫描 {files['scanned']} 个文件：孤儿 {files['orphans']} 个（{files['orphan_bytes']} 字节，"
+            f"{'删除' if args.delete else '隔离'}），跳过最近修改的 {files['recent']} 个，临时文件 {files['stale_temp']} 个；"
+            f"检查 {files['checked']} 条简历记录，文件缺失 {files['missing']} 条；"
+            f"检查 {usage['users']} 个用户的存储用量，修正 {usage['corrected']} 个，"
+            f"耗时 {time.perf_counter() - start:.2f}s"
+            + ("（dry run，未做修改）" if args.dry_run else "")
+        )
+        if files["missing_ids"]:
+            print(f"⚠️ 文件缺失的简历 ID: {files['missing_ids']}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 对账失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
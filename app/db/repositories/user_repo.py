@@ -1,7 +1,10 @@
+from typing import Optional
+
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate,  UserProfileUpdate
 from app.core.security import get_password_hash
+from app.core.token_cache import token_cache
 
 def get_user_by_email(db: Session, email: str):
     """通过邮箱获取用户"""
@@ -15,10 +18,11 @@ def get_user_by_id(db: Session, user_id: int):
     """通过ID获取用户"""
     return db.query(User).filter(User.id == user_id).first()
 
-def create_user(db: Session, user: UserCreate):
-    """创建新用户"""
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None):
+    """创建新用户（hashed_password 为空时在当前线程计算哈希）"""
     # 创建新用户实例
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -52,6 +56,7 @@ def update_user(db: Session, user_id: int, user_update:  UserProfileUpdate):
     
     db.commit()
     db.refresh(user)
+    token_cache.invalidate_user(user_id)
     
     return user
 
@@ -61,6 +66,7 @@ def delete_user(db: Session, user_id: int):
     if user:
         db.delete(user)
         db.commit()
+        token_cache.invalidate_user(user_id)
         return True
     return False
 
@@ -75,6 +81,7 @@ def activate_user(db: Session, user_id: int):
         user.is_active = True
         db.commit()
         db.refresh(user)
+        token_cache.invalidate_user(user_id)
         return user
     return None
 
@@ -85,5 +92,6 @@ def deactivate_user(db: Session, user_id: int):
         user.is_active = False
         db.commit()
         db.refresh(user)
+        token_cache.invalidate_user(user_id)
         return user
     return None
\ No newline at end of file
@@ -0,0 +1,21 @@
+# app/db/upsert.py
+"""
+跨数据库的 "不存在则插入"（INSERT ... ON CONFLICT DO NOTHING / INSERT IGNORE）
+
+计数类表先用它保证行存在，再用 UPDATE x = x + ? 原子累加，
+并发请求同时插入同一行时只有一条生效，其余静默忽略。
+"""
+from typing import List
+
+from sqlalchemy import Table, insert
+
+
+def insert_if_missing(dialect_name: str, table: Table, values: dict, index_elements: List[str]):
+    """构造插入语句；index_elements 为唯一约束/主键列"""
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return insert(table).values(**values).prefix_with("IGNORE")
+    return dialect_insert(table).values(**values).on_conflict_do_nothing(index_elements=index_elements)
@@ -2,12 +2,24 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.openapi.utils import get_openapi
-from fastapi.staticfiles import StaticFiles  # 新增：用于提供静态文件服务
 import time
 import os  # 新增
 
 from app.core.config import settings
 from app.api import auth, users, resumes, positions, questions, interview  # 🔥 添加 resumes 导入
+from app.db.database import engine, async_engine, SessionLocal
+from app.services import search_service
+from app.services.view_counter import view_counter
+from app.services.question_catalog import question_catalog
+from app.services.interview_plan import interview_plans
+from app.services.answer_scoring import scoring_pool
+from app.services.interview_events import interview_events
+from app.services.blob_store import resume_blobs
+from app.services.resume_parsing import resume_parser_pool
+from app.services.resume_previews import preview_worker
+from app.services.skill_matching import skill_index
+from app.core.token_cache import token_cache
+from app.core.password_hasher import password_hasher
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -58,14 +70,9 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
-# ===== 静态文件服务配置 =====
-# 创建上传目录（如果不存在）
-upload_dir = "uploads"
-os.makedirs(upload_dir, exist_ok=True)
-os.makedirs(os.path.join(upload_dir, "resumes"), exist_ok=True)
-
-# 提供静态文件访问（用于简历预览等）
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# ===== 上传目录 =====
+# 创建上传目录（如果不存在）；简历文件通过需要登录的 /api/v1/resumes/{id}/file 接口访问，不再直接挂载
+os.makedirs(os.path.join(settings.UPLOAD_FOLDER, "resumes"), exist_ok=True)
 
 # ===== 全局异常处理 =====
 @app.exception_handler(HTTPException)
@@ -76,7 +83,9 @@ async def http_exception_handler(request, exc):
             "code": exc.status_code,
             "data": {},
             "message": exc.detail
-        }
+        },
+        # 保留 WWW-Authenticate、Retry-After 等响应头
+        headers=exc.headers
     )
 
 @app.exception_handler(Exception)
@@ -160,6 +169,28 @@ def health_check():
         "message": "服务运行正常"
     }
 
+@app.get(f"{settings.API_V1_STR}/metrics")
+def metrics():
+    """运行指标接口"""
+    return {
+        "code": 200,
+        "data": {
+            "view_counter": view_counter.metrics(),
+            "question_catalog": question_catalog.metrics(),
+            "token_cache": token_cache.metrics(),
+            "interview_plans": interview_plans.metrics(),
+            "password_hasher": password_hasher.metrics(),
+            "scoring_pool": scoring_pool.metrics(),
+            "interview_events": interview_events.metrics(),
+            "resume_blobs": resume_blobs.metrics(),
+            "resume_parser": resume_parser_pool.metrics(),
+            "resume_previews": preview_worker.metrics(),
+            "skill_index": skill_index.metrics(),
+            "timestamp": int(time.time())
+        },
+        "message": "获取运行指标成功"
+    }
+
 @app.get(f"{settings.API_V1_STR}/info")
 def api_info():
     """API信息接口"""
@@ -187,7 +218,11 @@ def api_info():
                 "resumes": {
                     "upload": "POST /api/v1/resumes",
                     "list": "GET /api/v1/resumes",
+                    "usage": "GET /api/v1/resumes/usage",
                     "delete": "DELETE /api/v1/resumes/{resume_id}",
+                    "download": "GET /api/v1/resumes/{resume_id}/file?disposition=attachment|inline",
+                    "preview": "GET /api/v1/resumes/{resume_id}/preview",
+                    "position_matches": "GET /api/v1/resumes/{resume_id}/position-matches?top_k=5",
                     "set_active": "PUT /api/v1/resumes/{resume_id}/activate"
                 }
             },
@@ -204,10 +239,55 @@ async def startup_event():
     print(f"🚀 {settings.PROJECT_NAME} 启动成功")
     print(f"📖 API文档: http://{settings.SERVER_HOST}:{settings.SERVER_PORT}{settings.API_V1_STR}/docs")
     print(f"🔗 健康检查: http://{settings.SERVER_HOST}:{settings.SERVER_PORT}{settings.API_V1_STR}/health")
-    print(f"📁 上传目录: {os.path.abspath('uploads')}")
+    print(f"📁 上传目录: {os.path.abspath(settings.UPLOAD_FOLDER)}")
     print(f"🌐 CORS允许域名: {settings.get_cors_origins()}")
+    
+    # 建立/校验题库全文检索索引
+    if search_service.ensure_search_index(engine):
+        print("🔍 题库全文检索索引已就绪")
+    
+    # 预先构建题库快照
+    db = SessionLocal()
+    try:
+        snapshot = question_catalog.get(db)
+        print(f"📚 题库快照已加载: {len(snapshot.questions)} 道题 (版本 {snapshot.version})")
+    finally:
+        db.close()
+    
+    # 启动浏览数写缓冲
+    view_counter.start()
+    
+    # 启动密码哈希进程池
+    password_hasher.start()
+    
+    # 启动答案评分 worker（会接着处理上次退出前未完成的任务）
+    scoring_pool.start()
+    
+    # 启动简历解析调度（会接着处理上次退出前未完成的任务）
+    resume_parser_pool.start()
+    
+    # 加载简历预览缓存并启动预览生成线程
+    preview_worker.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭事件"""
-    print(f"👋 {settings.PROJECT_NAME} 正在关闭")
\ No newline at end of file
+    print(f"👋 {settings.PROJECT_NAME} 正在关闭")
+    
+    # 写回尚未落库的浏览数
+    view_counter.stop()
+    
+    # 关闭密码哈希进程池
+    password_hasher.shutdown()
+    
+    # 停止答案评分 worker，未完成的任务留在队列中，下次启动后继续
+    scoring_pool.stop()
+    
+    # 停止简历解析，未完成的任务在租约过期后重新领取
+    resume_parser_pool.stop()
+    
+    # 停止预览生成线程（缓存留在磁盘上，下次启动时重新加载）
+    preview_worker.stop()
+    
+    # 关闭异步引擎的连接池
+    await async_engine.dispose()
\ No newline at end of file
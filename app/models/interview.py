@@ -1,5 +1,5 @@
 # app/models/interview.py (修复版)
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -45,13 +45,18 @@ class Interview(Base):
     
     # 关系
     questions = relationship("InterviewQuestion", back_populates="interview", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # 面试历史游标分页：WHERE user_id = ? ORDER BY started_at DESC, id DESC
+        Index("ix_interviews_user_started", "user_id", "started_at", "id"),
+    )
 
 class InterviewQuestion(Base):
     """面试题目记录表"""
     __tablename__ = "interview_questions"
     
     id = Column(Integer, primary_key=True, index=True)
-    interview_id = Column(Integer, ForeignKey("interviews.id"), nullable=False)
+    interview_id = Column(Integer, ForeignKey("interviews.id"), nullable=False, index=True)
     # 🔥 修复：暂时移除对questions表的外键约束，避免依赖问题
     question_id = Column(Integer, nullable=True)  # 关联知识库题目（不设外键）
     
@@ -85,6 +90,31 @@ class InterviewQuestion(Base):
     # 关系
     interview = relationship("Interview", back_populates="questions")
 
+class ScoringJob(Base):
+    """答案评分任务表（持久化的评分队列，进程重启后未完成的任务会被重新领取）"""
+    __tablename__ = "scoring_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    interview_question_id = Column(Integer, ForeignKey("interview_questions.id"), nullable=False, index=True)
+    interview_id = Column(Integer, ForeignKey("interviews.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # 状态: pending（待评分）/ running（评分中）/ done（完成）/ failed（多次重试后失败）/ cancelled（答案已被覆盖）
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)  # 已领取次数，同时作为写回结果时的校验令牌
+    error = Column(Text, nullable=True)  # 最近一次失败原因
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # running 任务的租约到期时间，过期后可被重新领取
+    
+    # 时间戳
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        # 领取任务：WHERE status = ? ORDER BY id
+        Index("ix_scoring_jobs_status_id", "status", "id"),
+    )
+
 class InterviewStatistics(Base):
     """用户面试统计表"""
     __tablename__ = "interview_statistics"
@@ -106,8 +136,30 @@ class InterviewStatistics(Base):
     avg_adaptability_score = Column(Float, nullable=True)  # 平均应变能力
     avg_professionalism_score = Column(Float, nullable=True)  # 平均职业素养
     
-    # 进步数据（与上月对比）
-    score_improvement = Column(Float, default=0.0)  # 评分提升百分比
+    # 各维度的增量聚合：有评分的面试次数、评分之和、评分平方和
+    # 完成面试时用原子 UPDATE 累加，平均分和标准差都可以 O(1) 由这三项算出
+    overall_count = Column(Integer, default=0)  # 综合评分
+    overall_sum = Column(Float, default=0.0)
+    overall_sum_sq = Column(Float, default=0.0)
+    professional_count = Column(Integer, default=0)  # 专业知识
+    professional_sum = Column(Float, default=0.0)
+    professional_sum_sq = Column(Float, default=0.0)
+    expression_count = Column(Integer, default=0)  # 表达能力
+    expression_sum = Column(Float, default=0.0)
+    expression_sum_sq = Column(Float, default=0.0)
+    logic_count = Column(Integer, default=0)  # 逻辑思维
+    logic_sum = Column(Float, default=0.0)
+    logic_sum_sq = Column(Float, default=0.0)
+    adaptability_count = Column(Integer, default=0)  # 应变能力
+    adaptability_sum = Column(Float, default=0.0)
+    adaptability_sum_sq = Column(Float, default=0.0)
+    professionalism_count = Column(Integer, default=0)  # 职业素养
+    professionalism_sum = Column(Float, default=0.0)
+    professionalism_sum_sq = Column(Float, default=0.0)
+    
+    # 进步数据
+    score_improvement = Column(Float, default=0.0)  # 近期表现（EWMA）相对历史平均分的提升百分比
+    overall_ewma = Column(Float, nullable=True)  # 综合评分的指数加权移动平均
     
     # 排名数据
     better_than_percent = Column(Float, default=0.0)  # 超过多少用户
@@ -142,4 +194,41 @@ class InterviewTrendData(Base):
     professionalism_score = Column(Float, nullable=True)
     
     # 时间戳
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+class ScoreHistogram(Base):
+    """评分分布直方图（每个分数段一行，用于 O(桶数) 计算百分位排名）"""
+    __tablename__ = "score_histograms"
+    
+    # global: 所有用户的平均综合评分（每个用户计一次）
+    # position:<岗位>: 该岗位所有已完成面试的综合评分（每场面试计一次）
+    scope = Column(String(120), primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # 分数向下取整，0-100
+    count = Column(Integer, nullable=False, default=0)
+
+class InterviewTrendRollup(Base):
+    """面试趋势汇总表（按 用户 + 粒度 + 时间段 汇总已完成的面试，完成面试时增量更新）"""
+    __tablename__ = "interview_trend_rollups"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    granularity = Column(String(10), primary_key=True)  # 'day' / 'week' / 'month'
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # 时间段起点（UTC 零点；周从周一开始）
+    
+    interviews_count = Column(Integer, nullable=False, default=0)  # 时间段内完成的面试次数
+    
+    # 各维度在时间段内的评分次数和评分之和（时间段平均分 = 和 / 次数）
+    overall_count = Column(Integer, nullable=False, default=0)
+    overall_sum = Column(Float, nullable=False, default=0.0)
+    professional_count = Column(Integer, nullable=False, default=0)
+    professional_sum = Column(Float, nullable=False, default=0.0)
+    expression_count = Column(Integer, nullable=False, default=0)
+    expression_sum = Column(Float, nullable=False, default=0.0)
+    logic_count = Column(Integer, nullable=False, default=0)
+    logic_sum = Column(Float, nullable=False, default=0.0)
+    adaptability_count = Column(Integer, nullable=False, default=0)
+    adaptability_sum = Column(Float, nullable=False, default=0.0)
+    professionalism_count = Column(Integer, nullable=False, default=0)
+    professionalism_sum = Column(Float, nullable=False, default=0.0)
+    
+    # 截至时间段内最后一场面试的累计综合评分（累计平均分 = 和 / 次数）
+    cumulative_overall_count = Column(Integer, nullable=False, default=0)
+    cumulative_overall_sum = Column(Float, nullable=False, default=0.0)
@@ -77,4 +77,14 @@ class UserQuestionProgress(Base):
     
     # 时间戳
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class CatalogVersion(Base):
+    """题库版本号（题目或分类变化时递增，用于刷新各进程内的题库快照）"""
+    __tablename__ = "catalog_versions"
+    
+    name = Column(String(50), primary_key=True)  # 版本名称，如 questions
+    version = Column(Integer, nullable=False, default=0)  # 当前版本号
+    
+    # 时间戳
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,5 +1,5 @@
 # app/models/resume.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, BigInteger
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, BigInteger, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -17,6 +17,7 @@ class Resume(Base):
     file_path = Column(String(500), nullable=False)  # 文件路径
     file_size = Column(BigInteger, nullable=False)  # 文件大小（字节）
     file_type = Column(String(50), nullable=False)  # 文件类型 (pdf, doc, docx)
+    content_hash = Column(String(64), nullable=True, index=True)  # 文件内容 SHA-256（上传时流式计算）
     
     # 状态信息
     is_active = Column(Boolean, default=False)  # 是否为默认简历
@@ -33,5 +34,40 @@ class Resume(Base):
     # 关系
     user = relationship("User", back_populates="resumes")
     
+    __table_args__ = (
+        # 简历列表游标分页：WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_resumes_user_created", "user_id", "created_at", "id"),
+    )
 
+class ResumeParseJob(Base):
+    """简历解析任务表（持久化的解析队列，进程重启后未完成的任务会被重新领取）"""
+    __tablename__ = "resume_parse_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False, index=True)
+    
+    # 状态: pending（待解析）/ running（解析中）/ done（完成）/ failed（格式不支持，不再重试）
+    #       / quarantined（多次超时或出错的问题文件，隔离后不再重试）
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)  # 已领取次数，同时作为写回结果时的校验令牌
+    error = Column(Text, nullable=True)  # 最近一次失败原因
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # running 任务的租约到期时间，过期后可被重新领取
+    
+    # 时间戳
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        # 领取任务：WHERE status = ? ORDER BY id
+        Index("ix_resume_parse_jobs_status_id", "status", "id"),
+    )
 
+class ResumeStorageUsage(Base):
+    """用户简历存储用量（上传/删除时原子累加，配额检查只读这一行）"""
+    __tablename__ = "resume_storage_usage"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    bytes_used = Column(BigInteger, nullable=False, default=0)  # 该用户所有简历的文件大小之和
+    file_count = Column(Integer, nullable=False, default=0)  # 简历数量
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
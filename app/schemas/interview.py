@@ -11,6 +11,7 @@ class InterviewConfig(BaseModel):
     duration: int = 30  # 分钟
     question_types: List[str] = ["behavioral", "technical"]
     company_type: Optional[str] = None  # 仅模拟模式需要
+    exclude_seen: bool = True  # 是否排除做过的题目
 
 class InterviewCreate(BaseModel):
     """创建面试请求"""
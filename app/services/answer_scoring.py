@@ -0,0 +1,387 @@
+# app/services/answer_scoring.py
+"""
+答案评分任务队列
+
+提交答案时只保存答案并写入一条 scoring_jobs 记录，评分由后台 worker 池完成，客户端轮询任务状态：
+- 队列存在数据库中，进程重启后 pending 任务以及租约过期的 running 任务会被重新领取
+- 领取任务用带条件的 UPDATE（status + attempts），多个进程同时领取时只有一个成功；
+  attempts 同时是写回结果时的校验令牌，任务被重新领取或取消后，旧的结果不会覆盖新状态
+- 评分函数在线程池或进程池（SCORING_USE_PROCESSES）中执行，每次只领取空闲 worker 数量的任务，
+  任务提交后立即开始执行，因此等待时长就是单个任务的超时；失败后重试，超过 SCORING_MAX_ATTEMPTS 次标记为 failed
+- 超时的任务无法从线程中停止，在它真正结束前一直占用一个 worker，不会再把新任务排在它后面
+- 完成面试时 drain_interview_jobs 会就地评完该面试剩余的任务，保证总分包含所有已回答的题目
+"""
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.interview import InterviewQuestion, ScoringJob
+from app.models.question import Question
+from app.services import keyword_scorer
+from app.services.interview_events import interview_events
+
+OPEN_STATUSES = ("pending", "running")
+
+
+def score_answer(question_text: str, answer_text: str,
+                 key_points: Optional[str] = None, tags: Optional[str] = None) -> dict:
+    """评分函数（本地关键词覆盖率评分，可替换为大模型或语音分析）"""
+    return keyword_scorer.score_answer(question_text, answer_text, key_points, tags)
+
+
+def _claim_values(lease_seconds: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "status": "running",
+        "attempts": ScoringJob.attempts + 1,
+        "started_at": now,
+        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+    }
+
+
+def _result_values(feedback: dict) -> dict:
+    return {
+        "score": feedback["score"],
+        "ai_feedback": json.dumps(feedback),
+        "keyword_match": feedback.get("keyword_match"),
+        "fluency_score": feedback.get("fluency_score"),
+    }
+
+
+def feedback_event(job_id: int, question_id: int, feedback: dict) -> dict:
+    """评分完成事件的内容"""
+    return {"job_id": job_id, "question_id": question_id, "status": "done", "feedback": feedback}
+
+
+def _owned_by(job_id: int, attempts: int):
+    """写回条件：任务仍由本次领取持有"""
+    return (ScoringJob.id == job_id, ScoringJob.status == "running", ScoringJob.attempts == attempts)
+
+
+class ScoringWorkerPool:
+    """从数据库领取评分任务并交给执行器评分的后台 worker 池"""
+
+    def __init__(self, workers: int, use_processes: bool, poll_interval: float, batch_size: int,
+                 lease_seconds: int, job_timeout: float, max_attempts: int):
+        self.workers = workers
+        self.use_processes = use_processes
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+
+        self._executor: Optional[Executor] = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        # 正在执行评分函数的 worker 数（包括已超时但还没结束的任务）
+        self._busy = 0
+
+        # 指标
+        self.in_flight = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.stale_results = 0
+        self._total_ms = 0.0
+
+    def notify(self):
+        """有新任务入队（事务提交之后调用），立即唤醒调度线程"""
+        self._wakeup.set()
+
+    # ----- 领取 / 写回 -----
+
+    def _claim(self, db: Session, limit: int) -> List[tuple]:
+        """领取最多 limit 个任务，返回 [(job_id, attempts, 面试ID, 题目ID, 题目, 答案, 要点, 标签)]"""
+        now = datetime.utcnow()
+        candidates = db.execute(
+            select(ScoringJob.id).where(or_(
+                ScoringJob.status == "pending",
+                (ScoringJob.status == "running") & (ScoringJob.lease_expires_at < now)
+            )).order_by(ScoringJob.id).limit(limit)
+        ).scalars().all()
+
+        claimed = []
+        for job_id in candidates:
+            result = db.execute(
+                update(ScoringJob)
+                .where(ScoringJob.id == job_id, or_(
+                    ScoringJob.status == "pending",
+                    (ScoringJob.status == "running") & (ScoringJob.lease_expires_at < now)
+                ))
+                .values(**_claim_values(self.lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                claimed.append(job_id)
+        if not claimed:
+            db.commit()
+            return []
+
+        rows = db.execute(
+            select(ScoringJob.id, ScoringJob.attempts, ScoringJob.interview_id, ScoringJob.interview_question_id,
+                   InterviewQuestion.question_text, InterviewQuestion.answer_text, Question.key_points, Question.tags)
+            .join(InterviewQuestion, InterviewQuestion.id == ScoringJob.interview_question_id)
+            .outerjoin(Question, Question.id == InterviewQuestion.question_id)
+            .where(ScoringJob.id.in_(claimed))
+        ).all()
+        db.commit()
+        return [tuple(row) for row in rows]
+
+    def _write_result(self, db: Session, job_id: int, attempts: int, feedback: dict) -> bool:
+        finished = db.execute(
+            update(ScoringJob)
+            .where(*_owned_by(job_id, attempts))
+            .values(status="done", error=None, finished_at=datetime.utcnow(), lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        if finished.rowcount != 1:
+            # 任务已被取消或被重新领取，丢弃这次结果
+            return False
+        question_id = select(ScoringJob.interview_question_id).where(ScoringJob.id == job_id).scalar_subquery()
+        db.execute(
+            update(InterviewQuestion)
+            .where(InterviewQuestion.id == question_id)
+            .values(**_result_values(feedback))
+            .execution_options(synchronize_session=False)
+        )
+        return True
+
+    def _write_failure(self, db: Session, job_id: int, attempts: int, error: str) -> bool:
+        """记录失败，返回是否已放弃重试"""
+        give_up = attempts >= self.max_attempts
+        db.execute(
+            update(ScoringJob)
+            .where(*_owned_by(job_id, attempts))
+            .values(
+                status="failed" if give_up else "pending",
+                error=error[:1000],
+                finished_at=datetime.utcnow() if give_up else None,
+                lease_expires_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        with self._lock:
+            if give_up:
+                self.failed += 1
+            else:
+                self.retried += 1
+        return give_up
+
+    # ----- 调度 -----
+
+    def _release_worker(self, _future):
+        with self._lock:
+            self._busy -= 1
+
+    def run_once(self) -> int:
+        """按空闲 worker 数领取并处理一批任务，返回处理的任务数"""
+        with self._lock:
+            limit = min(self.batch_size, self.workers - self._busy)
+        if limit <= 0:
+            return 0
+        db = SessionLocal()
+        try:
+            jobs = self._claim(db, limit)
+            if not jobs:
+                return 0
+
+            executor = self._executor or self._start_executor()
+            start = time.perf_counter()
+            with self._lock:
+                self.in_flight += len(jobs)
+            futures = {}
+            for job_id, attempts, interview_id, question_id, question_text, answer_text, key_points, tags in jobs:
+                with self._lock:
+                    self._busy += 1
+                future = executor.submit(score_answer, question_text, answer_text or "", key_points, tags)
+                future.add_done_callback(self._release_worker)
+                futures[future] = (job_id, attempts, interview_id, question_id)
+            # 每个任务都有空闲 worker，提交后立即开始，整批的等待时长即单个任务的超时
+            wait(futures, timeout=self.job_timeout)
+
+            # 提交后再推送事件，客户端收到时数据库中一定能查到
+            events = []
+            for future, (job_id, attempts, interview_id, question_id) in futures.items():
+                if not future.done():
+                    future.cancel()
+                    error = f"评分超时（{self.job_timeout}s）"
+                elif future.exception() is not None:
+                    error = str(future.exception())
+                else:
+                    feedback = future.result()
+                    if self._write_result(db, job_id, attempts, feedback):
+                        with self._lock:
+                            self.completed += 1
+                        events.append((interview_id, "feedback", feedback_event(job_id, question_id, feedback)))
+                    else:
+                        with self._lock:
+                            self.stale_results += 1
+                    continue
+                if self._write_failure(db, job_id, attempts, error):
+                    events.append((interview_id, "scoring_failed", {
+                        "job_id": job_id, "question_id": question_id, "error": error
+                    }))
+            db.commit()
+            for interview_id, event_type, data in events:
+                interview_events.publish(interview_id, event_type, data)
+
+            with self._lock:
+                self.in_flight -= len(jobs)
+                self._total_ms += (time.perf_counter() - start) * 1000
+            return len(jobs)
+        except Exception as e:
+            db.rollback()
+            # 已领取的任务会在租约过期后被重新领取
+            print(f"❌ 评分任务处理失败: {str(e)}")
+            with self._lock:
+                self.in_flight = 0
+            return 0
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            # 领取到任务时继续领取，否则（队列为空或 worker 都被占用）等待通知或轮询间隔
+            if self.run_once() > 0:
+                continue
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _start_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="answer-scorer")
+            return self._executor
+
+    def start(self):
+        """启动执行器和调度线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._start_executor()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="scoring-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止调度线程（等待当前批次写回）并关闭执行器"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.job_timeout + 5)
+            self._thread = None
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            processed = self.completed + self.failed + self.retried
+            return {
+                "workers": self.workers,
+                "use_processes": self.use_processes,
+                "in_flight": self.in_flight,
+                "busy_workers": self._busy,
+                "completed": self.completed,
+                "retried": self.retried,
+                "failed": self.failed,
+                "stale_results": self.stale_results,
+                "avg_job_ms": round(self._total_ms / processed, 2) if processed else 0.0,
+            }
+
+
+# 全局唯一的评分 worker 池
+scoring_pool = ScoringWorkerPool(
+    workers=settings.SCORING_WORKERS,
+    use_processes=settings.SCORING_USE_PROCESSES,
+    poll_interval=settings.SCORING_POLL_INTERVAL,
+    batch_size=settings.SCORING_BATCH_SIZE,
+    lease_seconds=settings.SCORING_LEASE_SECONDS,
+    job_timeout=settings.SCORING_JOB_TIMEOUT,
+    max_attempts=settings.SCORING_MAX_ATTEMPTS,
+)
+
+
+# ----- 请求内使用的异步接口 -----
+
+async def cancel_open_jobs(db: AsyncSession, interview_question_id: int):
+    """取消某题尚未完成的任务（答案被覆盖或跳过时）"""
+    await db.execute(
+        update(ScoringJob)
+        .where(ScoringJob.interview_question_id == interview_question_id, ScoringJob.status.in_(OPEN_STATUSES))
+        .values(status="cancelled", finished_at=datetime.utcnow(), lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def enqueue(db: AsyncSession, question: InterviewQuestion, user_id: int) -> ScoringJob:
+    """为题目的当前答案创建评分任务（在调用方的事务内，提交后调用 scoring_pool.notify()）"""
+    await cancel_open_jobs(db, question.id)
+    job = ScoringJob(
+        interview_question_id=question.id,
+        interview_id=question.interview_id,
+        user_id=user_id,
+        status="pending",
+        attempts=0,
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def drain_interview_jobs(db: AsyncSession, interview_id: int) -> List[dict]:
+    """
+    就地评完某场面试所有未完成的任务（包括 worker 正在处理的），返回评分完成事件，
+    由调用方在提交后推送。抢占后 attempts 变化，worker 随后的写回会被丢弃。
+    """
+    jobs = (await db.execute(
+        select(ScoringJob.id, ScoringJob.interview_question_id, InterviewQuestion.question_text,
+               InterviewQuestion.answer_text, Question.key_points, Question.tags)
+        .join(InterviewQuestion, InterviewQuestion.id == ScoringJob.interview_question_id)
+        .outerjoin(Question, Question.id == InterviewQuestion.question_id)
+        .where(ScoringJob.interview_id == interview_id, ScoringJob.status.in_(OPEN_STATUSES))
+    )).all()
+
+    loop = asyncio.get_running_loop()
+    events = []
+    for job_id, question_id, question_text, answer_text, key_points, tags in jobs:
+        claimed = await db.execute(
+            update(ScoringJob)
+            .where(ScoringJob.id == job_id, ScoringJob.status.in_(OPEN_STATUSES))
+            .values(**_claim_values(0))
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount != 1:
+            continue
+        attempts = (await db.execute(select(ScoringJob.attempts).where(ScoringJob.id == job_id))).scalar()
+        feedback = await loop.run_in_executor(None, score_answer, question_text, answer_text or "", key_points, tags)
+        await db.execute(
+            update(ScoringJob)
+            .where(*_owned_by(job_id, attempts))
+            .values(status="done", error=None, finished_at=datetime.utcnow(), lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            update(InterviewQuestion)
+            .where(InterviewQuestion.id == question_id)
+            .values(**_result_values(feedback))
+            .execution_options(synchronize_session=False)
+        )
+        events.append(feedback_event(job_id, question_id, feedback))
+    return events
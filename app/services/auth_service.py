@@ -1,29 +1,31 @@
 from datetime import timedelta
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.repositories import user_repo
-from app.core import security
-from app.core.security import verify_password, create_access_token
+from app.core.security import create_access_token
+from app.core.password_hasher import password_hasher
 from app.core.config import settings
 from app.schemas.user import UserCreate
 
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
     """
     验证用户并返回用户对象。
     支持用户名或邮箱登录。
     参数名已从 username_or_email 修改为 username 以匹配API层的调用。
+    bcrypt 校验在密码哈希进程池中执行，饱和时抛出 503。
     """
     user = None
     
     # 首先尝试作为邮箱查找
     if "@" in username:
-        user = user_repo.get_user_by_email(db, email=username)
+        user = await db.run_sync(user_repo.get_user_by_email, username)
     
     # 如果邮箱查找失败，或者输入不包含@，尝试作为用户名查找
     if not user:
-        user = user_repo.get_user_by_username(db, username=username)
+        user = await db.run_sync(user_repo.get_user_by_username, username)
     
     # 验证密码
-    if not user or not security.verify_password(password, user.hashed_password):
+    if not user or not await password_hasher.verify(password, user.hashed_password):
         return None
         
     # 检查用户是否激活
@@ -51,13 +53,14 @@ def get_user_by_username(db: Session, username: str):
     """通过用户名获取用户"""
     return user_repo.get_user_by_username(db, username)
 
-def create_user(db: Session, user_in: UserCreate):
+async def create_user(db: AsyncSession, user_in: UserCreate):
     """
     创建新用户。
     我们将参数名从 user_data 修改为 user_in，与 auth.py 中的调用保持一致。
+    密码哈希在密码哈希进程池中计算，饱和时抛出 503。
     """
-    # 这里的参数名也相应修改
-    return user_repo.create_user(db, user=user_in) 
+    hashed_password = await password_hasher.hash(user_in.password)
+    return await db.run_sync(user_repo.create_user, user_in, hashed_password)
 
 def check_user_exists(db: Session, username: str = None, email: str = None):
     """
@@ -0,0 +1,295 @@
+# app/services/blob_store.py
+"""
+按内容寻址的简历文件存储
+
+- 文件以内容 SHA-256 为键，存放在 <根目录>/ab/cd/<hash>（取哈希前两段分目录，避免单个目录下文件过多）
+- 同一份文件重复上传只保留一份，引用计数就是 content_hash 相同的 Resume 行数（content_hash 上有索引）
+- 上传：先流式写入 <根目录>/tmp 下的临时文件，再 adopt 到内容路径（已存在时直接丢弃临时文件）
+- 删除：Resume 行删除并提交后调用 release，没有其他 Resume 引用时才删除文件
+- 同一哈希的"放入 + 插入 Resume"和"计数 + 删除文件"在进程内按哈希加锁串行，
+  避免删除最后一个引用时恰好有人重新上传同一文件而误删；多进程部署下的极端情况由孤儿文件清理兜底
+- 孤儿文件清理（reconcile_files）：流式遍历存储目录，按批查询 content_hash，没有 Resume 引用的文件移到隔离目录或删除；
+  同时清理进程崩溃遗留的临时文件，并逐批检查 Resume 引用的文件是否存在。
+  最近 ORPHAN_GRACE_SECONDS 内修改过的文件跳过（可能是已放入但尚未提交的上传；重复上传已有文件时会刷新其修改时间）
+"""
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.resume import Resume
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+HASH_READ_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """分块计算文件的 SHA-256（阻塞调用）"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class BlobStore:
+    """内容寻址的文件存储（路径计算与文件操作；引用计数查询 Resume 表）"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.temp_dir = os.path.join(root, "tmp")
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+        # 指标
+        self.stored = 0
+        self.deduplicated = 0
+        self.removed = 0
+
+    def iter_files(self) -> Iterator[Tuple[str, str]]:
+        """遍历存储中的文件，逐个返回 (内容哈希, 路径)；不在 ab/cd/<hash> 位置的文件忽略（阻塞调用）"""
+        for level1 in _scan_dirs(self.root):
+            if len(level1.name) != 2:
+                continue
+            for level2 in _scan_dirs(level1.path):
+                with os.scandir(level2.path) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if (entry.is_file(follow_symlinks=False) and _SHA256.match(name)
+                                and name[:2] == level1.name and name[2:4] == level2.name):
+                            yield name, entry.path
+
+    def path_for(self, sha256: str) -> str:
+        if not _SHA256.match(sha256 or ""):
+            raise ValueError(f"无效的内容哈希: {sha256!r}")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def _place(self, temp_path: str, sha256: str) -> str:
+        """把临时文件放到内容路径，返回内容路径（阻塞调用）"""
+        path = self.path_for(sha256)
+        if os.path.exists(path):
+            os.remove(temp_path)
+            # 刷新修改时间，孤儿文件清理不会在这次上传提交前把它当作孤儿
+            os.utime(path)
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+            self.stored += 1
+        return path
+
+    def _unlink(self, sha256: str) -> bool:
+        try:
+            os.remove(self.path_for(sha256))
+        except FileNotFoundError:
+            return False
+        self.removed += 1
+        return True
+
+    @asynccontextmanager
+    async def locked(self, sha256: str):
+        """按哈希加锁（进程内）"""
+        lock = self._locks.get(sha256)
+        if lock is None:
+            lock = self._locks[sha256] = asyncio.Lock()
+        async with lock:
+            yield
+
+    async def adopt(self, temp_path: str, sha256: str) -> str:
+        """把上传好的临时文件放入存储（调用方应持有该哈希的锁，并在锁内提交引用它的 Resume）"""
+        return await asyncio.to_thread(self._place, temp_path, sha256)
+
+    async def release(self, db: AsyncSession, sha256: Optional[str]) -> bool:
+        """Resume 删除并提交后调用：没有引用时删除文件，返回是否删除了文件"""
+        if not sha256:
+            return False
+        async with self.locked(sha256):
+            refs = (await db.execute(
+                select(func.count(Resume.id)).where(Resume.content_hash == sha256)
+            )).scalar_one()
+            if refs:
+                return False
+            return await asyncio.to_thread(self._unlink, sha256)
+
+    def metrics(self) -> dict:
+        return {
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "removed": self.removed,
+        }
+
+
+def _scan_dirs(path: str) -> List[os.DirEntry]:
+    try:
+        with os.scandir(path) as entries:
+            return sorted((entry for entry in entries if entry.is_dir(follow_symlinks=False)), key=lambda e: e.name)
+    except FileNotFoundError:
+        return []
+
+
+# 全局唯一的简历文件存储
+resume_blobs = BlobStore(os.path.join(settings.UPLOAD_FOLDER, "resumes"))
+
+
+def _link_or_copy(source: str, target: str):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def migrate_legacy_files(db: Session, store: BlobStore = resume_blobs, batch_size: int = 500,
+                         dry_run: bool = False) -> dict:
+    """
+    把旧的按随机文件名存放的简历迁移到内容路径：重新计算哈希、放入（或与已有文件去重）、更新 Resume 行。
+    旧文件在该批记录提交之后才删除，中途中断后重新执行即可；已在内容路径下的记录会跳过。
+    """
+    result = {"checked": 0, "moved": 0, "deduplicated": 0, "missing": 0}
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Resume.id, Resume.file_path, Resume.content_hash)
+            .where(Resume.id > last_id).order_by(Resume.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        legacy_files = []
+        for resume_id, file_path, content_hash in rows:
+            result["checked"] += 1
+            if content_hash and file_path == store.path_for(content_hash):
+                continue
+            if not os.path.exists(file_path):
+                result["missing"] += 1
+                print(f"⚠️ 简历 {resume_id} 的文件不存在: {file_path}")
+                continue
+
+            sha256 = file_sha256(file_path)
+            target = store.path_for(sha256)
+            if os.path.exists(target):
+                result["deduplicated"] += 1
+            else:
+                result["moved"] += 1
+                if not dry_run:
+                    _link_or_copy(file_path, target)
+            if not dry_run:
+                resume = db.get(Resume, resume_id)
+                resume.file_path = target
+                resume.stored_filename = sha256
+                resume.content_hash = sha256
+                legacy_files.append(file_path)
+
+        if not dry_run:
+            db.commit()
+            for file_path in legacy_files:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+    return result
+
+
+def _modified_before(path: str, cutoff: float) -> bool:
+    try:
+        return os.stat(path).st_mtime < cutoff
+    except FileNotFoundError:
+        return False
+
+
+def reconcile_files(db: Session, store: BlobStore = resume_blobs, batch_size: int = 500,
+                    grace_seconds: int = settings.ORPHAN_GRACE_SECONDS, delete: bool = False,
+                    quarantine_dir: Optional[str] = None, dry_run: bool = False) -> dict:
+    """
+    对账存储目录和 resumes 表：
+    - 临时目录中超过宽限期的 .part 文件（上传进程崩溃遗留）删除
+    - 没有 Resume 引用且超过宽限期的文件移到 quarantine_dir（delete=True 时直接删除）
+    - Resume 引用的文件不存在时记入 missing（列出简历 ID，需要人工处理）
+    文件和记录都按批流式处理，内存占用与文件数量无关。
+    """
+    if quarantine_dir is None:
+        quarantine_dir = os.path.join(settings.UPLOAD_FOLDER, "orphans")
+    cutoff = time.time() - grace_seconds
+    result = {"scanned": 0, "recent": 0, "orphans": 0, "orphan_bytes": 0, "stale_temp": 0,
+              "checked": 0, "missing": 0, "missing_ids": []}
+
+    # 1. 上传中断遗留的临时文件
+    if os.path.isdir(store.temp_dir):
+        with os.scandir(store.temp_dir) as entries:
+            stale = [entry.path for entry in entries
+                     if entry.is_file(follow_symlinks=False) and _modified_before(entry.path, cutoff)]
+        for path in stale:
+            result["stale_temp"] += 1
+            if not dry_run:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    # 2. 没有 Resume 引用的文件
+    def handle_orphans(batch: List[Tuple[str, str]]):
+        referenced = set(db.execute(
+            select(Resume.content_hash).where(Resume.content_hash.in_([sha256 for sha256, _ in batch]))
+        ).scalars())
+        db.rollback()
+        for sha256, path in batch:
+            if sha256 in referenced:
+                continue
+            try:
+                stat_result = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if stat_result.st_mtime >= cutoff:
+                # 查询期间被重新上传
+                result["recent"] += 1
+                continue
+            result["orphans"] += 1
+            result["orphan_bytes"] += stat_result.st_size
+            if dry_run:
+                continue
+            if delete:
+                store._unlink(sha256)
+            else:
+                os.makedirs(quarantine_dir, exist_ok=True)
+                os.replace(path, os.path.join(quarantine_dir, sha256))
+            print(f"🧹 孤儿文件{'已删除' if delete else '已隔离'}: {sha256}")
+
+    batch = []
+    for sha256, path in store.iter_files():
+        result["scanned"] += 1
+        if not _modified_before(path, cutoff):
+            result["recent"] += 1
+            continue
+        batch.append((sha256, path))
+        if len(batch) >= batch_size:
+            handle_orphans(batch)
+            batch = []
+    if batch:
+        handle_orphans(batch)
+
+    # 3. 记录引用的文件不存在
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Resume.id, Resume.file_path)
+            .where(Resume.id > last_id).order_by(Resume.id).limit(batch_size)
+        ).all()
+        db.rollback()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for resume_id, file_path in rows:
+            result["checked"] += 1
+            if not os.path.exists(file_path):
+                result["missing"] += 1
+                result["missing_ids"].append(resume_id)
+                print(f"⚠️ 简历 {resume_id} 的文件不存在: {file_path}")
+    return result
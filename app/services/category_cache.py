@@ -0,0 +1,63 @@
+# app/services/category_cache.py
+"""
+题目分类列表缓存
+
+分类下的题目数通过一条 GROUP BY 查询统计，连同分类信息一起缓存在进程内。
+缓存按题库版本号（catalog_versions，见 question_catalog）区分：题目新增、删除、启用/停用、修改分类，
+或分类本身变化时版本号递增，下次构建题库快照时重新统计；版本号未变时直接返回缓存的列表。
+"""
+import threading
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.question import Question, QuestionCategory
+
+
+class CategoryListCache:
+    """带版本号的分类列表缓存"""
+
+    def __init__(self):
+        self._cached_version: Optional[int] = None
+        self._category_list: Optional[List[dict]] = None
+        self._lock = threading.Lock()
+
+    def get_category_list(self, db: Session, version: int) -> List[dict]:
+        """返回指定题库版本的分类列表（含题目数），缓存命中时不访问数据库"""
+        with self._lock:
+            if self._category_list is not None and self._cached_version == version:
+                return self._category_list
+
+        categories = db.query(QuestionCategory).filter(
+            QuestionCategory.is_active == True
+        ).order_by(QuestionCategory.sort_order).all()
+
+        # 一次查询统计所有分类的题目数
+        counts = dict(
+            db.query(Question.category, func.count(Question.id)).filter(
+                Question.is_active == True
+            ).group_by(Question.category).all()
+        )
+
+        category_list = [
+            {
+                "id": category.name.lower(),
+                "name": category.name,
+                "description": category.description,
+                "icon": category.icon or "Document",
+                "count": counts.get(category.name, 0)
+            }
+            for category in categories
+        ]
+
+        with self._lock:
+            # 并发构建时不用旧版本覆盖新版本
+            if self._cached_version is None or self._cached_version <= version:
+                self._category_list = category_list
+                self._cached_version = version
+        return category_list
+
+
+# 全局唯一的分类列表缓存
+category_cache = CategoryListCache()
@@ -0,0 +1,197 @@
+# app/services/interview_events.py
+"""
+面试事件推送（Server-Sent Events）
+
+每场面试一个频道，事件有递增的ID：
+- progress：提交答案后的进度，feedback / scoring_failed：评分完成或失败，completed：面试完成结果
+- 每个频道保留最近 INTERVIEW_EVENTS_BUFFER 条事件，客户端断线重连时带 Last-Event-ID 可以补发漏掉的事件；
+  补发不了（超出缓冲或进程重启过）时先发送一条 snapshot，由数据库中的当前状态重建
+- 评分 worker 在后台线程中发布事件，通过 call_soon_threadsafe 投递到订阅者所在的事件循环
+- 频道只存在于当前进程内，多进程部署时需要让同一场面试的请求落到同一进程（或换成外部消息队列）
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple
+
+from app.core.config import settings
+
+# 建议客户端断线后的重连间隔
+RECONNECT_DELAY_MS = 3000
+
+
+class InterviewEvent:
+    __slots__ = ("id", "type", "data")
+
+    def __init__(self, id: int, type: str, data: dict):
+        self.id = id
+        self.type = type
+        self.data = data
+
+    def encode(self) -> str:
+        payload = json.dumps(self.data, ensure_ascii=False, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class _Subscriber:
+    __slots__ = ("loop", "queue", "lagged")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.lagged = False
+
+    def deliver(self, event: InterviewEvent):
+        """在订阅者的事件循环中执行"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 消费太慢，断开后由客户端带 Last-Event-ID 重连补发
+            self.lagged = True
+
+
+class _Channel:
+    __slots__ = ("last_id", "events", "subscribers", "touched_at")
+
+    def __init__(self, buffer_size: int):
+        self.last_id = 0
+        self.events: Deque[InterviewEvent] = deque(maxlen=buffer_size)
+        self.subscribers: List[_Subscriber] = []
+        self.touched_at = time.time()
+
+
+class InterviewEventBus:
+    """进程内按面试ID分频道的事件总线"""
+
+    def __init__(self, buffer_size: int, retention: float, max_channels: int, max_queue: int = 256):
+        self.buffer_size = buffer_size
+        self.retention = retention
+        self.max_channels = max_channels
+        self.max_queue = max_queue
+        self._channels: "OrderedDict[int, _Channel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 指标
+        self.published = 0
+        self.dropped_channels = 0
+
+    def _channel(self, interview_id: int) -> _Channel:
+        channel = self._channels.get(interview_id)
+        if channel is None:
+            channel = self._channels[interview_id] = _Channel(self.buffer_size)
+        self._channels.move_to_end(interview_id)
+        channel.touched_at = time.time()
+        self._evict(interview_id)
+        return channel
+
+    def _evict(self, current_id: int):
+        """按最近使用顺序清理过期或超出数量上限的频道（有订阅者的频道保留）"""
+        now = time.time()
+        for interview_id in list(self._channels):
+            channel = self._channels[interview_id]
+            if len(self._channels) <= self.max_channels and now - channel.touched_at <= self.retention:
+                break
+            if channel.subscribers or interview_id == current_id:
+                continue
+            del self._channels[interview_id]
+            self.dropped_channels += 1
+
+    def publish(self, interview_id: int, event_type: str, data: dict) -> InterviewEvent:
+        """发布事件（任意线程都可以调用）"""
+        with self._lock:
+            channel = self._channel(interview_id)
+            channel.last_id += 1
+            event = InterviewEvent(channel.last_id, event_type, data)
+            channel.events.append(event)
+            subscribers = list(channel.subscribers)
+            self.published += 1
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+            except RuntimeError:
+                # 订阅者的事件循环已关闭
+                pass
+        return event
+
+    def subscribe(self, interview_id: int, last_event_id: Optional[int]) -> Tuple[_Subscriber, int, Optional[List[InterviewEvent]]]:
+        """
+        订阅频道，返回 (订阅者, 当前最新事件ID, 需要补发的事件)。
+        无法从 last_event_id 续传时补发列表为 None，调用方应先发送 snapshot。
+        """
+        subscriber = _Subscriber(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            channel = self._channel(interview_id)
+            channel.subscribers.append(subscriber)
+            backlog = None
+            if last_event_id is not None and last_event_id <= channel.last_id:
+                oldest = channel.events[0].id if channel.events else channel.last_id + 1
+                if last_event_id + 1 >= oldest:
+                    backlog = [e for e in channel.events if e.id > last_event_id]
+            return subscriber, channel.last_id, backlog
+
+    def unsubscribe(self, interview_id: int, subscriber: _Subscriber):
+        with self._lock:
+            channel = self._channels.get(interview_id)
+            if channel is not None and subscriber in channel.subscribers:
+                channel.subscribers.remove(subscriber)
+                channel.touched_at = time.time()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "subscribers": sum(len(c.subscribers) for c in self._channels.values()),
+                "published": self.published,
+                "dropped_channels": self.dropped_channels,
+            }
+
+
+# 全局唯一的面试事件总线
+interview_events = InterviewEventBus(
+    buffer_size=settings.INTERVIEW_EVENTS_BUFFER,
+    retention=settings.INTERVIEW_EVENTS_RETENTION,
+    max_channels=settings.INTERVIEW_EVENTS_MAX_CHANNELS,
+)
+
+
+async def event_stream(
+    interview_id: int,
+    last_event_id: Optional[int],
+    snapshot: Callable[[], Awaitable[dict]],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    heartbeat: float = settings.INTERVIEW_EVENTS_HEARTBEAT,
+) -> AsyncIterator[str]:
+    """
+    生成 SSE 文本流：必要时先发送 snapshot，再补发缓冲中的事件，之后实时推送；
+    空闲时每 heartbeat 秒发送一次注释行保活，面试完成后结束。
+    """
+    subscriber, latest_id, backlog = interview_events.subscribe(interview_id, last_event_id)
+    try:
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        if backlog is None:
+            # snapshot 的ID取订阅时的最新事件ID，之后的事件都会从队列中收到
+            state = await snapshot()
+            yield InterviewEvent(latest_id, "snapshot", state).encode()
+            if state.get("status") == "completed":
+                return
+            backlog = []
+        for event in backlog:
+            yield event.encode()
+            if event.type == "completed":
+                return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield ": heartbeat\n\n"
+                continue
+            yield event.encode()
+            if event.type == "completed" or subscriber.lagged:
+                return
+    finally:
+        interview_events.unsubscribe(interview_id, subscriber)
@@ -0,0 +1,195 @@
+# app/services/interview_plan.py
+"""
+面试题目计划缓存
+
+面试开始时题目就已经确定（题目、顺序、提示都不会再变），这里把一场面试的有序题目列表
+连同预先计算好的提示做成只读的 InterviewPlan：
+- GET /interviews/{id}/plan 一次返回整场面试的计划并带 ETag，前端可以在本地切换题目
+- /questions/{id}/next 作为兜底，命中缓存时不查库
+- 未命中时用一条 Interview LEFT JOIN InterviewQuestion 查询同时完成权限校验和加载
+计划中不含回答状态等会变化的字段，因此缓存不需要失效，只按 TTL + LRU 淘汰。
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.interview import Interview, InterviewQuestion
+
+
+class InterviewPlan:
+    """一场面试的只读题目计划"""
+    __slots__ = ("interview_id", "user_id", "total_questions", "questions", "etag", "_positions")
+
+    def __init__(self, interview_id: int, user_id: int, total_questions: int, questions: List[dict]):
+        self.interview_id = interview_id
+        self.user_id = user_id
+        self.total_questions = total_questions
+        self.questions = questions
+        # question_id -> 在 questions 中的下标
+        self._positions = {q["id"]: i for i, q in enumerate(questions)}
+        digest = hashlib.sha256(
+            json.dumps([interview_id, total_questions, questions], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        self.etag = f'"{digest[:32]}"'
+
+    @classmethod
+    def build(cls, interview_id: int, user_id: int, total_questions: Optional[int], questions,
+              hint_fn: Callable[[str], str]) -> "InterviewPlan":
+        """由按 order_index 排好序的题目（ORM 对象或行）构造计划"""
+        items = [
+            {
+                "id": q.id,
+                "text": q.question_text,
+                "type": q.question_type or "behavioral",
+                "difficulty": q.difficulty or "medium",
+                "hint": hint_fn(q.question_text),
+                "order_index": q.order_index,
+            }
+            for q in questions
+        ]
+        return cls(interview_id, user_id, total_questions if total_questions is not None else len(items), items)
+
+    def has_question(self, question_id: int) -> bool:
+        return question_id in self._positions
+
+    def next_after(self, question_id: int) -> Optional[dict]:
+        """某题之后的下一题，没有时返回 None"""
+        position = self._positions.get(question_id)
+        if position is None or position + 1 >= len(self.questions):
+            return None
+        return self.questions[position + 1]
+
+    def to_dict(self) -> dict:
+        return {
+            "interview_id": self.interview_id,
+            "total_questions": self.total_questions,
+            "questions": self.questions,
+        }
+
+
+class InterviewPlanCache:
+    """按面试ID缓存 InterviewPlan 的 TTL + LRU 缓存，同时维护 题目ID -> 面试ID 的索引"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # interview_id -> (过期时间, 计划)
+        self._entries: "OrderedDict[int, Tuple[float, InterviewPlan]]" = OrderedDict()
+        self._interview_by_question: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+        # 指标
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, interview_id: int) -> Optional[InterviewPlan]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(interview_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, plan = entry
+            if expires_at <= now:
+                self._remove(interview_id)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(interview_id)
+            self.hits += 1
+            return plan
+
+    def interview_id_for_question(self, question_id: int) -> Optional[int]:
+        with self._lock:
+            return self._interview_by_question.get(question_id)
+
+    def put(self, plan: InterviewPlan):
+        with self._lock:
+            self._remove(plan.interview_id)
+            self._entries[plan.interview_id] = (time.time() + self.ttl, plan)
+            for question in plan.questions:
+                self._interview_by_question[question["id"]] = plan.interview_id
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._interview_by_question.clear()
+
+    def _remove(self, interview_id: int):
+        entry = self._entries.pop(interview_id, None)
+        if entry is not None:
+            for question in entry[1].questions:
+                self._interview_by_question.pop(question["id"], None)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# 全局唯一的面试计划缓存
+interview_plans = InterviewPlanCache(
+    max_entries=settings.INTERVIEW_PLAN_CACHE_MAX_ENTRIES,
+    ttl=settings.INTERVIEW_PLAN_CACHE_TTL,
+)
+
+
+async def load_plan(db: AsyncSession, interview_id: int, hint_fn: Callable[[str], str]) -> Optional[InterviewPlan]:
+    """
+    读取面试计划：先查缓存，未命中时一条查询加载并写入缓存。
+    面试不存在时返回 None；调用方需自行比对 plan.user_id 做权限校验。
+    """
+    plan = interview_plans.get(interview_id)
+    if plan is not None:
+        return plan
+
+    rows = (await db.execute(
+        select(
+            Interview.user_id, Interview.total_questions,
+            InterviewQuestion.id, InterviewQuestion.question_text, InterviewQuestion.question_type,
+            InterviewQuestion.difficulty, InterviewQuestion.order_index
+        )
+        .select_from(Interview)
+        .outerjoin(InterviewQuestion, InterviewQuestion.interview_id == Interview.id)
+        .where(Interview.id == interview_id)
+        .order_by(InterviewQuestion.order_index)
+    )).all()
+    if not rows:
+        return None
+
+    questions = [row for row in rows if row.id is not None]
+    plan = InterviewPlan.build(interview_id, rows[0].user_id, rows[0].total_questions, questions, hint_fn)
+    interview_plans.put(plan)
+    return plan
+
+
+async def load_plan_for_question(db: AsyncSession, question_id: int,
+                                 hint_fn: Callable[[str], str]) -> Optional[InterviewPlan]:
+    """按题目ID读取所属面试的计划，题目不存在时返回 None"""
+    interview_id = interview_plans.interview_id_for_question(question_id)
+    if interview_id is None:
+        interview_id = (await db.execute(
+            select(InterviewQuestion.interview_id).where(InterviewQuestion.id == question_id)
+        )).scalar()
+        if interview_id is None:
+            return None
+    return await load_plan(db, interview_id, hint_fn)
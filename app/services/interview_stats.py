@@ -0,0 +1,291 @@
+# app/services/interview_stats.py
+"""
+用户面试统计的增量聚合
+
+InterviewStatistics 中每个评分维度保存 (次数, 总和, 平方和)：
+- 完成一场面试时用一条原子 UPDATE 累加（x = x + ?），O(1)，
+  并发完成的面试不会互相覆盖
+- 平均分 = 总和 / 次数，方差 = (平方和 - 总和²/次数) / (次数 - 1)，同样 O(1)
+- score_improvement 为综合评分的指数加权移动平均（近期表现）相对历史平均分的提升百分比
+- better_than_percent 由全局评分分布直方图（见 score_histogram）得出的真实百分位
+- backfill_statistics 用一次流式扫描为所有用户重建这些聚合
+"""
+import math
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_if_missing
+from app.models.interview import Interview, InterviewStatistics, ScoreHistogram
+from app.services import score_histogram
+
+# 参与统计的评分维度（对应 Interview.<维度>_score）
+SCORE_DIMENSIONS = ("overall", "professional", "expression", "logic", "adaptability", "professionalism")
+
+# 综合评分 EWMA 的平滑系数，越大越偏向最近几场面试
+EWMA_ALPHA = 0.3
+
+STATS_TABLE = InterviewStatistics.__table__
+
+
+class RunningStats:
+    """单个维度的 (次数, 总和, 平方和) 聚合"""
+    __slots__ = ("count", "total", "total_sq")
+
+    def __init__(self, count: int = 0, total: float = 0.0, total_sq: float = 0.0):
+        self.count = count or 0
+        self.total = total or 0.0
+        self.total_sq = total_sq or 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    @property
+    def variance(self) -> Optional[float]:
+        """样本方差"""
+        if self.count < 2:
+            return None
+        # 浮点误差可能让结果略小于0
+        return max(0.0, (self.total_sq - self.total * self.total / self.count) / (self.count - 1))
+
+    @property
+    def std(self) -> Optional[float]:
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+
+def dimension_stats(stats: InterviewStatistics, dimension: str) -> RunningStats:
+    """从统计记录中取出某个维度的聚合"""
+    return RunningStats(
+        getattr(stats, f"{dimension}_count"),
+        getattr(stats, f"{dimension}_sum"),
+        getattr(stats, f"{dimension}_sum_sq"),
+    )
+
+
+def improvement_percent(ewma: Optional[float], mean: Optional[float]) -> float:
+    """近期表现相对历史平均分的提升百分比"""
+    if ewma is None or not mean:
+        return 0.0
+    return (ewma - mean) * 100.0 / mean
+
+
+def _interview_score(interview, dimension: str) -> Optional[float]:
+    return getattr(interview, f"{dimension}_score")
+
+
+def _insert_if_missing(dialect_name: str, user_id: int):
+    """插入空统计记录，已存在时忽略（并发完成面试时只会有一条成功）"""
+    return insert_if_missing(dialect_name, STATS_TABLE, {"user_id": user_id}, ["user_id"])
+
+
+def _increment_values(interview: Interview, finished_at: datetime) -> dict:
+    """完成一场面试时需要原子累加的列（右侧引用的都是更新前的值）"""
+    c = STATS_TABLE.c
+    values = {
+        "total_interviews": func.coalesce(c.total_interviews, 0) + 1,
+        "total_practice": func.coalesce(c.total_practice, 0) + (1 if interview.type == "practice" else 0),
+        "total_simulation": func.coalesce(c.total_simulation, 0) + (0 if interview.type == "practice" else 1),
+        "total_time_minutes": func.coalesce(c.total_time_minutes, 0) + (interview.actual_duration or 0),
+        "last_interview_date": finished_at,
+    }
+
+    for dimension in SCORE_DIMENSIONS:
+        score = _interview_score(interview, dimension)
+        if score is None:
+            continue
+        count = func.coalesce(c[f"{dimension}_count"], 0) + 1
+        total = func.coalesce(c[f"{dimension}_sum"], 0.0) + score
+        values[f"{dimension}_count"] = count
+        values[f"{dimension}_sum"] = total
+        values[f"{dimension}_sum_sq"] = func.coalesce(c[f"{dimension}_sum_sq"], 0.0) + score * score
+        values[f"avg_{dimension}_score"] = total / count
+
+    overall = interview.overall_score
+    if overall is not None:
+        ewma = case(
+            (c.overall_ewma.is_(None), overall),
+            else_=c.overall_ewma + EWMA_ALPHA * (overall - c.overall_ewma)
+        )
+        mean = (func.coalesce(c.overall_sum, 0.0) + overall) / (func.coalesce(c.overall_count, 0) + 1)
+        values["overall_ewma"] = ewma
+        values["score_improvement"] = case((mean > 0, (ewma - mean) * 100.0 / mean), else_=0.0)
+
+    return values
+
+
+async def ensure_statistics_row(db: AsyncSession, user_id: int):
+    """确保用户有统计记录"""
+    dialect_name = db.get_bind().dialect.name
+    await db.execute(_insert_if_missing(dialect_name, user_id))
+
+
+async def record_completed_interview(db: AsyncSession, user_id: int, interview: Interview):
+    """
+    把一场已完成面试计入用户统计和评分分布（O(桶数)，在调用方的事务内执行）。
+    """
+    await ensure_statistics_row(db, user_id)
+    await db.execute(
+        update(InterviewStatistics)
+        .where(InterviewStatistics.user_id == user_id)
+        .values(**_increment_values(interview, interview.finished_at or datetime.utcnow()))
+        .execution_options(synchronize_session=False)
+    )
+
+    overall = interview.overall_score
+    if overall is None:
+        return
+    await score_histogram.record_interview_score(db, interview.position, overall)
+
+    # 上面的 UPDATE 已锁住该行，此时读到的就是包含本场面试的聚合，据此推出更新前的平均分
+    count, total = (await db.execute(
+        select(InterviewStatistics.overall_count, InterviewStatistics.overall_sum)
+        .where(InterviewStatistics.user_id == user_id)
+    )).one()
+    new_average = total / count
+    old_average = (total - overall) / (count - 1) if count > 1 else None
+    await score_histogram.record_user_average(db, old_average, new_average)
+
+    histogram = await score_histogram.load_histogram(db, score_histogram.GLOBAL_SCOPE)
+    await db.execute(
+        update(InterviewStatistics)
+        .where(InterviewStatistics.user_id == user_id)
+        .values(better_than_percent=score_histogram.better_than_percent(histogram, new_average))
+        .execution_options(synchronize_session=False)
+    )
+
+
+class _UserAggregate:
+    """回填时在内存中累加一个用户的统计"""
+
+    def __init__(self):
+        self.total_interviews = 0
+        self.total_practice = 0
+        self.total_simulation = 0
+        self.total_time_minutes = 0
+        self.dimensions: Dict[str, RunningStats] = {d: RunningStats() for d in SCORE_DIMENSIONS}
+        self.overall_ewma: Optional[float] = None
+        self.last_interview_date = None
+
+    def add(self, interview):
+        self.total_interviews += 1
+        if interview.type == "practice":
+            self.total_practice += 1
+        else:
+            self.total_simulation += 1
+        self.total_time_minutes += interview.actual_duration or 0
+        for dimension in SCORE_DIMENSIONS:
+            score = _interview_score(interview, dimension)
+            if score is not None:
+                self.dimensions[dimension].add(score)
+        overall = interview.overall_score
+        if overall is not None:
+            self.overall_ewma = overall if self.overall_ewma is None else \
+                self.overall_ewma + EWMA_ALPHA * (overall - self.overall_ewma)
+        if interview.finished_at is not None:
+            self.last_interview_date = interview.finished_at
+
+    def values(self) -> dict:
+        values = {
+            "total_interviews": self.total_interviews,
+            "total_practice": self.total_practice,
+            "total_simulation": self.total_simulation,
+            "total_time_minutes": self.total_time_minutes,
+            "overall_ewma": self.overall_ewma,
+            "score_improvement": improvement_percent(self.overall_ewma, self.dimensions["overall"].mean),
+            "last_interview_date": self.last_interview_date,
+        }
+        for dimension, running in self.dimensions.items():
+            values[f"{dimension}_count"] = running.count
+            values[f"{dimension}_sum"] = running.total
+            values[f"{dimension}_sum_sq"] = running.total_sq
+            values[f"avg_{dimension}_score"] = running.mean
+        return values
+
+
+def aggregate_interviews(interviews) -> dict:
+    """按完成时间顺序聚合若干场面试，返回统计记录各列的值"""
+    aggregate = _UserAggregate()
+    for interview in sorted(interviews, key=lambda i: (i.finished_at or datetime.min, i.id or 0)):
+        aggregate.add(interview)
+    return aggregate.values()
+
+
+def backfill_statistics(db: Session, batch_size: int = 1000) -> int:
+    """
+    为所有用户重建统计聚合，返回处理的用户数。
+    已完成的面试按 (user_id, 完成时间) 顺序流式读取，内存中只保留当前用户的累加器；
+    读取使用独立连接，所有写入在 db 的同一个事务中提交。
+    聚合重建后再重建评分分布直方图，并按直方图刷新每个用户的 better_than_percent。
+    """
+    # 先清零，没有已完成面试的用户也会被重置
+    db.execute(update(InterviewStatistics).values(**_UserAggregate().values()))
+
+    columns = [Interview.id, Interview.user_id, Interview.type, Interview.actual_duration,
+               Interview.finished_at] + [getattr(Interview, f"{d}_score") for d in SCORE_DIMENSIONS]
+    stream = select(*columns).where(Interview.status == "completed").order_by(
+        Interview.user_id, Interview.finished_at, Interview.id
+    )
+
+    dialect_name = db.get_bind().dialect.name
+    users = 0
+
+    def flush(user_id, aggregate):
+        db.execute(_insert_if_missing(dialect_name, user_id))
+        db.execute(
+            update(InterviewStatistics)
+            .where(InterviewStatistics.user_id == user_id)
+            .values(**aggregate.values())
+        )
+
+    with db.get_bind().connect() as reader:
+        current_user_id, aggregate = None, None
+        result = reader.execution_options(yield_per=batch_size).execute(stream)
+        for row in result:
+            if row.user_id != current_user_id:
+                if aggregate is not None:
+                    flush(current_user_id, aggregate)
+                    users += 1
+                current_user_id, aggregate = row.user_id, _UserAggregate()
+            aggregate.add(row)
+        if aggregate is not None:
+            flush(current_user_id, aggregate)
+            users += 1
+
+    score_histogram.rebuild_histograms(db, batch_size=batch_size)
+    refresh_better_than_percent(db)
+
+    db.commit()
+    return users
+
+
+def refresh_better_than_percent(db: Session):
+    """按当前全局直方图重新计算所有用户的 better_than_percent（由调用方提交）"""
+    histogram = score_histogram.histogram_from_rows(db.execute(
+        select(ScoreHistogram.bucket, ScoreHistogram.count)
+        .where(ScoreHistogram.scope == score_histogram.GLOBAL_SCOPE)
+    ))
+
+    # 同一分数段的用户排名相同，按桶批量更新
+    c = STATS_TABLE.c
+    db.execute(update(InterviewStatistics).values(better_than_percent=0.0))
+    for bucket, count in enumerate(histogram):
+        if not count:
+            continue
+        conditions = [c.overall_count > 0, c.avg_overall_score >= bucket]
+        if bucket < score_histogram.BUCKET_COUNT - 1:
+            conditions.append(c.avg_overall_score < bucket + 1)
+        db.execute(
+            update(InterviewStatistics)
+            .where(*conditions)
+            .values(better_than_percent=score_histogram.better_than_percent(histogram, bucket))
+        )
@@ -0,0 +1,215 @@
+# app/services/keyword_scorer.py
+"""
+关键词覆盖率评分
+
+按题库中题目的答题要点（key_points）和标签（tags）给回答打分，结果是确定的：
+- 每个要点拆成若干关键词：英文/数字词整体保留，中文去掉"说明""结合"等描述性词语后取相邻两字
+- 所有关键词编译成一个 Aho-Corasick 自动机，对回答只扫描一遍就能找出全部命中的关键词
+- 一个要点命中一半以上的关键词即视为覆盖；得分 = 1 + 4 × 覆盖率（与原来的 0-5 分制一致）
+- 自动机按 (要点, 标签) 的原始 JSON 缓存（LRU），在线程池和进程池中都可以直接使用
+- 题目和回答都做归一化：NFKC（全角转半角）、小写、去掉空白和标点
+没有要点和标签的题目（如通用行为题）按回答长度给出完整度评分。
+"""
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 要点中只描述答题方式、不代表知识点的词语，拆关键词前去掉
+INSTRUCTION_WORDS = (
+    "重点说明", "重点", "说明", "解释", "结合", "举例", "例子", "具体", "实际", "项目经验", "经验",
+    "能够", "清楚", "准确", "介绍", "对比", "列举", "提及", "每个", "给出", "相关", "方案",
+    "基本", "思想", "概念", "特性", "场景", "应用", "问题", "方面", "角度", "展开", "体现",
+    "表现", "如何", "什么", "以及", "并且", "或者", "最新", "常见", "主要", "理解",
+)
+# 单字虚词
+STOP_CHARS = set("的了和与及或等如在中对从是为把被让给并其各个三两一")
+
+# 要点命中多少比例的关键词算覆盖
+POINT_COVERED_RATIO = 0.5
+# 覆盖率中要点和标签的权重
+POINT_WEIGHT = 0.8
+TAG_WEIGHT = 0.2
+# 没有要点时，回答达到多少字视为完整
+COMPLETE_ANSWER_LENGTH = 150
+
+_NON_WORD = re.compile(r"[^\w.+#]+|_")
+_ASCII_WORD = re.compile(r"[a-z0-9][a-z0-9.+#]*")
+_CJK_RUN = re.compile(r"[一-鿿]+")
+
+
+def normalize(text: str) -> str:
+    """NFKC、小写，去掉空白和标点（保留 . + # 以区分 Vue.js / C++ / C#）"""
+    # 先去掉标点（包括全角标点），剩下的文本通常已经是 NFKC 形式，可以跳过较慢的归一化
+    text = _NON_WORD.sub("", text or "")
+    if not unicodedata.is_normalized("NFKC", text):
+        text = _NON_WORD.sub("", unicodedata.normalize("NFKC", text))
+    return text.lower()
+
+
+def point_terms(point: str) -> Set[str]:
+    """从一条答题要点中提取关键词"""
+    text = unicodedata.normalize("NFKC", point or "").lower()
+    terms = set()
+    for word in _ASCII_WORD.findall(text):
+        word = word.strip(".")
+        if len(word) >= 2:
+            terms.add(word)
+    for instruction in INSTRUCTION_WORDS:
+        text = text.replace(instruction, " ")
+    for run in _CJK_RUN.findall(text):
+        for i in range(len(run) - 1):
+            bigram = run[i:i + 2]
+            if bigram[0] not in STOP_CHARS and bigram[1] not in STOP_CHARS:
+                terms.add(bigram)
+    return terms
+
+
+class KeywordMatcher:
+    """多模式串匹配（Aho-Corasick）：构建 O(模式串总长)，匹配 O(文本长度 + 命中数)"""
+    __slots__ = ("_goto", "_fail", "_output", "patterns")
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[int]] = [[]]
+        index: Dict[str, int] = {}
+        for pattern in patterns:
+            if not pattern or pattern in index:
+                continue
+            index[pattern] = len(self.patterns)
+            self.patterns.append(pattern)
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._output.append([])
+                node = nxt
+            self._output[node].append(index[pattern])
+
+        # 按层 BFS 建立失败指针，并把失败指针上的输出合并进来
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> Set[int]:
+        """返回 text 中出现过的模式串下标"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found: Set[int] = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+class CompiledQuestion:
+    """一道题编译后的匹配器：要点 -> 关键词下标，标签 -> 下标"""
+    __slots__ = ("points", "point_terms", "tags", "tag_terms", "matcher")
+
+    def __init__(self, points: List[str], tags: List[str]):
+        # 只含描述性词语、提取不出关键词的要点（如"结合实际项目经验举例说明"）不参与评分
+        extracted = [(p, sorted(point_terms(p))) for p in points]
+        self.points = [p for p, terms in extracted if terms]
+        self.tags = tags
+        per_point = [terms for _, terms in extracted if terms]
+        per_tag = [normalize(t) for t in tags]
+        self.matcher = KeywordMatcher([t for terms in per_point for t in terms] + [t for t in per_tag if t])
+        position = {p: i for i, p in enumerate(self.matcher.patterns)}
+        self.point_terms: List[Tuple[int, ...]] = [tuple(position[t] for t in terms) for terms in per_point]
+        self.tag_terms: List[Optional[int]] = [position.get(t) for t in per_tag]
+
+
+def _load_list(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v]
+    try:
+        items = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return [str(v) for v in items if v] if isinstance(items, list) else []
+
+
+@lru_cache(maxsize=4096)
+def compile_question(key_points: Optional[str], tags: Optional[str]) -> CompiledQuestion:
+    """按题目要点/标签的原始 JSON 编译并缓存匹配器"""
+    return CompiledQuestion(_load_list(key_points), _load_list(tags))
+
+
+def score_answer(question_text: str, answer_text: str,
+                 key_points: Optional[str] = None, tags: Optional[str] = None) -> dict:
+    """按要点/标签覆盖率评分，返回与原 AI 反馈相同结构的字典，另含覆盖的和缺失的要点"""
+    compiled = compile_question(key_points, tags)
+    text = normalize(answer_text)
+
+    if not compiled.points and not compiled.tags:
+        completeness = min(1.0, len(text) / COMPLETE_ANSWER_LENGTH)
+        return {
+            "score": round(1.0 + 4.0 * completeness, 1),
+            "pros": "回答内容较为完整。" if completeness >= 0.6 else "已给出回答。",
+            "cons": "可以使用STAR法则补充更多细节。" if completeness < 1.0 else "注意控制回答时长，突出重点。",
+            "reference": "参考答案：建议从具体背景开始，然后介绍解决方案和结果。",
+            "keyword_match": None,
+            "coverage": round(completeness, 3),
+            "covered_points": [],
+            "missing_points": [],
+        }
+
+    found = compiled.matcher.find(text)
+
+    covered, missing = [], []
+    for point, term_ids in zip(compiled.points, compiled.point_terms):
+        hits = sum(1 for t in term_ids if t in found)
+        if hits >= POINT_COVERED_RATIO * len(term_ids):
+            covered.append(point)
+        else:
+            missing.append(point)
+    tag_hits = sum(1 for t in compiled.tag_terms if t is not None and t in found)
+
+    point_coverage = len(covered) / len(compiled.points) if compiled.points else None
+    tag_coverage = tag_hits / len(compiled.tags) if compiled.tags else None
+    if point_coverage is None:
+        coverage = tag_coverage
+    elif tag_coverage is None:
+        coverage = point_coverage
+    else:
+        coverage = POINT_WEIGHT * point_coverage + TAG_WEIGHT * tag_coverage
+
+    if covered:
+        pros = "回答覆盖了：" + "；".join(covered)
+    elif coverage > 0:
+        # 只命中了标签关键词
+        pros = "回答方向基本正确。"
+    else:
+        pros = "未覆盖任何答题要点。"
+
+    return {
+        "score": round(1.0 + 4.0 * coverage, 1),
+        "pros": pros,
+        "cons": ("可以补充：" + "；".join(missing)) if missing else "要点覆盖完整，可以进一步结合实际案例。",
+        "reference": "参考要点：" + "；".join(compiled.points) if compiled.points else "参考答案：建议围绕题目标签展开。",
+        "keyword_match": round(coverage, 3),
+        "coverage": round(coverage, 3),
+        "covered_points": covered,
+        "missing_points": missing,
+    }
@@ -0,0 +1,284 @@
+# app/services/question_catalog.py
+"""
+进程内题库快照
+
+题库是读多写少的数据（主要由 init_questions_data.py 导入），列表、详情和面试出题
+都直接读取启动时构建的快照，不再每次请求都加载 Question ORM 对象并 json.loads
+tags / key_points / related_topics。
+
+快照与数据库中的 catalog_versions.version 绑定：
+- 本进程提交了题目/分类变更时，在同一事务内递增版本号，并在提交后立即让快照失效
+- 其他进程（或绕过 ORM 的脚本）修改后，最多 CATALOG_VERSION_CHECK_INTERVAL 秒内
+  检测到版本号变化并重建快照
+
+浏览数、收藏数等计数字段变化频繁，不放进快照，也不会触发版本号变化；列表按页单独读取最新值。
+"""
+import json
+import threading
+import time
+from bisect import bisect_right
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect as sa_inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.question import CatalogVersion, Question, QuestionCategory
+from app.services.category_cache import category_cache
+
+CATALOG_NAME = "questions"
+
+# 会影响快照内容的题目字段（计数字段除外）
+CATALOG_FIELDS = [
+    "title", "description", "category", "sub_category", "difficulty", "tags",
+    "answer", "key_points", "related_topics", "interviewer_perspective",
+    "is_active", "is_featured",
+]
+
+# 快照中每道题读取的列
+CATALOG_COLUMNS = (
+    Question.id, Question.title, Question.description, Question.category,
+    Question.sub_category, Question.difficulty, Question.tags, Question.answer,
+    Question.key_points, Question.related_topics, Question.interviewer_perspective,
+    Question.is_featured, Question.created_at,
+)
+
+_DIRTY_KEY = "question_catalog_dirty"
+_BUMPED_KEY = "question_catalog_bumped"
+
+
+def _load_list(raw: Optional[str]) -> Tuple[str, ...]:
+    if not raw:
+        return ()
+    try:
+        return tuple(str(item) for item in json.loads(raw))
+    except (TypeError, ValueError):
+        return ()
+
+
+class CatalogQuestion:
+    """快照中的一道题（字段均已解码，只读）"""
+    __slots__ = (
+        "id", "title", "description", "category", "sub_category", "difficulty",
+        "tags", "answer", "key_points", "related_topics", "interviewer_perspective",
+        "is_featured", "created_at",
+    )
+
+    def __init__(self, row):
+        self.id = row.id
+        self.title = row.title
+        self.description = row.description
+        self.category = row.category
+        self.sub_category = row.sub_category
+        self.difficulty = row.difficulty
+        self.tags = _load_list(row.tags)
+        self.answer = row.answer
+        self.key_points = _load_list(row.key_points)
+        self.related_topics = _load_list(row.related_topics)
+        self.interviewer_perspective = row.interviewer_perspective
+        self.is_featured = bool(row.is_featured)
+        self.created_at = row.created_at.strftime("%Y-%m-%d %H:%M:%S") if row.created_at else None
+
+    def to_list_item(self, views: int, stars: int) -> dict:
+        """题目列表中的展示格式（计数字段由调用方传入最新值）"""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "category": self.category,
+            "sub_category": self.sub_category,
+            "difficulty": self.difficulty,
+            "tags": list(self.tags),
+            "views": views,
+            "stars": stars,
+            "is_featured": self.is_featured,
+            "created_at": self.created_at
+        }
+
+
+class CatalogSnapshot:
+    """某个版本的题库快照"""
+
+    def __init__(self, version: int, questions: List[CatalogQuestion], category_list: List[dict]):
+        self.version = version
+        # 按 id 升序
+        self.questions = questions
+        self.by_id: Dict[int, CatalogQuestion] = {q.id: q for q in questions}
+
+        # 预先按 (分类, 难度) 的所有组合建立有序列表，None 表示不筛选
+        self._filtered: Dict[Tuple[Optional[str], Optional[str]], List[CatalogQuestion]] = {}
+        category_names = {q.category for q in questions}
+        difficulties = {q.difficulty for q in questions}
+        for cat, diff in product([None, *category_names], [None, *difficulties]):
+            self._filtered[(cat, diff)] = [
+                q for q in questions
+                if (cat is None or q.category == cat) and (diff is None or q.difficulty == diff)
+            ]
+
+        # 分类列表（含题目数），由 category_cache 按同一版本号统计
+        self.category_list = category_list
+
+    def get(self, question_id: int) -> Optional[CatalogQuestion]:
+        return self.by_id.get(question_id)
+
+    def filter(self, category: Optional[str] = None, difficulty: Optional[str] = None,
+               tags: Optional[List[str]] = None) -> List[CatalogQuestion]:
+        """按分类、难度、标签筛选，结果按 id 升序"""
+        items = self._filtered.get((category, difficulty), [])
+        if tags:
+            items = [q for q in items if all(any(tag in t for t in q.tags) for tag in tags)]
+        return items
+
+    @staticmethod
+    def page_after(items: List[CatalogQuestion], last_id: Optional[int], limit: int):
+        """在按 id 升序的结果中取 id 大于 last_id 的一页，返回 (本页, 是否还有更多)"""
+        start = bisect_right(items, last_id, key=lambda q: q.id) if last_id is not None else 0
+        return items[start:start + limit], start + limit < len(items)
+
+
+class QuestionCatalog:
+    """负责构建和刷新题库快照"""
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.rebuild_count = 0
+
+    def invalidate(self):
+        """本进程内立即失效，下次访问时检查数据库版本号"""
+        self._next_check = 0.0
+
+    def get(self, db: Session) -> CatalogSnapshot:
+        """获取最新快照；在检查间隔内直接返回内存中的快照"""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now < self._next_check:
+            return snapshot
+
+        version = read_catalog_version(db)
+        if snapshot is not None and snapshot.version == version:
+            self._next_check = now + self.check_interval
+            return snapshot
+
+        with self._lock:
+            # 其他线程可能已经完成重建
+            if self._snapshot is not None and self._snapshot.version == version:
+                return self._snapshot
+            snapshot = self._build(db, version)
+            self._snapshot = snapshot
+            self._next_check = now + self.check_interval
+            self.rebuild_count += 1
+        return snapshot
+
+    async def get_async(self, db: AsyncSession) -> CatalogSnapshot:
+        """
+        异步接口使用的 get。
+        不能在事件循环线程里持有 threading.Lock 等待数据库IO，因此这里不加锁构建，
+        并发请求同时发现版本变化时可能重复构建一次，结果相同。
+        """
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now < self._next_check:
+            return snapshot
+
+        version = await db.run_sync(read_catalog_version)
+        if snapshot is None or snapshot.version != version:
+            snapshot = await db.run_sync(self._build, version)
+            with self._lock:
+                if self._snapshot is None or self._snapshot.version <= version:
+                    self._snapshot = snapshot
+                    self.rebuild_count += 1
+        self._next_check = now + self.check_interval
+        return snapshot
+
+    def _build(self, db: Session, version: int) -> CatalogSnapshot:
+        rows = db.query(*CATALOG_COLUMNS).filter(Question.is_active == True).order_by(Question.id).all()
+        category_list = category_cache.get_category_list(db, version)
+        return CatalogSnapshot(version, [CatalogQuestion(row) for row in rows], category_list)
+
+    def metrics(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "questions": len(snapshot.questions) if snapshot else 0,
+            "rebuild_count": self.rebuild_count,
+        }
+
+
+async def load_questions(db: AsyncSession, question_ids: List[int]) -> Dict[int, CatalogQuestion]:
+    """从数据库读取快照中还没有的题目（其他进程刚新增、本进程快照尚未刷新）"""
+    if not question_ids:
+        return {}
+    rows = (await db.execute(select(*CATALOG_COLUMNS).where(Question.id.in_(question_ids)))).all()
+    return {row.id: CatalogQuestion(row) for row in rows}
+
+
+def read_catalog_version(db: Session) -> int:
+    """读取数据库中的题库版本号"""
+    version = db.query(CatalogVersion.version).filter(
+        CatalogVersion.name == CATALOG_NAME
+    ).scalar()
+    return version or 0
+
+
+def bump_catalog_version(session: Session):
+    """在当前事务内递增题库版本号"""
+    table = CatalogVersion.__table__
+    connection = session.connection()
+    result = connection.execute(
+        update(table).where(table.c.name == CATALOG_NAME).values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(name=CATALOG_NAME, version=1))
+
+
+# 全局唯一的题库快照
+question_catalog = QuestionCatalog(check_interval=settings.CATALOG_VERSION_CHECK_INTERVAL)
+
+
+# ===== 版本号维护（ORM 事件）=====
+
+def _mark_dirty(target):
+    session = object_session(target)
+    if session is not None:
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Question, "after_insert")
+@event.listens_for(Question, "after_delete")
+@event.listens_for(QuestionCategory, "after_insert")
+@event.listens_for(QuestionCategory, "after_update")
+@event.listens_for(QuestionCategory, "after_delete")
+def _catalog_changed(mapper, connection, target):
+    _mark_dirty(target)
+
+
+@event.listens_for(Question, "after_update")
+def _question_updated(mapper, connection, target):
+    state = sa_inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in CATALOG_FIELDS):
+        _mark_dirty(target)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_version_after_flush(session, flush_context):
+    # 同一事务内只递增一次
+    if session.info.pop(_DIRTY_KEY, False) and not session.info.get(_BUMPED_KEY):
+        bump_catalog_version(session)
+        session.info[_BUMPED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_BUMPED_KEY, False):
+        question_catalog.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(_BUMPED_KEY, None)
@@ -0,0 +1,142 @@
+# app/services/question_sampler.py
+"""
+面试出题采样器
+
+基于题库快照预先建立 (分类, 难度) -> 题目ID数组 的索引，岗位映射到若干分类。
+开始面试时只需随机抽取 k 个下标（O(k)），再从快照中取出选中的题目，
+不再把整个题池加载成 ORM 对象后 random.sample。
+支持排除用户已经做过的题目，可选题不足时自动放宽。
+"""
+import random
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.interview import Interview, InterviewQuestion
+from app.services.question_catalog import CatalogQuestion, CatalogSnapshot
+
+# 岗位 -> 出题分类
+POSITION_CATEGORIES = {
+    "frontend": ["前端开发", "算法数据结构"],
+    "backend": ["后端开发", "算法数据结构"],
+}
+
+# 面试难度 -> 题库难度
+DIFFICULTY_LEVELS = {
+    "junior": "简单",
+    "medium": "中等",
+    "senior": "困难",
+}
+
+
+class QuestionSampler:
+    """按岗位/分类/难度分桶的题目ID索引，随题库快照版本重建"""
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._pools: Dict[Tuple[str, str], List[int]] = {}
+        self._categories: List[str] = []
+        self._lock = threading.Lock()
+
+    def _ensure_index(self, snapshot: CatalogSnapshot):
+        if self._version == snapshot.version:
+            return
+        with self._lock:
+            if self._version == snapshot.version:
+                return
+            pools: Dict[Tuple[str, str], List[int]] = {}
+            for q in snapshot.questions:
+                pools.setdefault((q.category, q.difficulty), []).append(q.id)
+            self._pools = pools
+            self._categories = sorted({category for category, _ in pools})
+            self._version = snapshot.version
+
+    def _candidate_pools(self, position: str, difficulty: Optional[str]) -> List[List[int]]:
+        """按优先级返回候选题池：先是目标难度，再是同分类其他难度"""
+        categories = POSITION_CATEGORIES.get(position, self._categories)
+        level = DIFFICULTY_LEVELS.get(difficulty)
+        preferred, others = [], []
+        for (category, diff), ids in self._pools.items():
+            if category not in categories:
+                continue
+            if level is None or diff == level:
+                preferred.append(ids)
+            else:
+                others.append(ids)
+        return [pool for pool in (preferred, others) if pool]
+
+    @staticmethod
+    def _pick(pools: List[List[int]], k: int, excluded: Set[int]) -> List[int]:
+        """从若干题池组成的虚拟数组中随机抽取 k 个不重复且未被排除的ID"""
+        sizes = [len(pool) for pool in pools]
+        total = sum(sizes)
+        if total == 0 or k <= 0:
+            return []
+
+        chosen: List[int] = []
+        seen: Set[int] = set()
+        # 排除集合很大时随机探测命中率低，限制尝试次数后改为线性筛选
+        attempts = 0
+        max_attempts = k * 8
+        while len(chosen) < k and attempts < max_attempts:
+            attempts += 1
+            index = random.randrange(total)
+            for pool, size in zip(pools, sizes):
+                if index < size:
+                    question_id = pool[index]
+                    break
+                index -= size
+            if question_id in seen or question_id in excluded:
+                continue
+            seen.add(question_id)
+            chosen.append(question_id)
+
+        if len(chosen) < k:
+            remaining = [
+                qid for pool in pools for qid in pool
+                if qid not in seen and qid not in excluded
+            ]
+            chosen.extend(random.sample(remaining, min(k - len(chosen), len(remaining))))
+        return chosen
+
+    def sample(self, snapshot: CatalogSnapshot, position: str, difficulty: Optional[str], k: int,
+               exclude_ids: Iterable[int] = ()) -> List[CatalogQuestion]:
+        """
+        从题库快照中为面试抽取 k 道题。
+        优先目标难度、排除已做过的题；不足时依次放宽难度和排除条件。
+        """
+        self._ensure_index(snapshot)
+
+        excluded = set(exclude_ids)
+        chosen: List[int] = []
+        for pool_group in self._candidate_pools(position, difficulty):
+            chosen += self._pick(pool_group, k - len(chosen), excluded | set(chosen))
+            if len(chosen) >= k:
+                break
+
+        if len(chosen) < k and excluded:
+            # 题库不够时允许重复出现做过的题
+            all_pools = [pool for group in self._candidate_pools(position, None) for pool in group]
+            chosen += self._pick(all_pools, k - len(chosen), set(chosen))
+
+        questions = [snapshot.get(qid) for qid in chosen]
+        return [q for q in questions if q is not None]
+
+
+async def get_seen_question_ids(db: AsyncSession, user_id: int) -> Set[int]:
+    """用户在历史面试中已经做过的题库题目ID"""
+    result = await db.execute(
+        select(InterviewQuestion.question_id).join(
+            Interview, Interview.id == InterviewQuestion.interview_id
+        ).where(
+            Interview.user_id == user_id,
+            InterviewQuestion.question_id.isnot(None)
+        ).distinct()
+    )
+    return set(result.scalars())
+
+
+# 全局唯一的出题采样器
+question_sampler = QuestionSampler()
@@ -0,0 +1,309 @@
+# app/services/resume_parser.py
+"""
+简历文本提取与结构化
+
+在解析进程池中执行（parse_resume_file 只依赖文件路径和类型，可以跨进程调用）：
+- DOCX：直接读 zip 中的 word/document.xml，按段落提取文本，解压后大小有上限（防止压缩炸弹）
+- PDF：使用 pypdf（见 requirements.txt）；未安装时用内置的简单提取（只解压 FlateDecode 内容流，读取 Tj/TJ 文本，
+  图片等其他流跳过），只能处理使用标准编码字体的 PDF，遇到中文等 CID 字体或解码出乱码时抛出 UnsupportedDocument，
+  不保存无法识别的文本
+- DOC（旧版二进制格式）不支持，抛出 UnsupportedDocument
+结构化数据按章节标题切分：教育经历、专业技能、项目经验；技能另外按技能词表在全文中匹配。
+"""
+import re
+import zipfile
+import zlib
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+try:
+    # pip install pypdf（requirements.txt 中已列出，缺少时退回内置提取）
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+# 提取出的文本最多保留的字符数
+MAX_TEXT_LENGTH = 200_000
+# DOCX 中 document.xml 解压后的大小上限
+MAX_XML_BYTES = 50 * 1024 * 1024
+# 内置 PDF 提取时单个内容流解压后的大小上限
+MAX_STREAM_BYTES = 20 * 1024 * 1024
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class UnsupportedDocument(Exception):
+    """文件格式不支持或内容无法识别（重试也不会成功）"""
+
+
+# ===== 文本提取 =====
+
+def extract_docx_text(path: str) -> str:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            info = archive.getinfo("word/document.xml")
+            if info.file_size > MAX_XML_BYTES:
+                raise UnsupportedDocument("document.xml 过大")
+            with archive.open(info) as xml:
+                paragraphs, current = [], []
+                for event, element in ElementTree.iterparse(xml, events=("end",)):
+                    if element.tag == _W_NS + "t" and element.text:
+                        current.append(element.text)
+                    elif element.tag == _W_NS + "tab":
+                        current.append("\t")
+                    elif element.tag in (_W_NS + "br", _W_NS + "cr"):
+                        current.append("\n")
+                    elif element.tag == _W_NS + "p":
+                        paragraphs.append("".join(current))
+                        current = []
+                        element.clear()
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise UnsupportedDocument(f"无法读取 DOCX: {e}")
+    return "\n".join(paragraphs)
+
+
+# 紧跟 stream 关键字的流字典（允许两层嵌套字典和十六进制字符串）
+_PDF_STREAM = re.compile(rb"<<((?:[^<>]|<<(?:[^<>]|<<[^<>]*>>|<[^<>]*>)*>>|<[^<>]*>)*)>>\s*stream\r?\n")
+_PDF_FILTER = re.compile(rb"/Filter\s*(\[[^\]]*\]|/[A-Za-z0-9]+)")
+# 不含页面文本的流：图片、字体程序、交叉引用流、对象流、元数据、附件
+_PDF_NON_TEXT = re.compile(rb"/Subtype\s*/Image|/Length[123]\b|/Type\s*/(?:XRef|ObjStm|Metadata|EmbeddedFile)\b")
+_PDF_TEXT_OP = re.compile(rb"\((?:\\.|[^\\)])*\)\s*(?:Tj|'|\")|\[(?:\\.|[^\]])*\]\s*TJ|T\*|ET|-?\d+(?:\.\d+)?\s+-?\d+(?:\.\d+)?\s+T[dD]")
+_PDF_LITERAL = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.S)
+# CID 字体（中文等）和十六进制字符串文本，内置提取无法解码
+_PDF_CID_FONT = re.compile(rb"/Subtype\s*/Type0\b|/Encoding\s*/Identity-[HV]\b")
+_PDF_HEX_TEXT = re.compile(rb"<[0-9A-Fa-f\s]+>\s*(?:Tj|'|\")|\[[^\]]*<[0-9A-Fa-f\s]+>[^\]]*\]\s*TJ")
+# 解码结果中控制字符超过这个比例时视为乱码
+MAX_GARBLED_RATIO = 0.1
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+
+def _pdf_unescape(raw: bytes) -> bytes:
+    def replace(match):
+        seq = match.group(1)
+        if seq[:1].isdigit():
+            return bytes([int(seq, 8) & 0xFF])
+        if seq[:1] in (b"\n", b"\r"):
+            return b""
+        return _PDF_ESCAPES.get(seq[:1], seq[:1])
+    return re.sub(rb"\\([0-7]{1,3}|.)", replace, raw, flags=re.S)
+
+
+def _inflate(data: bytes) -> Optional[bytes]:
+    try:
+        inflater = zlib.decompressobj()
+        return inflater.decompress(data, MAX_STREAM_BYTES)
+    except zlib.error:
+        return None
+
+
+def _text_streams(data: bytes):
+    """
+    逐个返回可能含页面文本的内容流（已解压）。
+    只解压 /FlateDecode 的流，其他编码（DCT/JPX 图片等）和图片、字体等流直接跳过，不解压也不扫描；
+    匹配到一个流后从 endstream 之后继续查找，不在流的二进制内容中搜索。
+    """
+    pos = 0
+    while True:
+        match = _PDF_STREAM.search(data, pos)
+        if match is None:
+            return
+        start = match.end()
+        end = data.find(b"endstream", start)
+        if end < 0:
+            return
+        pos = end + len(b"endstream")
+        header = match.group(1)
+        if _PDF_NON_TEXT.search(header):
+            continue
+        content = data[start:end].rstrip(b"\r\n")
+        filters = _PDF_FILTER.search(header)
+        if filters is not None:
+            if re.findall(rb"/([A-Za-z0-9]+)", filters.group(1)) != [b"FlateDecode"]:
+                continue
+            content = _inflate(content)
+            if content is None:
+                continue
+        yield content
+
+
+def _builtin_pdf_text(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(b"%PDF"):
+        raise UnsupportedDocument("不是有效的 PDF 文件")
+    if _PDF_CID_FONT.search(data):
+        raise UnsupportedDocument("PDF 使用 CID 字体（如中文），需要安装 pypdf 才能解析")
+    lines, current = [], []
+    for content in _text_streams(data):
+        if _PDF_HEX_TEXT.search(content):
+            raise UnsupportedDocument("PDF 文本使用十六进制编码，需要安装 pypdf 才能解析")
+        for op in _PDF_TEXT_OP.finditer(content):
+            token = op.group(0)
+            if token.endswith(b"TJ") or token.endswith(b"Tj") or token.endswith((b"'", b'"')):
+                for literal in _PDF_LITERAL.findall(token):
+                    current.append(_pdf_unescape(literal).decode("latin-1"))
+            elif current:
+                lines.append("".join(current))
+                current = []
+    if current:
+        lines.append("".join(current))
+    text = "\n".join(lines)
+    visible = [c for c in text if not c.isspace()]
+    garbled = sum(1 for c in visible if ord(c) < 0x20 or 0x7F <= ord(c) <= 0x9F)
+    if visible and garbled > len(visible) * MAX_GARBLED_RATIO:
+        raise UnsupportedDocument("PDF 字体编码无法识别，需要安装 pypdf 才能解析")
+    return text
+
+
+def extract_pdf_text(path: str) -> str:
+    if PdfReader is None:
+        return _builtin_pdf_text(path)
+    try:
+        reader = PdfReader(path)
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    except Exception as e:
+        raise UnsupportedDocument(f"无法读取 PDF: {e}")
+
+
+# ===== 结构化 =====
+
+# 章节标题关键词（标题行较短，只在短行中识别）
+SECTION_TITLES = {
+    "education": ("教育经历", "教育背景", "学历", "education"),
+    "skills": ("专业技能", "技能特长", "技能", "技术栈", "skills"),
+    "projects": ("项目经验", "项目经历", "项目", "projects"),
+    "work": ("工作经历", "工作经验", "实习经历", "experience"),
+}
+SECTION_TITLE_MAX_LENGTH = 12
+
+DEGREES = (
+    ("博士", "博士"), ("phd", "博士"), ("硕士", "硕士"), ("研究生", "硕士"), ("master", "硕士"),
+    ("本科", "本科"), ("学士", "本科"), ("bachelor", "本科"), ("大专", "大专"), ("专科", "大专"),
+)
+_SCHOOL = re.compile(
+    r"[一-鿿（）()]{2,30}(?:大学|学院)"
+    r"|(?:[A-Z][A-Za-z.&'-]*\s+){0,5}(?:University|College|Institute)(?:\s+of(?:\s+[A-Z][A-Za-z.&'-]*){1,4})?"
+)
+_YEAR_RANGE = re.compile(
+    r"((?:19|20)\d{2})\s*(?:[./年-]\s*\d{1,2}\s*月?)?\s*[-~–—至到]+\s*"
+    r"((?:19|20)\d{2}|至今|现在|now|present)(?:\s*[./年-]\s*\d{1,2}\s*月?)?",
+    re.I,
+)
+
+# 技能词表：规范名 -> 匹配用的写法（英文按词边界匹配，不区分大小写）
+SKILLS = {
+    "Python": ("python",), "Java": ("java",), "Go": ("golang", "go语言"), "C++": ("c++", "cpp"),
+    "C#": ("c#",), "JavaScript": ("javascript", "js"), "TypeScript": ("typescript",),
+    "Vue": ("vue", "vue.js", "vuejs"), "React": ("react", "react.js"), "Node.js": ("node.js", "nodejs"),
+    "HTML": ("html", "html5"), "CSS": ("css", "css3"), "Spring": ("spring", "spring boot", "springboot"),
+    "Spring Cloud": ("spring cloud",), "Django": ("django",), "Flask": ("flask",), "FastAPI": ("fastapi",),
+    "MySQL": ("mysql",), "PostgreSQL": ("postgresql", "postgres"), "Redis": ("redis",), "MongoDB": ("mongodb",),
+    "Elasticsearch": ("elasticsearch",), "Kafka": ("kafka",), "RabbitMQ": ("rabbitmq",),
+    "Docker": ("docker",), "Kubernetes": ("kubernetes", "k8s"), "Linux": ("linux",), "Git": ("git",),
+    "Nginx": ("nginx",), "Webpack": ("webpack",), "Vite": ("vite",), "微服务": ("微服务",),
+    "分布式": ("分布式",), "高并发": ("高并发",), "机器学习": ("机器学习", "machine learning"),
+    "深度学习": ("深度学习", "deep learning"), "PyTorch": ("pytorch",), "TensorFlow": ("tensorflow",),
+    "数据结构": ("数据结构",), "算法": ("算法",), "SQL": ("sql",),
+}
+_SKILL_ALIASES = {alias: name for name, aliases in SKILLS.items() for alias in aliases}
+_SKILL_PATTERN = re.compile(
+    r"(?<![a-z0-9+#.])(" + "|".join(re.escape(a) for a in sorted(_SKILL_ALIASES, key=len, reverse=True)) + r")(?![a-z0-9+#])",
+)
+
+
+def find_skills(text: str) -> List[str]:
+    """按技能词表匹配，返回规范名（按首次出现顺序）"""
+    found: Dict[str, None] = {}
+    for match in _SKILL_PATTERN.finditer(text.lower()):
+        found.setdefault(_SKILL_ALIASES[match.group(1)], None)
+    return list(found)
+
+
+def _section_of(line: str) -> Optional[str]:
+    title = line.strip(" \t:：#*·-|【】[]").lower()
+    if not title or len(title) > SECTION_TITLE_MAX_LENGTH:
+        return None
+    for section, keywords in SECTION_TITLES.items():
+        if any(title.startswith(k) for k in keywords):
+            return section
+    return None
+
+
+def split_sections(text: str) -> Dict[str, List[str]]:
+    """按章节标题把非空行归入各章节，标题之前的内容归入 header"""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        section = _section_of(line)
+        if section:
+            current = section
+            sections.setdefault(section, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def parse_education(lines: List[str]) -> List[dict]:
+    entries = []
+    for line in lines:
+        school = _SCHOOL.search(line)
+        lowered = line.lower()
+        degree = next((label for key, label in DEGREES if key in lowered), None)
+        if not school and not degree:
+            continue
+        years = _YEAR_RANGE.search(line)
+        entries.append({
+            "school": school.group(0) if school else None,
+            "degree": degree,
+            "start": years.group(1) if years else None,
+            "end": years.group(2) if years else None,
+            "text": line[:200],
+        })
+    return entries
+
+
+def parse_projects(lines: List[str]) -> List[dict]:
+    """项目章节中带时间范围或较短的行视为项目名，之后的行作为描述"""
+    projects = []
+    for line in lines:
+        years = _YEAR_RANGE.search(line)
+        if years or (len(line) <= 40 and not line.startswith(("-", "•", "·", "*"))) or not projects:
+            projects.append({"name": _YEAR_RANGE.sub("", line).strip(" |-，,")[:100] or line[:100], "description": []})
+        else:
+            projects[-1]["description"].append(line)
+    for project in projects:
+        project["description"] = "\n".join(project["description"])[:1000]
+        project["skills"] = find_skills(project["name"] + "\n" + project["description"])
+    return projects
+
+
+def structure_resume(text: str) -> dict:
+    sections = split_sections(text)
+    skills = find_skills("\n".join(sections.get("skills", []))) if sections.get("skills") else []
+    # 技能章节之外（项目描述等）出现的技能也计入
+    for skill in find_skills(text):
+        if skill not in skills:
+            skills.append(skill)
+    return {
+        "education": parse_education(sections.get("education") or sections["header"]),
+        "skills": skills,
+        "projects": parse_projects(sections.get("projects", [])),
+    }
+
+
+def parse_resume_file(path: str, file_type: str) -> dict:
+    """提取文本并结构化，返回 {"content": 文本, "data": 结构化数据}（在解析进程中执行）"""
+    file_type = (file_type or "").lower()
+    if file_type == "docx":
+        text = extract_docx_text(path)
+    elif file_type == "pdf":
+        text = extract_pdf_text(path)
+    else:
+        raise UnsupportedDocument(f"不支持解析 {file_type or '未知'} 格式")
+    text = text.replace("\x00", "").strip()[:MAX_TEXT_LENGTH]
+    if not text:
+        raise UnsupportedDocument("没有提取到文本内容")
+    return {"content": text, "data": structure_resume(text)}
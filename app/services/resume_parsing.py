@@ -0,0 +1,332 @@
+# app/services/resume_parsing.py
+"""
+简历后台解析任务队列
+
+上传简历时写入一条 resume_parse_jobs 记录，后台解析池提取文本并写回 parsed_content / parsed_data：
+- 队列存在数据库中，领取方式与答案评分队列相同（带条件的 UPDATE，attempts 作为写回时的校验令牌，租约过期后重新领取）
+- 文本提取在独立的进程池中执行，请求进程不做 CPU 密集的解析；每批最多领取 RESUME_PARSE_WORKERS 个任务，
+  同时运行的解析不超过进程数
+- 单个文件有超时：超时后终止整个进程池并重建（进程池无法单独终止某个任务），本批未完成的任务计一次失败
+- 出错或超时的任务重试，超过 RESUME_PARSE_MAX_ATTEMPTS 次的文件隔离（quarantined），不再解析；
+  格式不支持的文件直接标记为 failed
+- 简历按内容哈希存储：同一内容已解析过时直接复用结果，已被隔离的内容直接隔离
+- 每批结果在一个事务中写回，提交后交给预览线程生成缩略图，并计入技能匹配索引
+"""
+import json
+import multiprocessing
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.resume import Resume, ResumeParseJob
+from app.services.resume_parser import UnsupportedDocument, parse_resume_file
+from app.services.resume_previews import preview_worker
+from app.services.skill_matching import skill_index
+
+
+def _owned_by(job_id: int, attempts: int):
+    """写回条件：任务仍由本次领取持有"""
+    return (ResumeParseJob.id == job_id, ResumeParseJob.status == "running", ResumeParseJob.attempts == attempts)
+
+
+class ResumeParsePool:
+    """从数据库领取解析任务并交给解析进程池的后台调度器"""
+
+    def __init__(self, workers: int, poll_interval: float, lease_seconds: int, job_timeout: float,
+                 max_attempts: int, max_tasks_per_child: int):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+        self.max_tasks_per_child = max_tasks_per_child
+
+        self._pool = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # 指标
+        self.in_flight = 0
+        self.parsed = 0
+        self.reused = 0
+        self.retried = 0
+        self.failed = 0
+        self.quarantined = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+        self._busy_seconds = 0.0
+        self._bytes = 0
+
+    def notify(self):
+        """有新任务入队（事务提交之后调用），立即唤醒调度线程"""
+        self._wakeup.set()
+
+    # ----- 领取 / 写回 -----
+
+    def _claim(self, db: Session) -> List[tuple]:
+        """领取一批任务，返回 [(job_id, attempts, 简历ID, 文件路径, 文件类型, 文件大小, 内容哈希)]"""
+        now = datetime.utcnow()
+        claimable = or_(
+            ResumeParseJob.status == "pending",
+            (ResumeParseJob.status == "running") & (ResumeParseJob.lease_expires_at < now)
+        )
+        candidates = db.execute(
+            select(ResumeParseJob.id).where(claimable).order_by(ResumeParseJob.id).limit(self.workers)
+        ).scalars().all()
+
+        claimed = []
+        for job_id in candidates:
+            result = db.execute(
+                update(ResumeParseJob)
+                .where(ResumeParseJob.id == job_id, claimable)
+                .values(
+                    status="running",
+                    attempts=ResumeParseJob.attempts + 1,
+                    started_at=now,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                claimed.append(job_id)
+        if not claimed:
+            db.commit()
+            return []
+
+        rows = db.execute(
+            select(ResumeParseJob.id, ResumeParseJob.attempts, Resume.id, Resume.file_path,
+                   Resume.file_type, Resume.file_size, Resume.content_hash)
+            .join(Resume, Resume.id == ResumeParseJob.resume_id)
+            .where(ResumeParseJob.id.in_(claimed))
+        ).all()
+        db.commit()
+        return [tuple(row) for row in rows]
+
+    def _known_results(self, db: Session, hashes: List[str]) -> Dict[str, Optional[tuple]]:
+        """按内容哈希查找已有结果：已解析的返回 (文本, 结构化数据)，已隔离的返回 None"""
+        if not hashes:
+            return {}
+        known: Dict[str, Optional[tuple]] = {}
+        for content_hash, content, data in db.execute(
+            select(Resume.content_hash, Resume.parsed_content, Resume.parsed_data)
+            .where(Resume.content_hash.in_(hashes), Resume.is_parsed == True)
+        ):
+            known.setdefault(content_hash, (content, data))
+        for content_hash in db.execute(
+            select(Resume.content_hash)
+            .join(ResumeParseJob, ResumeParseJob.resume_id == Resume.id)
+            .where(Resume.content_hash.in_(hashes), ResumeParseJob.status == "quarantined")
+        ).scalars():
+            known.setdefault(content_hash, None)
+        return known
+
+    def _write_result(self, db: Session, job_id: int, attempts: int, resume_id: int, content: str, data: str) -> bool:
+        finished = db.execute(
+            update(ResumeParseJob)
+            .where(*_owned_by(job_id, attempts))
+            .values(status="done", error=None, finished_at=datetime.utcnow(), lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        if finished.rowcount != 1:
+            # 任务已被重新领取，丢弃这次结果
+            return False
+        db.execute(
+            update(Resume)
+            .where(Resume.id == resume_id)
+            .values(is_parsed=True, parsed_content=content, parsed_data=data)
+            .execution_options(synchronize_session=False)
+        )
+        return True
+
+    def _write_failure(self, db: Session, job_id: int, attempts: int, error: str, status: Optional[str] = None):
+        """记录失败：未指定最终状态时，未超过次数放回队列，否则隔离"""
+        if status is None:
+            status = "quarantined" if attempts >= self.max_attempts else "pending"
+        db.execute(
+            update(ResumeParseJob)
+            .where(*_owned_by(job_id, attempts))
+            .values(
+                status=status,
+                error=error[:1000],
+                finished_at=None if status == "pending" else datetime.utcnow(),
+                lease_expires_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        with self._lock:
+            if status == "failed":
+                self.failed += 1
+            elif status == "quarantined":
+                self.quarantined += 1
+            else:
+                self.retried += 1
+
+    # ----- 调度 -----
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(processes=self.workers, maxtasksperchild=self.max_tasks_per_child)
+            return self._pool
+
+    def _reset_pool(self):
+        """终止进程池（用于超时的任务），下一批重新创建"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self.pool_restarts += 1
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def run_once(self) -> int:
+        """领取并处理一批任务，返回处理的任务数"""
+        db = SessionLocal()
+        try:
+            jobs = self._claim(db)
+            if not jobs:
+                return 0
+
+            start = time.perf_counter()
+            known = self._known_results(db, [job[6] for job in jobs if job[6]])
+            pending = {}
+            finished = []
+            for job_id, attempts, resume_id, file_path, file_type, file_size, content_hash in jobs:
+                if content_hash in known:
+                    previous = known[content_hash]
+                    if previous is None:
+                        self._write_failure(db, job_id, attempts, "相同内容的文件已被隔离", status="quarantined")
+                    elif self._write_result(db, job_id, attempts, resume_id, *previous):
+                        finished.append(resume_id)
+                        with self._lock:
+                            self.reused += 1
+                    continue
+                pending[job_id] = (attempts, resume_id, file_path, file_type, file_size)
+
+            pool = self._get_pool() if pending else None
+            results = {
+                job_id: pool.apply_async(parse_resume_file, (file_path, file_type))
+                for job_id, (_, _, file_path, file_type, _) in pending.items()
+            }
+            with self._lock:
+                self.in_flight += len(results)
+
+            deadline = time.monotonic() + self.job_timeout
+            timed_out = False
+            for job_id, async_result in results.items():
+                attempts, resume_id, _, _, file_size = pending[job_id]
+                try:
+                    parsed = async_result.get(timeout=max(0.0, deadline - time.monotonic()))
+                except multiprocessing.TimeoutError:
+                    timed_out = True
+                    with self._lock:
+                        self.timeouts += 1
+                    self._write_failure(db, job_id, attempts, f"解析超时（{self.job_timeout}s）")
+                    continue
+                except UnsupportedDocument as e:
+                    self._write_failure(db, job_id, attempts, str(e), status="failed")
+                    continue
+                except Exception as e:
+                    self._write_failure(db, job_id, attempts, f"{type(e).__name__}: {e}")
+                    continue
+                data = json.dumps(parsed["data"], ensure_ascii=False)
+                if self._write_result(db, job_id, attempts, resume_id, parsed["content"], data):
+                    finished.append(resume_id)
+                    with self._lock:
+                        self.parsed += 1
+                        self._bytes += file_size or 0
+            if timed_out:
+                self._reset_pool()
+
+            # 整批结果一次提交，之后再生成预览、更新技能匹配索引
+            db.commit()
+            preview_worker.enqueue(finished)
+            skill_index.update_resumes(db, finished)
+            with self._lock:
+                self.in_flight -= len(results)
+                self._busy_seconds += time.perf_counter() - start
+            return len(jobs)
+        except Exception as e:
+            db.rollback()
+            # 已领取的任务会在租约过期后被重新领取
+            print(f"❌ 简历解析任务处理失败: {str(e)}")
+            with self._lock:
+                self.in_flight = 0
+            return 0
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            # 领满一批时继续领取，否则等待通知或轮询间隔
+            if self.run_once() >= self.workers:
+                continue
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start(self):
+        """启动调度线程（进程池在第一批任务时创建）"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="resume-parse-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止调度线程并终止进程池，未完成的任务在租约过期后重新领取"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.job_timeout + 5)
+            self._thread = None
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            busy = self._busy_seconds
+            return {
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                "parsed": self.parsed,
+                "reused": self.reused,
+                "retried": self.retried,
+                "failed": self.failed,
+                "quarantined": self.quarantined,
+                "timeouts": self.timeouts,
+                "pool_restarts": self.pool_restarts,
+                "docs_per_sec": round((self.parsed + self.reused) / busy, 2) if busy else 0.0,
+                "mb_per_sec": round(self._bytes / busy / (1024 * 1024), 2) if busy else 0.0,
+            }
+
+
+# 全局唯一的简历解析池
+resume_parser_pool = ResumeParsePool(
+    workers=settings.RESUME_PARSE_WORKERS,
+    poll_interval=settings.RESUME_PARSE_POLL_INTERVAL,
+    lease_seconds=settings.RESUME_PARSE_LEASE_SECONDS,
+    job_timeout=settings.RESUME_PARSE_TIMEOUT,
+    max_attempts=settings.RESUME_PARSE_MAX_ATTEMPTS,
+    max_tasks_per_child=settings.RESUME_PARSE_MAX_TASKS_PER_CHILD,
+)
+
+
+# ----- 请求内使用的异步接口 -----
+
+async def enqueue(db: AsyncSession, resume: Resume) -> ResumeParseJob:
+    """为新上传的简历创建解析任务（在调用方的事务内，提交后调用 resume_parser_pool.notify()）"""
+    job = ResumeParseJob(resume_id=resume.id, status="pending", attempts=0)
+    db.add(job)
+    await db.flush()
+    return job
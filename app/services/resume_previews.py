@@ -0,0 +1,379 @@
+# app/services/resume_previews.py
+"""
+简历预览（首页缩略图 + 文本摘要）
+
+- 预览由后台线程生成，不在请求中渲染：简历解析完成后入队，列表/预览接口遇到缺失的预览时也会入队
+- 缩略图：安装了 PyMuPDF（见 requirements.txt）时把 PDF 首页渲染为 PNG；
+  其他情况（DOCX、未安装 PyMuPDF）用解析出的文本生成一张 SVG 文字卡片，只有几 KB
+- 预览按简历内容哈希缓存在磁盘上（相同文件共用一份），总大小不超过 PREVIEW_CACHE_MAX_BYTES，
+  超出时按最近最少使用淘汰；索引（含摘要）常驻内存，启动时扫描缓存目录重建，顺序按文件修改时间近似
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.resume import Resume
+
+try:
+    # pip install pymupdf（requirements.txt 中已列出，缺少时退回 SVG 文字卡片）
+    import fitz
+except ImportError:
+    fitz = None
+
+# 预览格式变化时递增，旧的缓存不再命中
+PREVIEW_VERSION = 1
+# 生成文字卡片时最多读取的文本长度
+PREVIEW_TEXT_LENGTH = 2000
+# 文字卡片的行数和每行字数
+CARD_LINES = 18
+CARD_LINE_WIDTH = 20
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def preview_key(resume_id: int, content_hash: Optional[str]) -> str:
+    """缓存键：按内容哈希（旧记录没有哈希时按简历ID）"""
+    return f"{content_hash or f'resume-{resume_id}'}-v{PREVIEW_VERSION}"
+
+
+def make_snippet(text: str, length: int = settings.PREVIEW_SNIPPET_LENGTH) -> str:
+    snippet = _WHITESPACE.sub(" ", text or "").strip()
+    return snippet if len(snippet) <= length else snippet[:length - 1] + "…"
+
+
+def _wrap(text: str, width: int, max_lines: int) -> List[str]:
+    lines = []
+    for paragraph in (text or "").splitlines():
+        paragraph = paragraph.strip()
+        while paragraph and len(lines) < max_lines:
+            lines.append(paragraph[:width])
+            paragraph = paragraph[width:]
+        if len(lines) >= max_lines:
+            break
+    return lines
+
+
+def render_text_card(text: str, width: int = settings.PREVIEW_WIDTH) -> bytes:
+    """用文本前几行生成 A4 比例的 SVG 卡片"""
+    height = int(width * 1.414)
+    font_size = max(8, width // (CARD_LINE_WIDTH + 4))
+    line_height = int(font_size * 1.5)
+    rows = []
+    for i, line in enumerate(_wrap(text, CARD_LINE_WIDTH, CARD_LINES)):
+        weight = ' font-weight="bold"' if i == 0 else ""
+        rows.append(f'<text x="{font_size}" y="{font_size * 2 + i * line_height}"{weight}>{escape(line)}</text>')
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<rect width="100%" height="100%" fill="#fff" stroke="#ddd"/>'
+        f'<g font-family="sans-serif" font-size="{font_size}" fill="#333">{"".join(rows)}</g></svg>'
+    )
+    return svg.encode("utf-8")
+
+
+def can_render_thumbnail(file_type: str) -> bool:
+    """是否能直接从文件渲染缩略图（否则要等解析出文本后生成文字卡片）"""
+    return file_type == "pdf" and fitz is not None
+
+
+def render_pdf_thumbnail(path: str, width: int = settings.PREVIEW_WIDTH) -> Optional[bytes]:
+    """PDF 首页渲染为 PNG（没有 PyMuPDF 或渲染失败时返回 None）"""
+    if fitz is None:
+        return None
+    try:
+        with fitz.open(path) as document:
+            page = document[0]
+            zoom = width / page.rect.width
+            return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).tobytes("png")
+    except Exception as e:
+        print(f"⚠️ 渲染 PDF 缩略图失败 {path}: {e}")
+        return None
+
+
+class PreviewEntry:
+    __slots__ = ("image_path", "media_type", "snippet", "size")
+
+    def __init__(self, image_path: str, media_type: str, snippet: str, size: int):
+        self.image_path = image_path
+        self.media_type = media_type
+        self.snippet = snippet
+        self.size = size
+
+
+class PreviewCache:
+    """磁盘上的预览缓存：总大小有上限，按最近最少使用淘汰"""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, PreviewEntry]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+        # 指标
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _paths(self, key: str, extension: str):
+        directory = os.path.join(self.root, key[:2])
+        return os.path.join(directory, f"{key}.{extension}"), os.path.join(directory, f"{key}.json")
+
+    def load(self):
+        """扫描缓存目录重建索引（按元数据文件修改时间排序，较旧的先淘汰）"""
+        found = []
+        if os.path.isdir(self.root):
+            for directory, _, files in os.walk(self.root):
+                for name in files:
+                    if not name.endswith(".json"):
+                        continue
+                    meta_path = os.path.join(directory, name)
+                    try:
+                        with open(meta_path, encoding="utf-8") as f:
+                            meta = json.load(f)
+                        image_path = os.path.join(directory, meta["image"])
+                        size = os.path.getsize(image_path) + os.path.getsize(meta_path)
+                        found.append((os.path.getmtime(meta_path), name[:-5], PreviewEntry(
+                            image_path, meta["media_type"], meta.get("snippet", ""), size
+                        )))
+                    except (OSError, ValueError, KeyError):
+                        continue
+        found.sort(key=lambda item: item[0])
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+            for _, key, entry in found:
+                self._entries[key] = entry
+                self._total += entry.size
+            evicted = self._evict_locked()
+        self._remove_files(evicted)
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[PreviewEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, key: str) -> Optional[PreviewEntry]:
+        """不计入命中统计、不调整淘汰顺序（列表页批量查看摘要时使用）"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, image: bytes, extension: str, media_type: str, snippet: str) -> PreviewEntry:
+        """写入预览文件并登记（阻塞调用，在后台线程中执行）"""
+        image_path, meta_path = self._paths(key, extension)
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        meta = json.dumps({"image": os.path.basename(image_path), "media_type": media_type, "snippet": snippet},
+                          ensure_ascii=False).encode("utf-8")
+        for path, data in ((image_path, image), (meta_path, meta)):
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+        entry = PreviewEntry(image_path, media_type, snippet, len(image) + len(meta))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total -= previous.size
+            self._entries[key] = entry
+            self._total += entry.size
+            evicted = self._evict_locked()
+        self._remove_files(evicted)
+        return entry
+
+    def update_snippet(self, key: str, snippet: str) -> Optional[PreviewEntry]:
+        """只改写元数据里的摘要，沿用已生成的图片（阻塞调用，在后台线程中执行）"""
+        entry = self.peek(key)
+        if entry is None:
+            return None
+        _, meta_path = self._paths(key, os.path.splitext(entry.image_path)[1][1:])
+        meta = json.dumps({"image": os.path.basename(entry.image_path), "media_type": entry.media_type,
+                           "snippet": snippet}, ensure_ascii=False).encode("utf-8")
+        temp_path = f"{meta_path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(meta)
+        os.replace(temp_path, meta_path)
+
+        updated = PreviewEntry(entry.image_path, entry.media_type, snippet, os.path.getsize(entry.image_path) + len(meta))
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return None
+            self._entries[key] = updated
+            self._total += updated.size - entry.size
+            evicted = self._evict_locked()
+        self._remove_files(evicted)
+        return updated
+
+    def discard(self, key: str):
+        """预览文件已不存在时移出索引"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total -= entry.size
+
+    def _evict_locked(self) -> List[PreviewEntry]:
+        evicted = []
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._total -= entry.size
+            self.evictions += 1
+            evicted.append(entry)
+        return evicted
+
+    def _remove_files(self, entries: Iterable[PreviewEntry]):
+        for entry in entries:
+            meta_path = os.path.splitext(entry.image_path)[0] + ".json"
+            for path in (entry.image_path, meta_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class PreviewWorker:
+    """后台生成预览的线程：按简历ID排队，同一份简历只排一次"""
+
+    def __init__(self, cache: PreviewCache):
+        self.cache = cache
+        self._queue: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        # 指标
+        self.generated = 0
+        self.rendered_pages = 0
+        self.skipped = 0
+        self.errors = 0
+        self._total_ms = 0.0
+
+    def enqueue(self, resume_ids: Iterable[int]):
+        """任意线程都可以调用"""
+        added = False
+        with self._lock:
+            for resume_id in resume_ids:
+                if resume_id not in self._queue:
+                    self._queue[resume_id] = None
+                    added = True
+        if added:
+            self._wakeup.set()
+
+    def _next(self) -> Optional[int]:
+        with self._lock:
+            if not self._queue:
+                return None
+            resume_id, _ = self._queue.popitem(last=False)
+            return resume_id
+
+    def generate(self, resume_id: int) -> bool:
+        """生成一份简历的预览，返回是否生成或更新（已缓存、简历不存在或尚无可用内容时返回 False）"""
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                select(Resume.file_path, Resume.file_type, Resume.content_hash, Resume.is_parsed,
+                       func.substr(Resume.parsed_content, 1, PREVIEW_TEXT_LENGTH))
+                .where(Resume.id == resume_id)
+            ).first()
+        finally:
+            db.close()
+        if row is None:
+            return False
+        file_path, file_type, content_hash, is_parsed, text = row
+        key = preview_key(resume_id, content_hash)
+        cached = self.cache.peek(key)
+        if cached is not None:
+            # 解析完成前先渲染了 PDF 首页的预览没有摘要，解析完成后补上
+            if cached.snippet or not is_parsed:
+                return False
+            snippet = make_snippet(text or "")
+            return bool(snippet) and self.cache.update_snippet(key, snippet) is not None
+
+        start = time.perf_counter()
+        snippet = make_snippet(text or "")
+        image = render_pdf_thumbnail(file_path) if can_render_thumbnail(file_type) else None
+        if image is not None:
+            self.cache.put(key, image, "png", "image/png", snippet)
+            self.rendered_pages += 1
+        elif is_parsed:
+            self.cache.put(key, render_text_card(text or ""), "svg", "image/svg+xml", snippet)
+        else:
+            # 等解析完成后再生成
+            return False
+        self.generated += 1
+        self._total_ms += (time.perf_counter() - start) * 1000
+        return True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            resume_id = self._next()
+            if resume_id is None:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                if not self.generate(resume_id):
+                    self.skipped += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ 生成简历 {resume_id} 的预览失败: {str(e)}")
+
+    def start(self):
+        """加载缓存索引并启动后台线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        entries = self.cache.load()
+        print(f"🖼️ 简历预览缓存已加载: {entries} 项")
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="resume-preview-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def metrics(self) -> dict:
+        with self._lock:
+            queued = len(self._queue)
+        return {
+            "queued": queued,
+            "generated": self.generated,
+            "rendered_pages": self.rendered_pages,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "avg_generate_ms": round(self._total_ms / self.generated, 2) if self.generated else 0.0,
+            "cache": self.cache.metrics(),
+        }
+
+
+# 全局唯一的预览缓存和生成线程
+preview_cache = PreviewCache(os.path.join(settings.UPLOAD_FOLDER, "previews"), settings.PREVIEW_CACHE_MAX_BYTES)
+preview_worker = PreviewWorker(preview_cache)
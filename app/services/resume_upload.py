@@ -0,0 +1,204 @@
+# app/services/resume_upload.py
+"""
+简历上传的流式接收
+
+直接从请求体按块解析 multipart，不经过 UploadFile 的整体缓冲：
+- Content-Length 明显超过上限时不读请求体直接拒绝；边接收边计数，超过 MAX_FILE_SIZE 立即中止
+- 文件内容边接收边计算 SHA-256，并凑满 UPLOAD_CHUNK_SIZE 后在线程中写盘，不阻塞事件循环
+- 每个上传占用的内存只有一个写缓冲块，与文件大小无关
+- 写到 dest_dir 下的 .part 临时文件，中途失败会删除；接收完整后由调用方放入内容寻址存储（blob_store）
+"""
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import BinaryIO, List, Optional
+
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import ClientDisconnect, Request
+
+from app.core.config import settings
+
+# multipart 分隔符、各部分头部等额外开销的上限，Content-Length 超过 上限 + 该值 时直接拒绝
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class UploadError(Exception):
+    """请求格式不正确（不是 multipart、缺少文件字段、文件类型不允许等）"""
+
+
+class UploadTooLarge(UploadError):
+    """文件超过大小上限"""
+
+
+class StoredUpload:
+    """已落盘的上传文件"""
+    __slots__ = ("filename", "extension", "temp_path", "size", "sha256")
+
+    def __init__(self, filename: str, extension: str, temp_path: str, size: int, sha256: str):
+        self.filename = filename
+        self.extension = extension
+        self.temp_path = temp_path
+        self.size = size
+        self.sha256 = sha256
+
+
+def _content_disposition(value: bytes):
+    """解析 Content-Disposition，返回 (字段名, 文件名)"""
+    _, options = parse_options_header(value)
+    name = options.get(b"name")
+    filename = options.get(b"filename")
+    return (
+        name.decode("utf-8", "replace") if name is not None else None,
+        filename.decode("utf-8", "replace") if filename is not None else None,
+    )
+
+
+class _FilePartReceiver:
+    """multipart 解析回调：只收集指定文件字段的内容，其余字段忽略"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.filename: Optional[str] = None
+        self.finished = False
+        self.pending: List[bytes] = []
+
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._active = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._active = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        name, filename = _content_disposition(self._headers.get(b"content-disposition", b""))
+        # 只接收第一个同名文件字段
+        if name == self.field and filename is not None and self.filename is None:
+            self.filename = filename
+            self._active = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._active:
+            self.pending.append(data[start:end])
+
+    def _on_part_end(self):
+        if self._active:
+            self._active = False
+            self.finished = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.pending)
+        self.pending.clear()
+        return data
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def receive_upload(
+    request: Request,
+    dest_dir: str,
+    allowed_extensions,
+    field: str = "file",
+    max_size: int = settings.MAX_FILE_SIZE,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE,
+) -> StoredUpload:
+    """
+    从请求体流式接收一个文件写入 dest_dir 下的临时文件，返回落盘结果（调用方负责移走或删除临时文件）。
+    格式错误抛出 UploadError，超过大小上限抛出 UploadTooLarge（已写入的部分会被删除）。
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadError("请使用 multipart/form-data 上传文件")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise UploadTooLarge()
+
+    receiver = _FilePartReceiver(field)
+    parser = MultipartParser(boundary, receiver.callbacks())
+    hasher = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    handle: Optional[BinaryIO] = None
+    part_path = None
+    extension = None
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if receiver.filename is not None and handle is None:
+                if not receiver.filename:
+                    raise UploadError("没有选择文件")
+                extension = os.path.splitext(receiver.filename)[1].lower()
+                if extension not in allowed_extensions:
+                    supported = "、".join(sorted(ext.lstrip(".").upper() for ext in allowed_extensions))
+                    raise UploadError(f"不支持的文件类型，只支持 {supported} 格式")
+                await asyncio.to_thread(os.makedirs, dest_dir, exist_ok=True)
+                part_path = os.path.join(dest_dir, f"{uuid.uuid4().hex}.part")
+                handle = await asyncio.to_thread(open, part_path, "wb")
+
+            if receiver.pending:
+                data = receiver.take()
+                size += len(data)
+                if size > max_size:
+                    raise UploadTooLarge()
+                hasher.update(data)
+                buffer += data
+                if len(buffer) >= chunk_size:
+                    await asyncio.to_thread(handle.write, bytes(buffer))
+                    buffer.clear()
+
+            if receiver.finished:
+                # 文件字段之后的内容不再读取
+                break
+
+        if handle is None or not receiver.finished:
+            raise UploadError("没有选择文件")
+        if buffer:
+            await asyncio.to_thread(handle.write, bytes(buffer))
+        await asyncio.to_thread(handle.close)
+        handle = None
+
+        stored = StoredUpload(receiver.filename, extension, part_path, size, hasher.hexdigest())
+        part_path = None
+        return stored
+    except MultipartParseError:
+        raise UploadError("上传内容格式不正确")
+    except ClientDisconnect:
+        raise UploadError("上传中断")
+    finally:
+        if handle is not None:
+            await asyncio.to_thread(handle.close)
+        if part_path is not None:
+            await asyncio.to_thread(_remove_quietly, part_path)
@@ -0,0 +1,144 @@
+# app/services/score_histogram.py
+"""
+评分分布直方图与百分位排名
+
+score_histograms 表按 (范围, 分数段) 保存计数，分数段为向下取整的 0-100 分，共 101 个桶：
+- global：每个用户的平均综合评分计一次。用户平均分变化时，旧分数段 -1、新分数段 +1
+- position:<岗位>：该岗位每场已完成面试的综合评分计一次
+完成面试时只更新 1~3 个桶；查询排名时读取一个范围的至多 101 行，O(桶数)，
+不需要对所有用户的平均分排序。
+"""
+import math
+from collections import Counter
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_if_missing
+from app.models.interview import Interview, InterviewStatistics, ScoreHistogram
+
+BUCKET_COUNT = 101
+GLOBAL_SCOPE = "global"
+
+
+def position_scope(position: str) -> str:
+    return f"position:{position}"
+
+
+def score_bucket(score: float) -> int:
+    """分数所在的桶（向下取整并限制在 0-100）"""
+    return min(BUCKET_COUNT - 1, max(0, int(math.floor(score))))
+
+
+def better_than_percent(histogram: List[int], score: Optional[float], includes_self: bool = True) -> float:
+    """
+    分数超过了分布中多少比例的其他样本（0-100）。
+    同一分数段内按一半计算（中位秩）；includes_self 表示分布中已包含该样本本身。
+    """
+    if score is None:
+        return 0.0
+    bucket = score_bucket(score)
+    total = sum(histogram)
+    below = sum(histogram[:bucket])
+    same = histogram[bucket]
+    if includes_self:
+        total -= 1
+        same -= 1
+    if total <= 0:
+        return 0.0
+    return max(0.0, min(100.0, (below + 0.5 * max(same, 0)) * 100.0 / total))
+
+
+async def _add(db: AsyncSession, scope: str, bucket: int, delta: int):
+    table = ScoreHistogram.__table__
+    await db.execute(insert_if_missing(
+        db.get_bind().dialect.name, table,
+        {"scope": scope, "bucket": bucket, "count": 0}, ["scope", "bucket"]
+    ))
+    await db.execute(
+        update(table)
+        .where(table.c.scope == scope, table.c.bucket == bucket)
+        .values(count=table.c["count"] + delta)
+    )
+
+
+async def record_user_average(db: AsyncSession, old_average: Optional[float], new_average: Optional[float]):
+    """用户平均综合评分变化后，在全局分布中移动该用户"""
+    old_bucket = score_bucket(old_average) if old_average is not None else None
+    new_bucket = score_bucket(new_average) if new_average is not None else None
+    if old_bucket == new_bucket:
+        return
+    if old_bucket is not None:
+        await _add(db, GLOBAL_SCOPE, old_bucket, -1)
+    if new_bucket is not None:
+        await _add(db, GLOBAL_SCOPE, new_bucket, 1)
+
+
+async def record_interview_score(db: AsyncSession, position: str, score: float):
+    """把一场已完成面试的综合评分计入岗位分布"""
+    await _add(db, position_scope(position), score_bucket(score), 1)
+
+
+def histogram_from_rows(rows) -> List[int]:
+    """(bucket, count) 行 -> 长度固定为 BUCKET_COUNT 的计数列表"""
+    histogram = [0] * BUCKET_COUNT
+    for bucket, count in rows:
+        if 0 <= bucket < BUCKET_COUNT:
+            histogram[bucket] = count
+    return histogram
+
+
+async def load_histogram(db: AsyncSession, scope: str) -> List[int]:
+    """读取一个范围的直方图"""
+    return histogram_from_rows(await db.execute(
+        select(ScoreHistogram.bucket, ScoreHistogram.count).where(ScoreHistogram.scope == scope)
+    ))
+
+
+async def load_histograms(db: AsyncSession, scopes: List[str]) -> Dict[str, List[int]]:
+    """一次查询读取多个范围的直方图"""
+    histograms = {scope: [0] * BUCKET_COUNT for scope in scopes}
+    if not scopes:
+        return histograms
+    rows = await db.execute(
+        select(ScoreHistogram.scope, ScoreHistogram.bucket, ScoreHistogram.count)
+        .where(ScoreHistogram.scope.in_(scopes))
+    )
+    for scope, bucket, count in rows:
+        if 0 <= bucket < BUCKET_COUNT:
+            histograms[scope][bucket] = count
+    return histograms
+
+
+def rebuild_histograms(db: Session, batch_size: int = 1000):
+    """
+    从 interview_statistics 和已完成的面试重建所有直方图（在 db 的事务中，由调用方提交）。
+    两次流式扫描，内存中只保留各范围的桶计数。
+    """
+    counts: Counter = Counter()
+    stream = db.execute(
+        select(InterviewStatistics.avg_overall_score).where(
+            InterviewStatistics.overall_count > 0,
+            InterviewStatistics.avg_overall_score.isnot(None)
+        ).execution_options(yield_per=batch_size)
+    )
+    for (average,) in stream:
+        counts[(GLOBAL_SCOPE, score_bucket(average))] += 1
+
+    stream = db.execute(
+        select(Interview.position, Interview.overall_score).where(
+            Interview.status == "completed",
+            Interview.overall_score.isnot(None)
+        ).execution_options(yield_per=batch_size)
+    )
+    for position, score in stream:
+        counts[(position_scope(position), score_bucket(score))] += 1
+
+    db.query(ScoreHistogram).delete(synchronize_session=False)
+    if counts:
+        db.execute(
+            ScoreHistogram.__table__.insert(),
+            [{"scope": scope, "bucket": bucket, "count": count} for (scope, bucket), count in counts.items()]
+        )
@@ -0,0 +1,257 @@
+# app/services/search_service.py
+"""
+题库全文检索服务
+
+基于 SQLite FTS5 建立 questions_fts 虚拟表，镜像 Question 的可检索字段：
+- 中文按字切分为 单字 + 相邻二元组（character n-grams），英文/数字按单词小写化，
+  单词中保留 . + #（与 keyword_scorer 一致，区分 C++ / C# / Vue.js），同时索引拆开后的各部分，
+  由服务端预先切词后写入 FTS5，因此 "闭包"、"vue"、"c++" 之类的词都能命中索引
+- 通过 ORM 事件在 Question 新增/修改/删除时同步索引
+- 查询结果按 BM25 排序（标题、标签权重更高）
+
+非 SQLite 数据库或 SQLite 未编译 FTS5 时，is_available() 返回 False，
+调用方应回退到原有的 LIKE 检索。
+"""
+import json
+import re
+import unicodedata
+from typing import List, Optional
+
+from sqlalchemy import Float, Integer, event, inspect as sa_inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.question import Question
+
+FTS_TABLE = "questions_fts"
+
+# 参与检索的字段，顺序即 FTS5 列顺序
+INDEXED_FIELDS = [
+    "title",
+    "description",
+    "answer",
+    "tags",
+    "category",
+    "sub_category",
+    "key_points",
+    "related_topics",
+]
+
+# BM25 列权重，与 INDEXED_FIELDS 一一对应（标题 > 标签 > 分类 > 要点/相关主题 > 描述 > 答案）
+BM25_WEIGHTS = [10.0, 1.5, 1.0, 5.0, 3.0, 3.0, 2.0, 2.0]
+# FTS5 分词器：服务端已切好词，这里只需按空格切分，并把 . + # 当作词的一部分
+FTS_TOKENIZER = "unicode61 tokenchars '.+#'"
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9.+#]*|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+_WORD_PART_RE = re.compile(r"[a-z0-9]+")
+
+# 进程内记录索引是否可用（None 表示尚未检测）
+_fts_available: Optional[bool] = None
+
+
+def _normalize(value: Optional[str]) -> str:
+    """统一全角/半角、大小写，并去掉HTML标签"""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKC", value)
+    return _TAG_RE.sub(" ", value).lower()
+
+
+def _is_ascii_token(token: str) -> bool:
+    return token[0] < "\u0080"
+
+
+def _tokens(value: Optional[str]) -> List[str]:
+    """切出英文单词（去掉句末的点）和中文连续片段"""
+    return [run.rstrip(".") if _is_ascii_token(run) else run for run in _TOKEN_RE.findall(_normalize(value))]
+
+
+def tokenize_for_index(value: Optional[str]) -> str:
+    """
+    将文本切分为写入 FTS5 的词序列。
+    中文连续片段展开为单字和相邻二元组，英文/数字保留整个单词，
+    带 . + # 的单词再加上拆开后的各部分（"vue.js" 也能用 "js" 检索到）。
+    """
+    tokens = []
+    for run in _tokens(value):
+        if _is_ascii_token(run):
+            tokens.append(run)
+            parts = _WORD_PART_RE.findall(run)
+            if parts != [run]:
+                tokens.extend(parts)
+            continue
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return " ".join(tokens)
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """
+    将用户输入的搜索词转换为 FTS5 MATCH 表达式（各词之间为 AND 关系）。
+    英文单词使用前缀匹配以贴近原先 LIKE '%term%' 的体验，单个字母/数字只做精确匹配
+    （否则 "c" 会匹配所有以 c 开头的词）；. + # 保留在词中，"C++" 和 "C#" 不会退化为 "c"；
+    中文片段长度为1时按单字匹配，否则拆为二元组。
+    无可检索词时返回 None。
+    """
+    terms = []
+    for run in _tokens(search):
+        if _is_ascii_token(run):
+            terms.append(f'"{run}"' if len(run) == 1 else f'"{run}"*')
+        elif len(run) == 1:
+            terms.append(f'"{run}"')
+        else:
+            terms.extend(f'"{run[i:i + 2]}"' for i in range(len(run) - 1))
+    if not terms:
+        return None
+    # 去重但保持顺序
+    return " ".join(dict.fromkeys(terms))
+
+
+def _document_values(question_id: int, fields: dict) -> dict:
+    values = {"rowid": question_id}
+    for field in INDEXED_FIELDS:
+        raw = fields.get(field)
+        if field in ("tags", "key_points", "related_topics") and raw:
+            # JSON列表字段只索引其中的文本
+            try:
+                raw = " ".join(str(item) for item in json.loads(raw))
+            except (TypeError, ValueError):
+                pass
+        values[field] = tokenize_for_index(raw)
+    return values
+
+
+def _is_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """
+    创建 FTS5 虚拟表（如不存在，或分词器配置已变化时删除重建），并在索引为空或与题库行数不一致时全量重建。
+    应用启动和建表脚本中调用。返回索引是否可用。
+    """
+    global _fts_available
+
+    if not _is_sqlite(engine):
+        _fts_available = False
+        return False
+
+    columns = ", ".join(INDEXED_FIELDS)
+    try:
+        with engine.begin() as conn:
+            existing_sql = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+            ).scalar()
+            if existing_sql is not None and FTS_TOKENIZER not in existing_sql:
+                print("🔄 全文检索分词器配置已变化，重建索引")
+                conn.execute(text(f"DROP TABLE {FTS_TABLE}"))
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5({columns}, tokenize=\"{FTS_TOKENIZER}\")"
+            ))
+            indexed = conn.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+            total = conn.execute(text("SELECT count(*) FROM questions")).scalar()
+            if indexed != total:
+                _rebuild(conn)
+    except Exception as e:
+        print(f"⚠️ 全文检索索引不可用，回退到LIKE检索: {str(e)}")
+        _fts_available = False
+        return False
+
+    _fts_available = True
+    return True
+
+
+def rebuild_search_index(db: Session) -> int:
+    """全量重建检索索引，返回写入的题目数量"""
+    count = _rebuild(db.connection())
+    db.commit()
+    return count
+
+
+def _rebuild(conn: Connection) -> int:
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    columns = ", ".join(INDEXED_FIELDS)
+    placeholders = ", ".join(f":{field}" for field in INDEXED_FIELDS)
+    insert_sql = text(f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (:rowid, {placeholders})")
+
+    count = 0
+    batch = []
+    rows = conn.execute(text(f"SELECT id, {columns} FROM questions")).mappings()
+    for row in rows:
+        batch.append(_document_values(row["id"], row))
+        if len(batch) >= 1000:
+            conn.execute(insert_sql, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.execute(insert_sql, batch)
+        count += len(batch)
+    return count
+
+
+def is_available() -> bool:
+    """当前进程中检索索引是否可用"""
+    return bool(_fts_available)
+
+
+def search_subquery(search: str):
+    """
+    构造检索子查询，包含 question_id 和 rank（BM25分值，越小越相关）两列。
+    无法构造检索条件时返回 None。
+    """
+    match_query = build_match_query(search)
+    if match_query is None:
+        return None
+
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    stmt = text(
+        f"SELECT rowid AS question_id, bm25({FTS_TABLE}, {weights}) AS rank "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match_query"
+    ).bindparams(match_query=match_query)
+    return stmt.columns(question_id=Integer, rank=Float).subquery("question_search")
+
+
+def search_question_ids(db: Session, search: str, limit: int = 50) -> List[int]:
+    """按相关度返回匹配的题目ID列表"""
+    subquery = search_subquery(search)
+    if subquery is None:
+        return []
+    rows = db.query(subquery.c.question_id).order_by(subquery.c.rank).limit(limit).all()
+    return [row.question_id for row in rows]
+
+
+# ===== 索引同步（ORM 事件）=====
+
+def _upsert_document(connection: Connection, target: Question):
+    values = _document_values(target.id, {field: getattr(target, field) for field in INDEXED_FIELDS})
+    columns = ", ".join(INDEXED_FIELDS)
+    placeholders = ", ".join(f":{field}" for field in INDEXED_FIELDS)
+    connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {"rowid": target.id})
+    connection.execute(
+        text(f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (:rowid, {placeholders})"),
+        values
+    )
+
+
+@event.listens_for(Question, "after_insert")
+def _question_inserted(mapper, connection, target):
+    if _fts_available and _is_sqlite(connection):
+        _upsert_document(connection, target)
+
+
+@event.listens_for(Question, "after_update")
+def _question_updated(mapper, connection, target):
+    if not (_fts_available and _is_sqlite(connection)):
+        return
+    # 浏览数、收藏数等计数字段变化不需要重建索引
+    state = sa_inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in INDEXED_FIELDS):
+        _upsert_document(connection, target)
+
+
+@event.listens_for(Question, "after_delete")
+def _question_deleted(mapper, connection, target):
+    if _fts_available and _is_sqlite(connection):
+        connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {"rowid": target.id})
@@ -0,0 +1,352 @@
+# app/services/skill_matching.py
+"""
+简历与岗位的技能匹配索引
+
+- 技能归一化为整数 ID：先登记简历解析的技能词表（resume_parser.SKILLS），岗位技能能匹配词表的用规范名
+  （"HTML/CSS" -> HTML、CSS，"Vue.js" -> Vue），匹配不到的按原文作为新技能登记（"Excel"、"CI/CD"）
+- 每份简历、每个岗位的技能集合存成一个 Python 整数位图（第 i 位表示技能 i），
+  重合技能数 = (a & b).bit_count()，一次按位与就比较完整个技能集合，不用逐个技能比较
+- 岗位来自 POSITION_DATA（coreSkills 为必需技能，techStack 为优选技能）和 positions 表
+  （required_skills / preferred_skills）；得分 = 加权覆盖率，必需技能权重为优选技能的 2 倍
+- 简历技能取解析结果中的 skills，另外在技能、项目、教育文本中查找词表之外的岗位技能
+- 索引在进程内，首次使用时从数据库构建（只读 parsed_data，不读全文）；本进程解析完成/删除简历时增量更新，
+  其他进程的变更最多 SKILL_INDEX_REBUILD_INTERVAL 秒后随全量重建生效
+- 读取使用不可变快照，增量更新时复制后替换，查询不加锁
+"""
+import heapq
+import json
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.position import Position
+from app.models.resume import Resume
+from app.services.position_data import POSITION_DATA
+from app.services.resume_parser import SKILLS, find_skills
+
+# 加权覆盖率中必需技能与优选技能的权重
+REQUIRED_WEIGHT = 2
+PREFERRED_WEIGHT = 1
+
+
+def _skill_key(name: str) -> str:
+    return unicodedata.normalize("NFKC", name).strip().lower()
+
+
+def _load_list(value) -> List[str]:
+    """JSON 列表（或已解析的列表）中的技能名，元素可以是字符串或带 name 的对象"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [value]
+    names = []
+    for item in value or []:
+        name = item.get("name") if isinstance(item, dict) else item
+        if isinstance(name, str) and name.strip():
+            names.append(name.strip())
+    return names
+
+
+class SkillVocabulary:
+    """技能名 <-> 整数 ID；一个快照内只在构建时登记新技能，之后只读"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for name in SKILLS:
+            self._intern(name)
+        self._builtin = len(self.names)
+        self._extra_pattern: Optional[re.Pattern] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _intern(self, name: str) -> int:
+        key = _skill_key(name)
+        skill_id = self._ids.get(key)
+        if skill_id is None:
+            skill_id = self._ids[key] = len(self.names)
+            self.names.append(name)
+        return skill_id
+
+    def resolve(self, raw: str) -> List[int]:
+        """岗位中的一项技能 -> 技能 ID（能匹配技能词表时用规范名，否则按原文登记）"""
+        skill_id = self._ids.get(_skill_key(raw))
+        if skill_id is not None:
+            return [skill_id]
+        canonical = find_skills(raw)
+        if canonical:
+            return [self._ids[_skill_key(name)] for name in canonical]
+        return [self._intern(raw)]
+
+    def bits_of(self, names: Iterable[str]) -> int:
+        bits = 0
+        for name in names:
+            for skill_id in self.resolve(name):
+                bits |= 1 << skill_id
+        return bits
+
+    def freeze(self):
+        """岗位登记完成后编译词表外技能的匹配正则（与 resume_parser 相同的词边界规则）"""
+        extra = [_skill_key(name) for name in self.names[self._builtin:]]
+        if extra:
+            self._extra_pattern = re.compile(
+                r"(?<![a-z0-9+#.])(" + "|".join(re.escape(term) for term in sorted(extra, key=len, reverse=True))
+                + r")(?![a-z0-9+#])"
+            )
+
+    def resume_bits(self, parsed_data: Optional[str]) -> int:
+        """简历解析结果 -> 技能位图"""
+        try:
+            data = json.loads(parsed_data) if parsed_data else {}
+        except ValueError:
+            return 0
+        bits = 0
+        for name in data.get("skills") or []:
+            skill_id = self._ids.get(_skill_key(name))
+            if skill_id is not None:
+                bits |= 1 << skill_id
+        if self._extra_pattern is not None:
+            texts = list(data.get("skills") or [])
+            for project in data.get("projects") or []:
+                texts.append(project.get("name") or "")
+                texts.append(project.get("description") or "")
+            texts.extend(entry.get("text") or "" for entry in data.get("education") or [])
+            text = unicodedata.normalize("NFKC", "\n".join(texts)).lower()
+            for match in self._extra_pattern.finditer(text):
+                bits |= 1 << self._ids[match.group(1)]
+        return bits
+
+    def names_of(self, bits: int) -> List[str]:
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self.names[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+
+class PositionVector:
+    """一个岗位的技能位图"""
+    __slots__ = ("key", "source", "title", "required", "preferred", "total_weight")
+
+    def __init__(self, key: str, source: str, title: str, required: int, preferred: int):
+        self.key = key
+        self.source = source  # catalog（POSITION_DATA）或 database（positions 表）
+        self.title = title
+        self.required = required
+        self.preferred = preferred & ~required
+        self.total_weight = REQUIRED_WEIGHT * required.bit_count() + PREFERRED_WEIGHT * self.preferred.bit_count()
+
+    def score(self, bits: int) -> float:
+        if not self.total_weight:
+            return 0.0
+        matched = (REQUIRED_WEIGHT * (bits & self.required).bit_count()
+                   + PREFERRED_WEIGHT * (bits & self.preferred).bit_count())
+        return matched * 100.0 / self.total_weight
+
+
+class SkillSnapshot:
+    """不可变的索引快照：词表、岗位位图、简历位图（按顺序存放的并行列表）"""
+
+    def __init__(self, vocabulary: SkillVocabulary, positions: List[PositionVector],
+                 resumes: Dict[int, Tuple[int, int]]):
+        self.vocabulary = vocabulary
+        self.positions = positions
+        self.position_by_key = {position.key: position for position in positions}
+        self.resumes = resumes  # 简历ID -> (用户ID, 技能位图)
+        self.resume_ids = list(resumes)
+        self.resume_bits = [bits for _, bits in resumes.values()]
+        self.by_user: Dict[int, List[int]] = {}
+        for resume_id, (user_id, _) in resumes.items():
+            self.by_user.setdefault(user_id, []).append(resume_id)
+        self.built_at = time.monotonic()
+
+    def with_resumes(self, changed: Dict[int, Tuple[int, int]], removed: Iterable[int] = ()) -> "SkillSnapshot":
+        resumes = dict(self.resumes)
+        for resume_id in removed:
+            resumes.pop(resume_id, None)
+        resumes.update(changed)
+        snapshot = SkillSnapshot(self.vocabulary, self.positions, resumes)
+        snapshot.built_at = self.built_at
+        return snapshot
+
+    def describe(self, position: PositionVector, bits: int, score: float) -> dict:
+        vocabulary = self.vocabulary
+        return {
+            "score": round(score, 1),
+            "matched_skills": vocabulary.names_of(bits & (position.required | position.preferred)),
+            "missing_required": vocabulary.names_of(position.required & ~bits),
+            "missing_preferred": vocabulary.names_of(position.preferred & ~bits),
+        }
+
+    def top_positions(self, resume_id: int, k: int) -> List[dict]:
+        """为一份简历排序岗位"""
+        entry = self.resumes.get(resume_id)
+        bits = entry[1] if entry else 0
+        ranked = heapq.nlargest(k, ((position.score(bits), index) for index, position in enumerate(self.positions)),
+                                key=lambda item: (item[0], -item[1]))
+        results = []
+        for score, index in ranked:
+            position = self.positions[index]
+            results.append({"key": position.key, "source": position.source, "title": position.title,
+                            **self.describe(position, bits, score)})
+        return results
+
+    def top_resumes(self, position_key: str, k: int, user_id: Optional[int] = None) -> Optional[List[dict]]:
+        """为一个岗位排序简历（user_id 不为空时只在该用户的简历中排序）；岗位不存在时返回 None"""
+        position = self.position_by_key.get(position_key)
+        if position is None:
+            return None
+        if user_id is None:
+            ids, all_bits = self.resume_ids, self.resume_bits
+        else:
+            ids = self.by_user.get(user_id, [])
+            all_bits = [self.resumes[resume_id][1] for resume_id in ids]
+        if not position.total_weight:
+            return []
+
+        required, preferred = position.required, position.preferred
+        scores = [
+            REQUIRED_WEIGHT * (bits & required).bit_count() + PREFERRED_WEIGHT * (bits & preferred).bit_count()
+            for bits in all_bits
+        ]
+        best = heapq.nlargest(k, (i for i, matched in enumerate(scores) if matched), key=scores.__getitem__)
+        return [
+            {"resume_id": ids[i], **self.describe(position, all_bits[i], scores[i] * 100.0 / position.total_weight)}
+            for i in best
+        ]
+
+
+def _catalog_positions(vocabulary: SkillVocabulary) -> List[PositionVector]:
+    positions = []
+    for position_type, data in POSITION_DATA.items():
+        required = vocabulary.bits_of(_load_list(data.get("coreSkills")))
+        preferred = vocabulary.bits_of(
+            item for group in data.get("techStack") or [] for item in _load_list(group.get("items"))
+        )
+        positions.append(PositionVector(position_type, "catalog", data["title"], required, preferred))
+    return positions
+
+
+class SkillMatchIndex:
+    """负责构建、增量更新和定期重建技能匹配快照"""
+
+    def __init__(self, rebuild_interval: float, batch_size: int = 1000):
+        self.rebuild_interval = rebuild_interval
+        self.batch_size = batch_size
+        self._snapshot: Optional[SkillSnapshot] = None
+        self._lock = threading.Lock()
+
+        # 指标
+        self.rebuild_count = 0
+        self.incremental_updates = 0
+        self.last_build_ms = 0.0
+
+    def _stale(self, snapshot: Optional[SkillSnapshot]) -> bool:
+        return snapshot is None or time.monotonic() - snapshot.built_at >= self.rebuild_interval
+
+    def _build(self, db: Session) -> SkillSnapshot:
+        start = time.perf_counter()
+        vocabulary = SkillVocabulary()
+        positions = _catalog_positions(vocabulary)
+        for row in db.execute(
+            select(Position.id, Position.name, Position.required_skills, Position.preferred_skills)
+            .where(Position.is_active == True).order_by(Position.id)
+        ):
+            positions.append(PositionVector(
+                str(row.id), "database", row.name,
+                vocabulary.bits_of(_load_list(row.required_skills)),
+                vocabulary.bits_of(_load_list(row.preferred_skills)),
+            ))
+        vocabulary.freeze()
+
+        resumes: Dict[int, Tuple[int, int]] = {}
+        rows = db.execute(
+            select(Resume.id, Resume.user_id, Resume.parsed_data)
+            .where(Resume.is_parsed == True)
+            .execution_options(yield_per=self.batch_size)
+        )
+        for resume_id, user_id, parsed_data in rows:
+            resumes[resume_id] = (user_id, vocabulary.resume_bits(parsed_data))
+        snapshot = SkillSnapshot(vocabulary, positions, resumes)
+        self.last_build_ms = (time.perf_counter() - start) * 1000
+        return snapshot
+
+    def get(self, db: Session) -> SkillSnapshot:
+        snapshot = self._snapshot
+        if not self._stale(snapshot):
+            return snapshot
+        with self._lock:
+            if self._stale(self._snapshot):
+                self._snapshot = self._build(db)
+                self.rebuild_count += 1
+            return self._snapshot
+
+    async def get_async(self, db: AsyncSession) -> SkillSnapshot:
+        """异步接口使用的 get（与题库快照相同，不在事件循环线程里持锁等待数据库，并发时可能重复构建一次）"""
+        snapshot = self._snapshot
+        if not self._stale(snapshot):
+            return snapshot
+        snapshot = await db.run_sync(self._build)
+        with self._lock:
+            self._snapshot = snapshot
+            self.rebuild_count += 1
+        return snapshot
+
+    def update_resumes(self, db: Session, resume_ids: List[int]) -> Optional[SkillSnapshot]:
+        """
+        把已解析的简历计入索引（本进程解析完成后调用，或查询时发现其他进程解析的简历还不在索引中），
+        返回更新后的快照；索引尚未构建时跳过（构建时会读到），返回 None
+        """
+        if not resume_ids or self._snapshot is None:
+            return None
+        rows = db.execute(
+            select(Resume.id, Resume.user_id, Resume.parsed_data)
+            .where(Resume.id.in_(resume_ids), Resume.is_parsed == True)
+        ).all()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return None
+            vocabulary = snapshot.vocabulary
+            changed = {resume_id: (user_id, vocabulary.resume_bits(parsed_data))
+                       for resume_id, user_id, parsed_data in rows}
+            self._snapshot = snapshot.with_resumes(changed)
+            self.incremental_updates += 1
+            return self._snapshot
+
+    def remove_resume(self, resume_id: int):
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and resume_id in snapshot.resumes:
+                self._snapshot = snapshot.with_resumes({}, removed=[resume_id])
+                self.incremental_updates += 1
+
+    def invalidate(self):
+        """岗位变更后调用，下次访问时重建"""
+        with self._lock:
+            self._snapshot = None
+
+    def metrics(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "skills": len(snapshot.vocabulary) if snapshot else 0,
+            "positions": len(snapshot.positions) if snapshot else 0,
+            "resumes": len(snapshot.resumes) if snapshot else 0,
+            "rebuild_count": self.rebuild_count,
+            "incremental_updates": self.incremental_updates,
+            "last_build_ms": round(self.last_build_ms, 1),
+        }
+
+
+# 全局唯一的技能匹配索引
+skill_index = SkillMatchIndex(rebuild_interval=settings.SKILL_INDEX_REBUILD_INTERVAL)
@@ -0,0 +1,121 @@
+# app/services/storage_quota.py
+"""
+用户简历存储用量与配额
+
+ResumeStorageUsage 中每个用户一行 (bytes_used, file_count)：
+- 上传时在插入 Resume 的同一事务内用一条带条件的 UPDATE 预留空间
+  （bytes_used + size <= 配额 时才累加），O(1) 且并发上传不会一起超出配额
+- 删除时在删除 Resume 的同一事务内扣减
+- 用量按上传的文件大小计算，与内容去重无关（同一文件上传两次算两份）
+- recompute_usage 用 Resume 表重新计算所有用户的用量，修正进程崩溃等原因造成的偏差（见孤儿文件清理）
+"""
+from typing import List
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.upsert import insert_if_missing
+from app.models.resume import Resume, ResumeStorageUsage
+
+USAGE_TABLE = ResumeStorageUsage.__table__
+
+
+def _insert_if_missing(dialect_name: str, user_id: int):
+    """用量记录不存在时插入一条全零记录"""
+    return insert_if_missing(dialect_name, USAGE_TABLE, {"user_id": user_id, "bytes_used": 0, "file_count": 0}, ["user_id"])
+
+
+async def get_usage(db: AsyncSession, user_id: int) -> int:
+    """用户已使用的字节数（主键查询）"""
+    used = (await db.execute(
+        select(ResumeStorageUsage.bytes_used).where(ResumeStorageUsage.user_id == user_id)
+    )).scalar()
+    return used or 0
+
+
+async def reserve(db: AsyncSession, user_id: int, size: int, quota: int = settings.RESUME_STORAGE_QUOTA) -> bool:
+    """在调用方的事务内预留 size 字节，超出配额时返回 False（不做修改）"""
+    await db.execute(_insert_if_missing(db.get_bind().dialect.name, user_id))
+    result = await db.execute(
+        update(ResumeStorageUsage)
+        .where(ResumeStorageUsage.user_id == user_id, ResumeStorageUsage.bytes_used + size <= quota)
+        .values(bytes_used=ResumeStorageUsage.bytes_used + size, file_count=ResumeStorageUsage.file_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+async def release(db: AsyncSession, user_id: int, size: int):
+    """在调用方的事务内扣减一份文件的用量（不会减到负数）"""
+    await db.execute(
+        update(ResumeStorageUsage)
+        .where(ResumeStorageUsage.user_id == user_id)
+        .values(
+            bytes_used=case((ResumeStorageUsage.bytes_used > size, ResumeStorageUsage.bytes_used - size), else_=0),
+            file_count=case((ResumeStorageUsage.file_count > 0, ResumeStorageUsage.file_count - 1), else_=0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recompute_usage(db: Session, batch_size: int = 1000, dry_run: bool = False) -> dict:
+    """
+    按 Resume 表重新计算所有用户的用量，返回 {"users": 检查的用户数, "corrected": 修正的用户数}。
+    每批用户用一条 UPDATE ... = (SELECT sum(...)) 写回，与并发的上传/删除不会互相覆盖。
+    """
+    dialect_name = db.get_bind().dialect.name
+    result = {"users": 0, "corrected": 0}
+
+    # 先为有简历但还没有用量记录的用户补上记录
+    last_user_id = 0
+    while not dry_run:
+        user_ids: List[int] = db.execute(
+            select(Resume.user_id).where(Resume.user_id > last_user_id)
+            .group_by(Resume.user_id).order_by(Resume.user_id).limit(batch_size)
+        ).scalars().all()
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+        for user_id in user_ids:
+            db.execute(_insert_if_missing(dialect_name, user_id))
+        db.commit()
+
+    actual_bytes = (
+        select(func.coalesce(func.sum(Resume.file_size), 0))
+        .where(Resume.user_id == ResumeStorageUsage.user_id).scalar_subquery()
+    )
+    actual_count = (
+        select(func.count(Resume.id))
+        .where(Resume.user_id == ResumeStorageUsage.user_id).scalar_subquery()
+    )
+    last_user_id = 0
+    while True:
+        rows = db.execute(
+            select(ResumeStorageUsage.user_id, ResumeStorageUsage.bytes_used, ResumeStorageUsage.file_count,
+                   actual_bytes, actual_count)
+            .where(ResumeStorageUsage.user_id > last_user_id)
+            .order_by(ResumeStorageUsage.user_id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_user_id = rows[-1][0]
+        result["users"] += len(rows)
+
+        drifted = []
+        for user_id, used, count, actual_used, actual_files in rows:
+            if used != actual_used or count != actual_files:
+                drifted.append(user_id)
+                print(f"⚠️ 用户 {user_id} 的存储用量有偏差: 记录 {used} 字节/{count} 份，"
+                      f"实际 {actual_used} 字节/{actual_files} 份")
+        result["corrected"] += len(drifted)
+        if drifted and not dry_run:
+            db.execute(
+                update(ResumeStorageUsage)
+                .where(ResumeStorageUsage.user_id.in_(drifted))
+                .values(bytes_used=actual_bytes, file_count=actual_count)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+    return result
@@ -0,0 +1,200 @@
+# app/services/trend_rollups.py
+"""
+面试趋势汇总
+
+interview_trend_rollups 按 (用户, 粒度, 时间段起点) 保存已完成面试的各维度 (次数, 总和)：
+- 完成一场面试时对 day/week/month 三个时间段各做一次原子累加
+- /trend 按查询周期选择粒度，读取的行数只和周期长度有关，与面试总数无关；
+  超过 TREND_MAX_POINTS 时再把相邻时间段按 (次数, 总和) 合并，返回的点数固定有上限
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_if_missing
+from app.models.interview import Interview, InterviewStatistics, InterviewTrendRollup
+from app.services.interview_stats import SCORE_DIMENSIONS
+
+GRANULARITIES = ("day", "week", "month")
+
+# 查询周期 -> (天数, 粒度)
+PERIODS = {
+    "week": (7, "day"),
+    "month": (30, "day"),
+    "quarter": (90, "week"),
+    "year": (365, "month"),
+}
+DEFAULT_PERIOD = "quarter"
+
+ROLLUP_TABLE = InterviewTrendRollup.__table__
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """时间点所在时间段的起点"""
+    day = datetime(moment.year, moment.month, moment.day)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"未知的趋势粒度: {granularity}")
+
+
+def period_range(period: str, now: Optional[datetime] = None) -> Tuple[datetime, datetime, str]:
+    """查询周期 -> (起始时间段起点, 结束时间, 粒度)"""
+    days, granularity = PERIODS.get(period, PERIODS[DEFAULT_PERIOD])
+    end = now or datetime.utcnow()
+    return bucket_start(end - timedelta(days=days), granularity), end, granularity
+
+
+def _empty_values() -> dict:
+    values = {"interviews_count": 0, "cumulative_overall_count": 0, "cumulative_overall_sum": 0.0}
+    for dimension in SCORE_DIMENSIONS:
+        values[f"{dimension}_count"] = 0
+        values[f"{dimension}_sum"] = 0.0
+    return values
+
+
+async def record_interview(db: AsyncSession, user_id: int, interview: Interview):
+    """
+    把一场已完成面试计入三个粒度的趋势汇总（在调用方的事务内执行，需在用户统计更新之后调用）。
+    """
+    # 用户统计已包含本场面试，直接取累计值
+    cumulative = (await db.execute(
+        select(InterviewStatistics.overall_count, InterviewStatistics.overall_sum)
+        .where(InterviewStatistics.user_id == user_id)
+    )).first()
+
+    c = ROLLUP_TABLE.c
+    values = {"interviews_count": c.interviews_count + 1}
+    for dimension in SCORE_DIMENSIONS:
+        score = getattr(interview, f"{dimension}_score")
+        if score is not None:
+            values[f"{dimension}_count"] = c[f"{dimension}_count"] + 1
+            values[f"{dimension}_sum"] = c[f"{dimension}_sum"] + score
+    if cumulative is not None:
+        values["cumulative_overall_count"] = cumulative[0] or 0
+        values["cumulative_overall_sum"] = cumulative[1] or 0.0
+
+    dialect_name = db.get_bind().dialect.name
+    finished_at = interview.finished_at or datetime.utcnow()
+    for granularity in GRANULARITIES:
+        start = bucket_start(finished_at, granularity)
+        await db.execute(insert_if_missing(
+            dialect_name, ROLLUP_TABLE,
+            {"user_id": user_id, "granularity": granularity, "bucket_start": start, **_empty_values()},
+            ["user_id", "granularity", "bucket_start"]
+        ))
+        await db.execute(
+            update(ROLLUP_TABLE)
+            .where(c.user_id == user_id, c.granularity == granularity, c.bucket_start == start)
+            .values(**values)
+        )
+
+
+async def load_rollups(db: AsyncSession, user_id: int, granularity: str, start: datetime) -> List[InterviewTrendRollup]:
+    """按时间顺序读取用户某个粒度、从 start 开始的趋势汇总（走主键范围扫描）"""
+    return (await db.execute(
+        select(InterviewTrendRollup).where(
+            InterviewTrendRollup.user_id == user_id,
+            InterviewTrendRollup.granularity == granularity,
+            InterviewTrendRollup.bucket_start >= start
+        ).order_by(InterviewTrendRollup.bucket_start)
+    )).scalars().all()
+
+
+def downsample(rollups: List[InterviewTrendRollup], dimension: str, max_points: int) -> List[Tuple[datetime, Optional[float]]]:
+    """
+    把时间段序列合并为至多 max_points 个点，返回 [(起点, 分数)]。
+    相邻时间段按 (次数, 总和) 合并，结果与直接按合并后的时间段汇总一致；
+    overall 使用累计平均分，取合并组内最后一个时间段的累计值。
+    """
+    if not rollups:
+        return []
+    group_size = -(-len(rollups) // max(1, max_points))
+    points = []
+    for i in range(0, len(rollups), group_size):
+        group = rollups[i:i + group_size]
+        if dimension == "overall":
+            last = group[-1]
+            count, total = last.cumulative_overall_count, last.cumulative_overall_sum
+        else:
+            count = sum(getattr(r, f"{dimension}_count") for r in group)
+            total = sum(getattr(r, f"{dimension}_sum") for r in group)
+        points.append((group[0].bucket_start, total / count if count else None))
+    return points
+
+
+class _UserRollups:
+    """重建时在内存中累加一个用户的所有时间段"""
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, datetime], dict] = {}
+        self.cumulative_count = 0
+        self.cumulative_sum = 0.0
+
+    def add(self, interview):
+        if interview.overall_score is not None:
+            self.cumulative_count += 1
+            self.cumulative_sum += interview.overall_score
+        finished_at = interview.finished_at or datetime.utcnow()
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(finished_at, granularity))
+            values = self.buckets.setdefault(key, _empty_values())
+            values["interviews_count"] += 1
+            for dimension in SCORE_DIMENSIONS:
+                score = getattr(interview, f"{dimension}_score")
+                if score is not None:
+                    values[f"{dimension}_count"] += 1
+                    values[f"{dimension}_sum"] += score
+            values["cumulative_overall_count"] = self.cumulative_count
+            values["cumulative_overall_sum"] = self.cumulative_sum
+
+    def rows(self, user_id: int) -> List[dict]:
+        return [
+            {"user_id": user_id, "granularity": granularity, "bucket_start": start, **values}
+            for (granularity, start), values in self.buckets.items()
+        ]
+
+
+def rebuild_trend_rollups(db: Session, user_id: Optional[int] = None, batch_size: int = 1000) -> int:
+    """
+    从已完成的面试重建趋势汇总（user_id 为空时重建所有用户），返回写入的行数，由调用方提交。
+    面试按 (user_id, 完成时间) 顺序流式读取，内存中只保留当前用户的时间段。
+    """
+    delete = ROLLUP_TABLE.delete()
+    stream = select(
+        Interview.id, Interview.user_id, Interview.finished_at,
+        *[getattr(Interview, f"{d}_score") for d in SCORE_DIMENSIONS]
+    ).where(Interview.status == "completed")
+    if user_id is not None:
+        delete = delete.where(ROLLUP_TABLE.c.user_id == user_id)
+        stream = stream.where(Interview.user_id == user_id)
+    db.execute(delete)
+
+    written = 0
+
+    def flush(current_user_id, rollups):
+        nonlocal written
+        rows = rollups.rows(current_user_id)
+        db.execute(ROLLUP_TABLE.insert(), rows)
+        written += len(rows)
+
+    current_user_id, rollups = None, None
+    result = db.execute(
+        stream.order_by(Interview.user_id, Interview.finished_at, Interview.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in result:
+        if row.user_id != current_user_id:
+            if rollups is not None:
+                flush(current_user_id, rollups)
+            current_user_id, rollups = row.user_id, _UserRollups()
+        rollups.add(row)
+    if rollups is not None:
+        flush(current_user_id, rollups)
+    return written
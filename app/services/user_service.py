@@ -4,6 +4,7 @@ from typing import Optional
 import json
 from app.models.user import User
 from app.models.profile import UserProfile
+from app.core.token_cache import token_cache
 
 def get_user_profile(db: Session, user_id: int) -> Optional[UserProfile]:
     """获取用户的Profile记录"""
@@ -86,4 +87,5 @@ def update_or_create_user_profile(db: Session, user_id: int, profile_data: dict)
     
     db.commit()
     db.refresh(profile)
+    token_cache.invalidate_user(user_id)
     return profile
\ No newline at end of file
@@ -0,0 +1,139 @@
+# app/services/view_counter.py
+"""
+题目浏览数写缓冲（write-behind）
+
+详情接口只在内存中累加浏览数，由后台线程每隔 N 秒或累计 M 次浏览时
+用一条分组 UPDATE 批量写回，读请求不再持有数据库写锁。
+应用关闭时（shutdown 事件 / 进程退出）会做最后一次刷新。
+"""
+import atexit
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import case, update
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.question import Question
+
+
+class ViewCountBuffer:
+    """进程内浏览数累加器"""
+
+    def __init__(self, flush_interval: float, flush_threshold: int):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+        self._pending: Dict[int, int] = {}
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        # 保证同一时间只有一个刷新在执行
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        # 指标
+        self.flushed_total = 0
+        self.flush_count = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+
+    def increment(self, question_id: int, count: int = 1):
+        """记录一次浏览"""
+        with self._lock:
+            self._pending[question_id] = self._pending.get(question_id, 0) + count
+            self._pending_total += count
+            should_flush = self._pending_total >= self.flush_threshold
+        if should_flush:
+            self._wakeup.set()
+
+    def pending_for(self, question_id: int) -> int:
+        """某道题尚未写回数据库的浏览数"""
+        with self._lock:
+            return self._pending.get(question_id, 0)
+
+    def flush(self) -> int:
+        """将累计的浏览数写回数据库，返回写回的浏览次数"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+                self._pending_total = 0
+
+            start = time.perf_counter()
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(Question)
+                    .where(Question.id.in_(batch.keys()))
+                    .values(views=Question.views + case(batch, value=Question.id, else_=0))
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.flush_errors += 1
+                # 写回失败时把计数放回缓冲区，下次重试
+                with self._lock:
+                    for question_id, count in batch.items():
+                        self._pending[question_id] = self._pending.get(question_id, 0) + count
+                        self._pending_total += count
+                print(f"❌ 浏览数写回失败: {str(e)}")
+                return 0
+            finally:
+                db.close()
+
+            flushed = sum(batch.values())
+            self.flushed_total += flushed
+            self.flush_count += 1
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+            return flushed
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        """启动后台刷新线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="view-count-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台线程并把剩余计数全部写回"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            pending_increments = self._pending_total
+            pending_questions = len(self._pending)
+        return {
+            "pending_increments": pending_increments,
+            "pending_questions": pending_questions,
+            "flushed_total": self.flushed_total,
+            "flush_count": self.flush_count,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+# 全局唯一的浏览数缓冲
+view_counter = ViewCountBuffer(
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL,
+    flush_threshold=settings.VIEW_COUNT_FLUSH_THRESHOLD,
+)
+
+# 进程非正常退出（未触发 shutdown 事件）时也尽量写回
+atexit.register(view_counter.flush)
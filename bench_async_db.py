@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+同步/异步数据库会话并发吞吐基准
+用同一份临时数据库分别挂载 "def + Session" 和 "async def + AsyncSession" 两个接口，
+以相同的并发数发起请求（进程内 ASGI 调用，不经过网络），对比吞吐和延迟
+在项目根目录运行: python bench_async_db.py [--requests 2000] [--concurrency 1,16,64]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.database import Base, create_async_db_engine
+from app.models import Question, UserQuestionProgress
+
+QUESTION_COUNT = 2000
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Question), [
+            {"title": f"第{i}题", "category": "后端开发", "difficulty": "中等",
+             "answer": "参考答案" * 50, "is_active": True}
+            for i in range(QUESTION_COUNT)
+        ])
+        conn.execute(insert(UserQuestionProgress), [
+            {"user_id": 1, "question_id": i + 1, "is_viewed": True}
+            for i in range(0, QUESTION_COUNT, 2)
+        ])
+
+
+def build_app(url: str) -> FastAPI:
+    """与题目详情接口相同的两次查询：题目 + 用户学习进度"""
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    async_engine = create_async_db_engine(url)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync/{question_id}")
+    def sync_detail(question_id: int, db: Session = Depends(get_sync_db)):
+        question = db.get(Question, question_id)
+        progress = db.execute(select(UserQuestionProgress).where(
+            UserQuestionProgress.user_id == 1, UserQuestionProgress.question_id == question_id
+        )).scalars().first()
+        return {"id": question.id, "title": question.title, "viewed": bool(progress)}
+
+    @app.get("/async/{question_id}")
+    async def async_detail(question_id: int, db=Depends(get_async_db)):
+        question = await db.get(Question, question_id)
+        progress = (await db.execute(select(UserQuestionProgress).where(
+            UserQuestionProgress.user_id == 1, UserQuestionProgress.question_id == question_id
+        ))).scalars().first()
+        return {"id": question.id, "title": question.title, "viewed": bool(progress)}
+
+    app.state.engines = (sync_engine, async_engine)
+    return app
+
+
+async def run_load(app: FastAPI, prefix: str, total: int, concurrency: int):
+    """返回 (每秒请求数, p50毫秒, p99毫秒)"""
+    latencies = []
+    remaining = iter(range(total))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                question_id = random.randint(1, QUESTION_COUNT)
+                start = time.perf_counter()
+                response = await client.get(f"{prefix}/{question_id}")
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return total / elapsed, statistics.median(latencies), p99
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        seed(engine)
+        engine.dispose()
+
+        app = build_app(url)
+        # 预热两个连接池
+        await run_load(app, "/sync", 50, 4)
+        await run_load(app, "/async", 50, 4)
+
+        print(f"{'并发':>6} | {'方式':>6} | {'req/s':>9} | {'p50 ms':>8} | {'p99 ms':>8}")
+        print("-" * 50)
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            for label, prefix in (("sync", "/sync"), ("async", "/async")):
+                rps, p50, p99 = await run_load(app, prefix, args.requests, concurrency)
+                print(f"{concurrency:>6} | {label:>6} | {rps:>9.0f} | {p50:>8.2f} | {p99:>8.2f}")
+
+        sync_engine, async_engine = app.state.engines
+        sync_engine.dispose()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步/异步数据库会话并发吞吐基准")
+    parser.add_argument("--requests", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--concurrency", default="1,16,64", help="并发数，逗号分隔")
+    args = parser.parse_args()
+
+    random.seed(42)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
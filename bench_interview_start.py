@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+面试出题性能基准
+对比原先 "加载整个题池 + random.sample" 与按分桶索引采样在不同题库规模下的出题延迟
+在项目根目录运行: python bench_interview_start.py [--sizes 1000,10000,100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.models import Question
+from app.schemas.interview import InterviewConfig
+from app.services.question_catalog import QuestionCatalog
+from app.services.question_sampler import QuestionSampler
+
+CATEGORIES = ["前端开发", "后端开发", "算法数据结构", "通用问题"]
+DIFFICULTIES = ["简单", "中等", "困难"]
+
+
+def seed(engine, size: int):
+    rows = [
+        {
+            "title": f"第{i}题",
+            "category": random.choice(CATEGORIES),
+            "difficulty": random.choice(DIFFICULTIES),
+            "answer": "参考答案" * 50,
+            "is_active": True,
+        }
+        for i in range(size)
+    ]
+    with engine.begin() as conn:
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(Question), rows[start:start + 5000])
+
+
+def legacy_pick(db, config: InterviewConfig):
+    """原实现：加载整个题池后在 Python 中采样"""
+    query = db.query(Question).filter(Question.is_active == True)
+    if config.position == "frontend":
+        query = query.filter(Question.category.in_(["前端开发", "算法数据结构"]))
+    elif config.position == "backend":
+        query = query.filter(Question.category.in_(["后端开发", "算法数据结构"]))
+    available = query.all()
+    return random.sample(available, min(5, len(available)))[:3]
+
+
+def sampler_pick(db, config: InterviewConfig, catalog: QuestionCatalog, sampler: QuestionSampler):
+    return sampler.sample(catalog.get(db), config.position, config.difficulty, 3)
+
+
+def timed(fn, repeat: int) -> float:
+    """返回每次出题的平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def run(size: int, repeat: int):
+    config = InterviewConfig(position="frontend", difficulty="medium")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        seed(engine, size)
+        db = sessionmaker(bind=engine)()
+
+        # 使用独立的快照和采样器，避免影响全局实例
+        catalog = QuestionCatalog(check_interval=60)
+        sampler = QuestionSampler()
+        try:
+            start = time.perf_counter()
+            sampler_pick(db, config, catalog, sampler)
+            warmup_ms = (time.perf_counter() - start) * 1000
+
+            legacy_ms = timed(lambda: legacy_pick(db, config), repeat)
+            sampler_ms = timed(lambda: sampler_pick(db, config, catalog, sampler), repeat)
+        finally:
+            db.close()
+            engine.dispose()
+
+    print(f"{size:>8} | {warmup_ms:>12.1f} | {legacy_ms:>12.2f} | {sampler_ms:>12.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="面试出题性能基准")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="题库规模，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=20, help="每种方式重复次数")
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"{'题目数':>8} | {'快照构建ms':>12} | {'全量加载ms':>12} | {'分桶采样ms':>12}")
+    print("-" * 58)
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
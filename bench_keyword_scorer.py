@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+关键词覆盖率评分性能基准
+用初始化脚本中的题库，对比 Aho-Corasick 一次扫描与逐个关键词子串查找的单次评分耗时
+在项目根目录运行: python bench_keyword_scorer.py [--repeat 2000]
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db import init_questions_data
+from app.models import Question
+from app.services import keyword_scorer
+
+
+def load_question_bank():
+    """在临时数据库中执行题库初始化，读出 (题目, 参考答案, 要点, 标签)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            init_questions_data.init_categories(db)
+            init_questions_data.init_questions(db)
+            rows = db.query(Question.title, Question.answer, Question.key_points, Question.tags).all()
+        finally:
+            db.close()
+            engine.dispose()
+    return [tuple(row) for row in rows]
+
+
+def build_answers(bank, per_question: int):
+    """每道题生成若干回答：参考答案片段 + 其他题目的内容，长度 100~1000 字"""
+    corpus = [re.sub(r"<[^>]+>", "", answer) for _, answer, _, _ in bank]
+    answers = []
+    for index, (title, _, key_points, tags) in enumerate(bank):
+        for _ in range(per_question):
+            own = corpus[index]
+            start = random.randint(0, max(0, len(own) - 50))
+            text = own[start:start + random.randint(50, 400)] + random.choice(corpus)
+            answers.append((title, text[:random.randint(100, 1000)], key_points, tags))
+    return answers
+
+
+def naive_score(question_text, answer_text, key_points, tags):
+    """逐个关键词在回答中做子串查找（对照组）"""
+    compiled = keyword_scorer.compile_question(key_points, tags)
+    text = keyword_scorer.normalize(answer_text)
+    found = {i for i, pattern in enumerate(compiled.matcher.patterns) if pattern in text}
+    return sum(1 for terms in compiled.point_terms if sum(1 for t in terms if t in found) * 2 >= len(terms))
+
+
+def timed_us(fn, answers, repeat):
+    samples = []
+    for i in range(repeat):
+        args = answers[i % len(answers)]
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词覆盖率评分性能基准")
+    parser.add_argument("--repeat", type=int, default=2000, help="评分次数")
+    parser.add_argument("--answers", type=int, default=20, help="每道题生成的回答数")
+    args = parser.parse_args()
+
+    random.seed(42)
+    bank = load_question_bank()
+    answers = build_answers(bank, args.answers)
+    avg_chars = statistics.mean(len(a[1]) for a in answers)
+
+    # 冷启动：编译每道题的自动机
+    keyword_scorer.compile_question.cache_clear()
+    start = time.perf_counter()
+    for _, _, key_points, tags in bank:
+        keyword_scorer.compile_question(key_points, tags)
+    compile_us = (time.perf_counter() - start) * 1e6 / len(bank)
+    patterns = statistics.mean(len(keyword_scorer.compile_question(k, t).matcher.patterns) for _, _, k, t in bank)
+
+    ac_mean, ac_p99 = timed_us(keyword_scorer.score_answer, answers, args.repeat)
+    naive_mean, naive_p99 = timed_us(naive_score, answers, args.repeat)
+
+    print(f"题目数: {len(bank)}  平均关键词数: {patterns:.1f}  回答平均长度: {avg_chars:.0f} 字")
+    print(f"编译自动机: {compile_us:.1f} us/题（每道题只在首次评分时编译一次）")
+    print(f"{'方式':<16} | {'平均us':>8} | {'p99 us':>8}")
+    print("-" * 40)
+    print(f"{'Aho-Corasick':<16} | {ac_mean:>8.1f} | {ac_p99:>8.1f}")
+    print(f"{'逐词子串查找':<14} | {naive_mean:>8.1f} | {naive_p99:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
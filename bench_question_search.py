@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+题库检索性能基准
+对比 FTS5 全文检索与原 LIKE 全表扫描在不同题库规模下的搜索延迟
+在项目根目录运行: python bench_question_search.py [--sizes 1000,10000,100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from sqlalchemy import create_engine, func, insert, or_
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.models import Question
+from app.services import search_service
+
+WORDS = [
+    "闭包", "原型链", "事件循环", "虚拟DOM", "响应式", "垃圾回收", "索引", "事务",
+    "缓存", "微服务", "负载均衡", "哈希表", "二叉树", "动态规划", "Vue", "React",
+    "Redis", "MySQL", "Python", "Java", "TCP", "HTTP", "Docker", "Kubernetes",
+]
+QUERIES = ["闭包", "事件循环", "redis", "动态规划 二叉树", "kubernetes"]
+
+# 随机生成的中文词汇，模拟真实题库中大量互不相关的知识点
+VOCABULARY = []
+
+
+def build_vocabulary(size: int = 2000):
+    VOCABULARY.clear()
+    VOCABULARY.extend(
+        "".join(chr(random.randint(0x4E00, 0x9FA5)) for _ in range(random.randint(2, 4)))
+        for _ in range(size)
+    )
+    VOCABULARY.extend(WORDS)
+
+
+def random_text(n_words: int) -> str:
+    return "，".join(random.choice(VOCABULARY) for _ in range(n_words))
+
+
+def seed(engine, size: int):
+    rows = []
+    for i in range(size):
+        rows.append({
+            "title": f"第{i}题：{random.choice(VOCABULARY)}的原理是什么？",
+            "description": random_text(3),
+            "category": random.choice(["前端开发", "后端开发", "算法数据结构", "通用问题"]),
+            "sub_category": random.choice(VOCABULARY),
+            "difficulty": random.choice(["简单", "中等", "困难"]),
+            "tags": json.dumps(random.sample(VOCABULARY, 3), ensure_ascii=False),
+            "answer": random_text(30),
+            "key_points": json.dumps([random_text(1) for _ in range(3)], ensure_ascii=False),
+            "related_topics": json.dumps(random.sample(VOCABULARY, 2), ensure_ascii=False),
+            "is_active": True,
+            "views": 0,
+            "stars": 0,
+        })
+    with engine.begin() as conn:
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(Question), rows[start:start + 5000])
+
+
+def like_search(db, term: str, page_size: int = 10):
+    like = f"%{term.lower()}%"
+    query = db.query(Question).filter(Question.is_active == True).filter(or_(
+        func.lower(Question.title).like(like),
+        func.lower(Question.description).like(like),
+        func.lower(Question.answer).like(like),
+        func.lower(Question.tags).like(like),
+        func.lower(Question.category).like(like),
+        func.lower(Question.sub_category).like(like),
+        func.lower(Question.key_points).like(like),
+        func.lower(Question.related_topics).like(like),
+    ))
+    return query.count(), query.limit(page_size).all()
+
+
+def fts_search(db, term: str, page_size: int = 10):
+    subquery = search_service.search_subquery(term)
+    query = db.query(Question).filter(Question.is_active == True).join(
+        subquery, subquery.c.question_id == Question.id
+    ).order_by(subquery.c.rank, Question.id)
+    return query.count(), query.limit(page_size).all()
+
+
+def timed(fn, db, repeat: int) -> float:
+    """返回每次查询的平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for term in QUERIES:
+            fn(db, term)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(QUERIES))
+
+
+def run(size: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        seed(engine, size)
+
+        start = time.perf_counter()
+        search_service.ensure_search_index(engine)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        db = sessionmaker(bind=engine)()
+        try:
+            like_ms = timed(like_search, db, repeat)
+            fts_ms = timed(fts_search, db, repeat)
+        finally:
+            db.close()
+            engine.dispose()
+
+    print(f"{size:>8} | {build_ms:>10.1f} | {like_ms:>10.2f} | {fts_ms:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="题库检索性能基准")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="题库规模，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="每个查询重复次数")
+    args = parser.parse_args()
+
+    random.seed(42)
+    build_vocabulary()
+    print(f"{'题目数':>8} | {'建索引ms':>10} | {'LIKE ms':>10} | {'FTS5 ms':>10}")
+    print("-" * 50)
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+简历-岗位技能匹配性能基准
+随机生成若干份简历的技能集合，对比整数位图（按位与 + bit_count）与逐份简历做集合交集的 top-k 耗时
+在项目根目录运行: python bench_skill_matching.py [--resumes 20000] [--repeat 50]
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from app.services.resume_parser import SKILLS
+from app.services.skill_matching import REQUIRED_WEIGHT, PREFERRED_WEIGHT, SkillSnapshot, SkillVocabulary, _catalog_positions
+
+
+def build_snapshot(resume_count: int):
+    vocabulary = SkillVocabulary()
+    positions = _catalog_positions(vocabulary)
+    vocabulary.freeze()
+    names = list(SKILLS)
+    resumes, skill_sets = {}, {}
+    for resume_id in range(1, resume_count + 1):
+        skills = random.sample(names, random.randint(3, 15))
+        parsed_data = json.dumps({"skills": skills, "projects": [], "education": []}, ensure_ascii=False)
+        resumes[resume_id] = (resume_id % 100, vocabulary.resume_bits(parsed_data))
+        skill_sets[resume_id] = set(vocabulary.names_of(resumes[resume_id][1]))
+    return SkillSnapshot(vocabulary, positions, resumes), skill_sets
+
+
+def naive_top_resumes(snapshot, skill_sets, position_key, k):
+    """逐份简历做集合交集（对照组）"""
+    position = snapshot.position_by_key[position_key]
+    required = set(snapshot.vocabulary.names_of(position.required))
+    preferred = set(snapshot.vocabulary.names_of(position.preferred))
+    scores = (
+        (REQUIRED_WEIGHT * len(skills & required) + PREFERRED_WEIGHT * len(skills & preferred), resume_id)
+        for resume_id, skills in skill_sets.items()
+    )
+    return heapq.nlargest(k, scores)
+
+
+def timed_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历-岗位技能匹配性能基准")
+    parser.add_argument("--resumes", type=int, default=20000, help="简历数")
+    parser.add_argument("--repeat", type=int, default=50, help="查询次数")
+    parser.add_argument("--top-k", type=int, default=10, help="返回前几份简历")
+    args = parser.parse_args()
+
+    random.seed(42)
+    start = time.perf_counter()
+    snapshot, skill_sets = build_snapshot(args.resumes)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print(f"简历数: {args.resumes}  技能数: {len(snapshot.vocabulary)}  构建: {build_ms:.0f} ms")
+    print(f"{'岗位':<10} | {'位图 平均ms':>11} | {'位图 p99':>9} | {'集合 平均ms':>11} | {'集合 p99':>9}")
+    print("-" * 62)
+    for position in snapshot.positions:
+        bits_mean, bits_p99 = timed_ms(lambda: snapshot.top_resumes(position.key, args.top_k), args.repeat)
+        set_mean, set_p99 = timed_ms(lambda: naive_top_resumes(snapshot, skill_sets, position.key, args.top_k), args.repeat)
+        print(f"{position.key:<10} | {bits_mean:>11.2f} | {bits_p99:>9.2f} | {set_mean:>11.2f} | {set_p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+SQLite 读写并发压测
+对比默认配置（rollback journal）与生产模式（WAL + PRAGMA）在多个读进程、
+少量写进程（模拟浏览数批量写回、学习进度提交）同时运行时的吞吐和读延迟
+在项目根目录运行: python bench_sqlite_concurrency.py [--readers 8] [--writers 2] [--seconds 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base, create_db_engine, get_sqlite_pragmas
+from app.models import Question
+
+QUESTION_COUNT = 5000
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Question), [
+            {"title": f"第{i}题", "category": "后端开发", "difficulty": "中等",
+             "answer": "参考答案" * 50, "is_active": True, "views": 0}
+            for i in range(QUESTION_COUNT)
+        ])
+
+
+def open_session(path: str, pragmas: dict):
+    engine = create_db_engine(f"sqlite:///{path}", sqlite_pragmas=pragmas)
+    return engine, sessionmaker(bind=engine, autoflush=False)
+
+
+def reader(path: str, pragmas: dict, seconds: float, seed_value: int):
+    """读进程：返回 (完成次数, 错误次数, 延迟列表)"""
+    random.seed(seed_value)
+    engine, Session = open_session(path, pragmas)
+    done, errors, latencies = 0, 0, []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        db = Session()
+        try:
+            question_id = random.randint(1, QUESTION_COUNT)
+            db.execute(select(Question.title, Question.views).where(Question.id == question_id)).one()
+            db.execute(select(Question.id).where(Question.views > 0).limit(20)).all()
+            latencies.append((time.perf_counter() - start) * 1000)
+            done += 1
+        except OperationalError:
+            errors += 1
+        finally:
+            db.close()
+    engine.dispose()
+    return done, errors, latencies
+
+
+def writer(path: str, pragmas: dict, seconds: float, seed_value: int, batch_size: int):
+    """写进程（模拟浏览数批量写回）：返回 (完成次数, 错误次数, 延迟列表)"""
+    random.seed(seed_value)
+    engine, Session = open_session(path, pragmas)
+    done, errors, latencies = 0, 0, []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        batch = {random.randint(1, QUESTION_COUNT): random.randint(1, 5) for _ in range(batch_size)}
+        start = time.perf_counter()
+        db = Session()
+        try:
+            db.execute(
+                update(Question)
+                .where(Question.id.in_(batch.keys()))
+                .values(views=Question.views + case(batch, value=Question.id, else_=0))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            latencies.append((time.perf_counter() - start) * 1000)
+            done += 1
+        except OperationalError:
+            db.rollback()
+            errors += 1
+        finally:
+            db.close()
+    engine.dispose()
+    return done, errors, latencies
+
+
+def percentile(values, ratio: float) -> float:
+    values = sorted(values) or [0.0]
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def run(label: str, pragmas: dict, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine, _ = open_session(path, pragmas)
+        Base.metadata.create_all(bind=engine)
+        seed(engine)
+        engine.dispose()
+
+        # 每个读写方各用一个进程，模拟多个 uvicorn worker，避免 GIL 干扰
+        with ProcessPoolExecutor(max_workers=args.readers + args.writers) as pool:
+            readers = [
+                pool.submit(reader, path, pragmas, args.seconds, i)
+                for i in range(args.readers)
+            ]
+            writers = [
+                pool.submit(writer, path, pragmas, args.seconds, 1000 + i, args.batch_size)
+                for i in range(args.writers)
+            ]
+            read_results = [f.result() for f in readers]
+            write_results = [f.result() for f in writers]
+
+    reads = sum(r[0] for r in read_results)
+    writes = sum(w[0] for w in write_results)
+    errors = sum(r[1] for r in read_results + write_results)
+    read_latencies = [ms for r in read_results for ms in r[2]]
+    write_latencies = [ms for w in write_results for ms in w[2]]
+    print(f"{label:>10} | {reads / args.seconds:>9.0f} | {writes / args.seconds:>9.0f} | "
+          f"{percentile(read_latencies, 0.5):>8.2f} | {percentile(read_latencies, 0.99):>8.2f} | "
+          f"{percentile(write_latencies, 0.99):>8.2f} | {errors:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 读写并发压测")
+    parser.add_argument("--readers", type=int, default=8, help="读进程数")
+    parser.add_argument("--writers", type=int, default=2, help="写进程数")
+    parser.add_argument("--batch-size", type=int, default=200, help="每次写入更新的题目数")
+    parser.add_argument("--seconds", type=float, default=5, help="每种配置的压测时长")
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"{'配置':>10} | {'读/秒':>9} | {'写/秒':>9} | {'读p50ms':>8} | {'读p99ms':>8} | {'写p99ms':>8} | {'错误':>6}")
+    print("-" * 77)
+    run("default", {}, args)
+    run("production", get_sqlite_pragmas(), args)
+
+
+if __name__ == "__main__":
+    main()